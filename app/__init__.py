@@ -1,7 +1,11 @@
 from flask import Flask
+from app.services.structured_logging import configure_logging
 from config.config import Config
 
 def create_app():
+    # Logging first, so its writer outlives the services' shutdown hooks
+    configure_logging()
+    
     app = Flask(__name__)
     app.config.from_object(Config)
     
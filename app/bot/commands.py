@@ -1,5 +1,6 @@
 import re
 from typing import Tuple, Optional
+from app.services.gazetteer import Gazetteer, get_gazetteer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -7,25 +8,87 @@ logger = logging.getLogger(__name__)
 class CommandParser:
     """Handles parsing and validation of bot commands"""
     
-    # Common multi-word locations for better parsing
-    COMMON_LOCATIONS = {
-        'new york', 'los angeles', 'san francisco', 'las vegas', 'new delhi',
-        'hong kong', 'cape town', 'buenos aires', 'rio de janeiro', 'costa rica',
-        'puerto rico', 'new zealand', 'south africa', 'united kingdom', 'united states'
-    }
+    # Patterns are compiled once instead of on every parse
+    REGISTER_PATTERN = re.compile(r'^register\s+(.+)$', re.IGNORECASE)
+    POST_PATTERN = re.compile(r'^post\s+(.+)$', re.IGNORECASE)
     
-    # Common single-word locations (cities/countries)
-    COMMON_SINGLE_LOCATIONS = {
-        'london', 'paris', 'berlin', 'tokyo', 'sydney', 'toronto', 'mumbai',
-        'bangalore', 'delhi', 'chennai', 'hyderabad', 'pune', 'kolkata',
-        'singapore', 'dubai', 'amsterdam', 'madrid', 'rome', 'vienna',
-        'zurich', 'stockholm', 'oslo', 'copenhagen', 'helsinki', 'warsaw',
-        'prague', 'budapest', 'athens', 'lisbon', 'dublin', 'edinburgh',
-        'manchester', 'birmingham', 'glasgow', 'bristol', 'leeds', 'liverpool',
-        'seattle', 'portland', 'denver', 'austin', 'dallas', 'houston',
-        'miami', 'atlanta', 'chicago', 'boston', 'philadelphia', 'detroit',
-        'phoenix', 'vegas', 'francisco', 'angeles', 'diego'
-    }
+    # Optional trailing search radius, e.g. "within 25 km" or "10 miles"
+    RADIUS_PATTERN = re.compile(
+        r'\s+(?:within\s+)?(\d+(?:\.\d+)?)\s*(km|kms|kilometers?|kilometres?|mi|miles?)$',
+        re.IGNORECASE
+    )
+    KM_PER_MILE = 1.609344
+    
+    # Optional trailing listing lifetime on post, e.g. "for 14 days"
+    TTL_PATTERN = re.compile(r'\s+for\s+(\d+)\s*(hours?|hrs?|h|days?|d|weeks?|w)$', re.IGNORECASE)
+    TTL_UNIT_SECONDS = {'h': 3600, 'd': 86400, 'w': 604800}
+    
+    # Words that mark a free-form message as a request for help
+    HELP_KEYWORDS = frozenset({'help', 'commands', 'how', 'what', 'start', 'hi', 'hello'})
+    
+    @staticmethod
+    def parse_role_location(content: str) -> Optional[Tuple[str, str]]:
+        """
+        Parse the '<role> <location>' arguments shared by register and post
+        
+        Args:
+            content: Text after the command word
+            
+        Returns:
+            Tuple[str, str]: (role, location) if valid, None if invalid
+        """
+        return CommandParser._smart_split_role_location(content.strip())
+    
+    @staticmethod
+    def split_radius(content: str) -> Tuple[str, Optional[float]]:
+        """
+        Split an optional trailing search radius off '<role> <location> [within N km]'
+        
+        Args:
+            content: Text after the command word
+            
+        Returns:
+            Tuple[str, Optional[float]]: (remaining text, radius in km or None)
+        """
+        content = content.strip()
+        match = CommandParser.RADIUS_PATTERN.search(content)
+        if not match:
+            return content, None
+        
+        radius = float(match.group(1))
+        if match.group(2).lower().startswith('mi'):
+            radius *= CommandParser.KM_PER_MILE
+        return content[:match.start()], radius
+    
+    @staticmethod
+    def split_ttl(content: str) -> Tuple[str, Optional[int]]:
+        """
+        Split an optional trailing lifetime off '<role> <location> [for N days]'
+        
+        Args:
+            content: Text after the command word
+            
+        Returns:
+            Tuple[str, Optional[int]]: (remaining text, lifetime in seconds or None)
+        """
+        content = content.strip()
+        match = CommandParser.TTL_PATTERN.search(content)
+        if not match:
+            return content, None
+        
+        unit = match.group(2)[0].lower()
+        return content[:match.start()], int(match.group(1)) * CommandParser.TTL_UNIT_SECONDS[unit]
+    
+    @staticmethod
+    def parse_list_number(content: str) -> Optional[int]:
+        """
+        Parse the position of an item in a numbered list reply, e.g. '2' or '#2'
+        
+        Returns:
+            int: The 1-based position, or None if content is not a number
+        """
+        content = content.strip().lstrip('#')
+        return int(content) if content.isdigit() else None
     
     @staticmethod
     def _smart_split_role_location(content: str) -> Optional[Tuple[str, str]]:
@@ -38,27 +101,22 @@ class CommandParser:
         Returns:
             Tuple[str, str]: (role, location) if successful, None otherwise
         """
-        content_lower = content.lower().strip()
         words = content.split()
         
         if len(words) < 2:
             return None
         
-        # Check for known multi-word locations first
-        for location in CommandParser.COMMON_LOCATIONS:
-            if content_lower.endswith(' ' + location):
-                role = content[:-len(location)].strip()
-                location_proper = content[-len(location):].strip()
-                if role:
-                    return (role, location_proper)
-        
-        # Check if last word is a known single-word location
-        last_word = words[-1].lower()
-        if last_word in CommandParser.COMMON_SINGLE_LOCATIONS:
-            role = ' '.join(words[:-1])
-            location = words[-1]
-            if role:
-                return (role, location)
+        # Longest known location at the end, leaving at least one word of role
+        tokens = Gazetteer.tokenize(content)
+        match = get_gazetteer().match_suffix(tokens[1:])
+        if match:
+            count, place = match
+            role = ' '.join(words[:-count])
+            location = ' '.join(words[-count:])
+            # Alternate names (e.g. "Bombay") resolve to the canonical place name
+            if tokens[-count:] != Gazetteer.tokenize(place.name):
+                location = place.name
+            return (role, location)
         
         # If no known location found, try different splits
         # For "Data Scientist New York", try:
@@ -95,8 +153,7 @@ class CommandParser:
         message = message.strip()
         
         # Match pattern: register followed by content
-        pattern = r'^register\s+(.+)$'
-        match = re.match(pattern, message, re.IGNORECASE)
+        match = CommandParser.REGISTER_PATTERN.match(message)
         
         if match:
             content = match.group(1).strip()
@@ -119,8 +176,7 @@ class CommandParser:
         message = message.strip()
         
         # Match pattern: post followed by content
-        pattern = r'^post\s+(.+)$'
-        match = re.match(pattern, message, re.IGNORECASE)
+        match = CommandParser.POST_PATTERN.match(message)
         
         if match:
             content = match.group(1).strip()
@@ -130,11 +186,11 @@ class CommandParser:
     
     @staticmethod
     def is_help_command(message: str) -> bool:
-        """Check if message is asking for help"""
-        help_keywords = ['help', 'commands', 'how', 'what', 'start', 'hi', 'hello']
-        message_lower = message.lower().strip()
-        
-        return any(keyword in message_lower for keyword in help_keywords)
+        """Check if message is asking for help (whole words only)"""
+        return any(
+            word.strip('.,!?') in CommandParser.HELP_KEYWORDS
+            for word in message.lower().split()
+        )
     
     @staticmethod
     def get_help_message() -> str:
@@ -142,12 +198,23 @@ class CommandParser:
         return (
             "🤖 *Welcome to JobBot!*\n\n"
             "*Available Commands:*\n\n"
-            "📝 *register <role> <location>*\n"
+            "📝 *register <role> <location> [within <N> km]*\n"
             "   Register as a job seeker\n"
-            "   Example: `register developer london`\n\n"
-            "💼 *post <role> <location>*\n"
+            "   Example: `register developer london`\n"
+            "   Example: `register developer pune within 30 km`\n"
+            "   Register again to follow more roles or cities\n\n"
+            "📋 *list*\n"
+            "   Show your subscriptions\n\n"
+            "🗑️ *remove <number>* or *remove all*\n"
+            "   Stop alerts for a subscription\n\n"
+            "📰 *digest on* or *digest off*\n"
+            "   Get matching jobs in one periodic message instead of one by one\n\n"
+            "💼 *post <role> <location> [for <N> days]*\n"
             "   Post a job (for employers)\n"
-            "   Example: `post developer london`\n\n"
+            "   Example: `post developer london`\n"
+            "   Example: `post driver pune for 7 days`\n\n"
+            "🔒 *close <job id>*\n"
+            "   Close a job you posted\n\n"
             "❓ *help*\n"
             "   Show this help message\n\n"
             "_Note: Commands are case-insensitive_"
@@ -161,6 +228,10 @@ class CommandParser:
             "Please use one of these formats:\n"
             "• `register <role> <location>`\n"
             "• `post <role> <location>`\n"
+            "• `list`\n"
+            "• `remove <number>`\n"
+            "• `digest on|off`\n"
+            "• `close <job id>`\n"
             "• `help`\n\n"
             "Type 'help' for more information."
         ) 
\ No newline at end of file
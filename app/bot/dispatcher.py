@@ -0,0 +1,194 @@
+from typing import Callable, List, Optional
+from app.models.user import User
+from app.models.job import Job
+from config.config import Config
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+class DispatchTask:
+    """A job alert fan-out waiting to be sent"""
+    
+    def __init__(self, job: Job, matching_users: List[User], employer_phone: str):
+        self.job = job
+        self.matching_users = matching_users
+        self.employer_phone = employer_phone
+
+class AlertDispatcher:
+    """Background worker pool that sends job alerts off the webhook thread"""
+    
+    # Sentinel placed on the queue to tell a worker to exit
+    _STOP = object()
+    
+    def __init__(self, notification_service, num_workers: int = None, max_queue_size: int = None):
+        self.notification_service = notification_service
+        self.num_workers = num_workers or Config.DISPATCH_WORKERS
+        max_queue_size = Config.DISPATCH_QUEUE_SIZE if max_queue_size is None else max_queue_size
+        
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._accepting = False
+    
+    @property
+    def queue_depth(self) -> int:
+        """Number of fan-outs waiting for a worker"""
+        return self._queue.qsize()
+    
+    def start(self) -> None:
+        """Start the worker threads (no-op if already running)"""
+        with self._lock:
+            if self._accepting:
+                return
+            self._accepting = True
+            for i in range(self.num_workers):
+                worker = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"alert-dispatch-{i}",
+                    daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+        
+        logger.info(f"Alert dispatcher started with {self.num_workers} workers")
+    
+    def submit(self, job: Job, matching_users: List[User], employer_phone: str,
+               timeout: Optional[float] = None) -> bool:
+        """
+        Queue a job alert fan-out for background delivery
+        
+        Args:
+            job: The job posting
+            matching_users: Users to notify
+            employer_phone: Employer to confirm to once the fan-out finishes
+            timeout: Seconds to wait for queue space (defaults to Config.DISPATCH_SUBMIT_TIMEOUT)
+        
+        Returns:
+            bool: True if queued, False if the dispatcher is stopped or full
+        """
+        if not self._accepting:
+            logger.error(f"Dispatcher is not running, dropping alerts for job {job.id}")
+            return False
+        
+        if timeout is None:
+            timeout = Config.DISPATCH_SUBMIT_TIMEOUT
+        
+        try:
+            self._queue.put(DispatchTask(job, matching_users, employer_phone), timeout=timeout)
+        except queue.Full:
+            logger.error(f"Dispatch queue full, could not queue alerts for job {job.id}")
+            return False
+        
+        # Persist the alerts only once they are queued, so a rejected post leaves
+        # nothing for the retry worker to send behind the employer's back. A
+        # worker that gets there first records the same keys, making this a no-op.
+        try:
+            self.notification_service.record_job_alerts(job, matching_users)
+        except Exception as e:
+            logger.error(f"Could not record alerts for job {job.id} in outbox: {str(e)}")
+        return True
+    
+    def shutdown(self, drain: bool = True, timeout: Optional[float] = None) -> None:
+        """
+        Stop accepting work and wait for the workers to exit
+        
+        Args:
+            drain: If True, finish every queued fan-out before stopping
+            timeout: Seconds to wait for each worker (defaults to Config.DISPATCH_DRAIN_TIMEOUT)
+        """
+        with self._lock:
+            if not self._accepting:
+                return
+            self._accepting = False
+            workers, self._workers = self._workers, []
+        
+        if timeout is None:
+            timeout = Config.DISPATCH_DRAIN_TIMEOUT
+        
+        if not drain:
+            dropped = 0
+            while True:
+                try:
+                    self._queue.get_nowait()
+                    self._queue.task_done()
+                    dropped += 1
+                except queue.Empty:
+                    break
+            if dropped:
+                logger.warning(f"Dropped {dropped} queued fan-outs on shutdown")
+        
+        # Stop sentinels go behind any queued work, so draining is implicit
+        for _ in workers:
+            self._queue.put(self._STOP)
+        for worker in workers:
+            worker.join(timeout)
+        
+        logger.info("Alert dispatcher stopped")
+    
+    def _worker_loop(self) -> None:
+        """Take fan-outs off the queue until told to stop"""
+        while True:
+            task = self._queue.get()
+            try:
+                if task is self._STOP:
+                    return
+                self._process(task)
+            finally:
+                self._queue.task_done()
+    
+    def _process(self, task: DispatchTask) -> None:
+        """Send the alerts for one job, then confirm the result to the employer"""
+        try:
+            alert_results = self.notification_service.send_job_alerts(task.job, task.matching_users)
+            self.notification_service.send_job_posted_confirmation(
+                task.employer_phone, task.job, alert_results['sent'] + alert_results.get('digested', 0)
+            )
+        except Exception as e:
+            logger.error(f"Error dispatching alerts for job {task.job.id}: {str(e)}")
+
+class PeriodicWorker:
+    """Background thread that runs a task every interval until stopped"""
+    
+    def __init__(self, name: str, interval: float, fn: Callable[[], object]):
+        """
+        Args:
+            name: Thread name, also used in error logs
+            interval: Seconds between runs
+            fn: Task to run; exceptions are logged and the loop carries on
+        """
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def stopping(self) -> bool:
+        """True once stop has been called, so long-running tasks can bail out"""
+        return self._stop_event.is_set()
+    
+    def start(self) -> None:
+        """Start the loop (no-op if already running)"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+    
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the loop after the current run"""
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join(timeout)
+        self._thread = None
+    
+    def _run(self) -> None:
+        """Run the task every interval until stopped"""
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.fn()
+            except Exception as e:
+                logger.error("Error in %s: %s", self.name, e)
@@ -1,9 +1,22 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, abort, request, jsonify
 from twilio.twiml.messaging_response import MessagingResponse
 from app.bot.commands import CommandParser
+from app.bot.dispatcher import AlertDispatcher, PeriodicWorker
 from app.bot.notifications import NotificationService
-from app.services.matcher_service import MatcherService
+from app.bot.router import CommandRouter
+from app.services.matcher_service import MatcherService, SubscriptionLimitError
+from app.services.message_dedupe import create_message_dedupe
+from app.services.metrics import REGISTRY, STAGE_SECONDS, THROTTLED_MESSAGES
+from app.services.profiler import SamplingProfiler, install_signal_handler
+from app.services.rate_limiter import KeyedRateLimiter
+from app.services.structured_logging import SAMPLED
+from app.services.traffic_recorder import create_traffic_recorder
+from config.config import Config
+from typing import Optional
+import atexit
+import hmac
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -14,13 +27,144 @@ webhook_bp = Blueprint('webhook', __name__)
 matcher_service = MatcherService()
 notification_service = NotificationService()
 command_parser = CommandParser()
+command_router = CommandRouter()
+
+# Replies by MessageSid, so Twilio's redeliveries of a slow webhook are not reprocessed
+message_dedupe = create_message_dedupe()
+
+# Anonymized log of inbound messages for replay benchmarks; None unless WEBHOOK_RECORD_PATH is set
+traffic_recorder = create_traffic_recorder()
+
+# Samples stacks of a fraction of webhook requests once switched on; idle otherwise
+profiler = SamplingProfiler()
+install_signal_handler(profiler)
+
+# Per-sender budgets for the expensive commands. Each worker process sees
+# roughly 1/WORKER_PROCESSES of a sender's messages, so it gets that share
+# of the hourly rate.
+sender_limits = {
+    'post': KeyedRateLimiter(
+        Config.SENDER_POSTS_PER_HOUR / 3600 / Config.WORKER_PROCESSES,
+        Config.SENDER_POST_BURST, Config.SENDER_LIMIT_MAX_TRACKED
+    ),
+    'register': KeyedRateLimiter(
+        Config.SENDER_REGISTRATIONS_PER_HOUR / 3600 / Config.WORKER_PROCESSES,
+        Config.SENDER_REGISTRATION_BURST, Config.SENDER_LIMIT_MAX_TRACKED
+    ),
+}
+
+def _throttled_reply(text: str) -> str:
+    resp = MessagingResponse()
+    resp.message(text)
+    return str(resp)
+
+# Built once so a throttled message costs a dict lookup and a bucket check
+THROTTLED_REPLIES = {
+    'post': _throttled_reply(
+        "⏳ *Too Many Job Posts*\n\n"
+        "You've posted a lot of jobs in a short time. Please wait a while before posting again."
+    ),
+    'register': _throttled_reply(
+        "⏳ *Too Many Registrations*\n\n"
+        "Please wait a while before registering again. Send 'list' to see your subscriptions."
+    ),
+}
+
+# Job alert fan-out runs on background workers so the webhook returns quickly
+alert_dispatcher = AlertDispatcher(notification_service)
+alert_dispatcher.start()
+
+def _retry_outbox() -> None:
+    """Replay failed or unsent alerts, then prune delivered or dead entries"""
+    try:
+        notification_service.retry_pending_alerts()
+    finally:
+        pruned = notification_service.outbox.prune(Config.OUTBOX_RETENTION_DAYS * 86400)
+        if pruned:
+            logger.info("Pruned %d delivered or dead outbox entries", pruned)
+
+def _send_digests() -> None:
+    """Send due digests, going on while full batches come back so a backlog drains in one sweep"""
+    while notification_service.send_digests()['total'] >= Config.OUTBOX_BATCH_SIZE:
+        if digest_worker.stopping:
+            break
+
+# Failed or interrupted alerts are replayed from the durable outbox
+outbox_retry_worker = PeriodicWorker('outbox-retry', Config.OUTBOX_RETRY_INTERVAL, _retry_outbox)
+outbox_retry_worker.start()
+
+# Alerts held for digest users are combined and sent on a schedule
+digest_worker = PeriodicWorker('digest-flush', Config.DIGEST_FLUSH_INTERVAL, _send_digests)
+digest_worker.start()
+
+# Jobs past their TTL are swept out of storage and every index
+job_expiry_worker = PeriodicWorker('job-expiry', Config.JOB_EXPIRY_INTERVAL, matcher_service.expire_jobs)
+job_expiry_worker.start()
+
+# Stage timers are resolved once so the hot path skips the label lookup
+_WEBHOOK_SECONDS = STAGE_SECONDS.labels('webhook')
+_PARSE_SECONDS = STAGE_SECONDS.labels('parse')
+_MATCH_SECONDS = STAGE_SECONDS.labels('match')
+
+REGISTRY.gauge('jobbot_dispatch_queue_depth', 'Job fan-outs waiting for a dispatch worker',
+               lambda: alert_dispatcher.queue_depth)
+REGISTRY.gauge('jobbot_outbox_pending', 'Alerts recorded in the outbox but not yet delivered',
+               notification_service.outbox.count_pending)
+REGISTRY.gauge('jobbot_digest_buffered', 'Alerts waiting for a digest message',
+               notification_service.outbox.count_buffered)
+REGISTRY.gauge('jobbot_users', 'Registered job seekers', matcher_service.repository.count_users)
+REGISTRY.gauge('jobbot_active_users', 'Job seekers receiving alerts',
+               matcher_service.repository.count_active_users)
+REGISTRY.gauge('jobbot_jobs', 'Stored job postings', matcher_service.repository.count_jobs)
+
+# atexit runs handlers in reverse order: drain queued alerts, then close Twilio
+atexit.register(notification_service.twilio_service.close)
+atexit.register(message_dedupe.close)
+if traffic_recorder is not None:
+    atexit.register(traffic_recorder.close)
+atexit.register(outbox_retry_worker.stop)
+atexit.register(digest_worker.stop)
+atexit.register(job_expiry_worker.stop)
+atexit.register(alert_dispatcher.shutdown)
 
 @webhook_bp.route('/webhook', methods=['POST'])
 def webhook():
     """
     Main webhook endpoint for receiving WhatsApp messages from Twilio
     """
+    if profiler.active and profiler.should_sample():
+        with profiler.track():
+            return _serve_webhook()
+    return _serve_webhook()
+
+def _serve_webhook() -> str:
+    """Time the webhook and add it to the traffic log if recording"""
+    if traffic_recorder is None:
+        with _WEBHOOK_SECONDS.time():
+            return _handle_webhook()
+    
+    received_at = time.time()
+    start = time.perf_counter()
+    with _WEBHOOK_SECONDS.time():
+        reply = _handle_webhook()
+    traffic_recorder.record(
+        request.values.get('From', ''), request.values.get('Body', ''),
+        received_at, time.perf_counter() - start
+    )
+    return reply
+
+def _handle_webhook() -> str:
+    """Reply to one webhook delivery, deduplicated and throttled"""
+    message_sid = request.values.get('MessageSid')
+    claimed = False
     try:
+        # A redelivery gets the first delivery's reply instead of running again
+        if message_sid:
+            claimed, cached = message_dedupe.claim(message_sid)
+            if not claimed:
+                logger.info("Duplicate delivery of %s, replying from cache", message_sid)
+                return cached if cached is not None else str(MessagingResponse())
+        
         # Get incoming message data
         incoming_msg = request.values.get('Body', '').strip()
         from_number = request.values.get('From', '')
@@ -29,7 +173,18 @@ def webhook():
         if from_number.startswith('whatsapp:'):
             from_number = from_number[9:]
         
-        logger.info(f"Received message from {from_number}: {incoming_msg}")
+        # Senders over their post/register budget are turned away before any matching work
+        command = CommandRouter.split(incoming_msg)[0]
+        logger.info("Received '%s' from %s", command, from_number, extra=SAMPLED)
+        logger.debug("Message body from %s: %s", from_number, incoming_msg)
+        limiter = sender_limits.get(command)
+        if limiter is not None and not limiter.try_acquire(from_number):
+            logger.warning("Throttled '%s' from %s", command, from_number)
+            THROTTLED_MESSAGES.labels(command).inc()
+            reply = THROTTLED_REPLIES[command]
+            if claimed:
+                message_dedupe.complete(message_sid, reply)
+            return reply
         
         # Create Twilio response object
         resp = MessagingResponse()
@@ -40,10 +195,15 @@ def webhook():
         # Add response to Twilio response
         resp.message(response_message)
         
-        return str(resp)
+        reply = str(resp)
+        if claimed:
+            message_dedupe.complete(message_sid, reply)
+        return reply
         
     except Exception as e:
         logger.error(f"Error processing webhook: {str(e)}")
+        if claimed:
+            message_dedupe.release(message_sid)
         resp = MessagingResponse()
         resp.message("Sorry, something went wrong. Please try again later.")
         return str(resp)
@@ -60,22 +220,15 @@ def process_message(message: str, phone_number: str) -> str:
         str: Response message to send back
     """
     try:
-        # Check for help command
+        # Route on the first word through the command table
+        response = command_router.dispatch(message, phone_number)
+        if response is not None:
+            return response
+        
+        # Free-form questions like "what can you do" still get help
         if command_parser.is_help_command(message):
             return command_parser.get_help_message()
         
-        # Try to parse register command
-        register_params = command_parser.parse_register_command(message)
-        if register_params:
-            role, location = register_params
-            return handle_register_command(phone_number, role, location)
-        
-        # Try to parse post command
-        post_params = command_parser.parse_post_command(message)
-        if post_params:
-            role, location = post_params
-            return handle_post_command(phone_number, role, location)
-        
         # If no valid command found
         return command_parser.get_invalid_command_message()
         
@@ -83,7 +236,72 @@ def process_message(message: str, phone_number: str) -> str:
         logger.error(f"Error processing message from {phone_number}: {str(e)}")
         return "Sorry, something went wrong. Please try again later."
 
-def handle_register_command(phone_number: str, role: str, location: str) -> str:
+@command_router.command('help', 'commands', 'start', 'hi', 'hello')
+def route_help(phone_number: str, args: str) -> str:
+    """Reply with the help message"""
+    return command_parser.get_help_message()
+
+@command_router.command('register')
+def route_register(phone_number: str, args: str) -> str:
+    """Parse 'register <role> <location> [within <N> km]' and register the sender"""
+    with _PARSE_SECONDS.time():
+        args, radius_km = command_parser.split_radius(args)
+        params = command_parser.parse_role_location(args)
+    if not params:
+        return command_parser.get_invalid_command_message()
+    role, location = params
+    return handle_register_command(phone_number, role, location, radius_km)
+
+@command_router.command('list', 'subscriptions')
+def route_list(phone_number: str, args: str) -> str:
+    """List the sender's subscriptions"""
+    return handle_list_command(phone_number)
+
+@command_router.command('remove', 'unsubscribe')
+def route_remove(phone_number: str, args: str) -> str:
+    """Parse 'remove <number>|all' and delete the sender's subscriptions"""
+    target = args.strip().lower()
+    if target == 'all':
+        return handle_remove_command(phone_number, None)
+    number = command_parser.parse_list_number(target)
+    if number is None:
+        return command_parser.get_invalid_command_message()
+    return handle_remove_command(phone_number, number)
+
+@command_router.command('digest')
+def route_digest(phone_number: str, args: str) -> str:
+    """Parse 'digest on|off' and switch the sender's delivery mode"""
+    mode = args.strip().lower()
+    if mode not in ('on', 'off'):
+        return command_parser.get_invalid_command_message()
+    return handle_digest_command(phone_number, mode == 'on')
+
+@command_router.command('post')
+def route_post(phone_number: str, args: str) -> str:
+    """Parse 'post <role> <location> [for <N> days]' and post the job"""
+    with _PARSE_SECONDS.time():
+        args, ttl_seconds = command_parser.split_ttl(args)
+        params = command_parser.parse_role_location(args)
+    if not params:
+        return command_parser.get_invalid_command_message()
+    if ttl_seconds == 0:
+        return (
+            "❌ A job has to stay open for at least an hour.\n\n"
+            "Usage: `post <role> <location> [for <N> hours|days|weeks]`"
+        )
+    role, location = params
+    return handle_post_command(phone_number, role, location, ttl_seconds)
+
+@command_router.command('close')
+def route_close(phone_number: str, args: str) -> str:
+    """Parse 'close <job id>' and close the sender's job"""
+    job_id = args.strip().lower()
+    if not job_id or ' ' in job_id:
+        return command_parser.get_invalid_command_message()
+    return handle_close_command(phone_number, job_id)
+
+def handle_register_command(phone_number: str, role: str, location: str,
+                            radius_km: Optional[float] = None) -> str:
     """
     Handle user registration command
     
@@ -91,40 +309,183 @@ def handle_register_command(phone_number: str, role: str, location: str) -> str:
         phone_number: User's phone number
         role: Desired job role
         location: Preferred location
+        radius_km: Optional search radius around the location
         
     Returns:
         str: Response message
     """
     try:
-        # Register user with matcher service
-        success = matcher_service.register_user(phone_number, role, location)
-        
-        if success:
-            # Get user object for confirmation
-            user = matcher_service.get_user_by_phone(phone_number)
-            
-            # Send confirmation (this will be sent separately via Twilio)
-            notification_service.send_registration_confirmation(user)
-            
-            # Return immediate response
+        # Add the subscription alongside any the user already has
+        subscription, _ = matcher_service.add_subscription(
+            phone_number, role, location, radius_km or 0.0
+        )
+        
+        # Get user object for confirmation
+        user = matcher_service.get_user_by_phone(phone_number)
+        
+        # Send confirmation (this will be sent separately via Twilio)
+        notification_service.send_registration_confirmation(user, subscription)
+        
+        # Jobs posted before the user registered
+        recent_jobs = matcher_service.get_recent_jobs(role, location)
+        
+        # Return immediate response
+        return (
+            f"✅ *Registration Successful!*\n\n"
+            f"You're now registered for:\n"
+            f"*Role:* {role.title()}\n"
+            f"*Location:* {location.title()}\n"
+            f"{format_radius_line(subscription, radius_km)}\n"
+            f"You'll receive alerts when matching jobs are posted!\n"
+            f"You have *{user.subscription_count}* subscription(s). Send 'list' to see them."
+            f"{format_recent_jobs(recent_jobs)}"
+        )
+        
+    except SubscriptionLimitError:
+        return (
+            f"❌ *Subscription Limit Reached*\n\n"
+            f"You can follow up to {Config.MAX_SUBSCRIPTIONS_PER_USER} role/location pairs. "
+            f"Send 'list' to see them and 'remove <number>' to free one up."
+        )
+    except Exception as e:
+        logger.error(f"Error in register command: {str(e)}")
+        return "❌ Registration failed. Please try again later."
+
+def format_radius_line(subscription, radius_km: Optional[float]) -> str:
+    """Describe the search radius a registration ended up with"""
+    if subscription.has_radius:
+        return f"*Radius:* {round(subscription.radius_km, 1):g} km\n"
+    if radius_km:
+        return "_We don't know where that location is, so only exact matches apply._\n"
+    return ""
+
+def format_recent_jobs(jobs) -> str:
+    """Section listing already-posted jobs, or nothing if there are none"""
+    if not jobs:
+        return ""
+    lines = [
+        f"• {job.role.title()} in {job.location.title()} "
+        f"(ID {job.id}, posted {job.created_at.strftime('%Y-%m-%d')})"
+        for job in jobs
+    ]
+    return "\n\n📌 *Latest matching jobs:*\n" + "\n".join(lines)
+
+def format_subscription(subscription) -> str:
+    """One-line description of a subscription"""
+    text = f"{subscription.role.title()} in {subscription.location.title()}"
+    if subscription.has_radius:
+        text += f" (within {round(subscription.radius_km, 1):g} km)"
+    return text
+
+def handle_list_command(phone_number: str) -> str:
+    """
+    Handle listing a user's subscriptions
+    
+    Args:
+        phone_number: User's phone number
+        
+    Returns:
+        str: Response message
+    """
+    try:
+        subscriptions = matcher_service.list_subscriptions(phone_number)
+        if not subscriptions:
             return (
-                f"✅ *Registration Successful!*\n\n"
-                f"You're now registered for:\n"
-                f"*Role:* {role.title()}\n"
-                f"*Location:* {location.title()}\n\n"
-                f"You'll receive alerts when matching jobs are posted!"
+                "📭 *No Subscriptions*\n\n"
+                "Send `register <role> <location>` to start getting job alerts."
             )
-        else:
+        
+        lines = [
+            f"{number}. {format_subscription(subscription)}"
+            for number, subscription in enumerate(subscriptions, 1)
+        ]
+        return (
+            f"📋 *Your Subscriptions*\n\n"
+            + "\n".join(lines)
+            + "\n\nSend 'remove <number>' to stop one, or 'remove all'."
+        )
+        
+    except Exception as e:
+        logger.error(f"Error in list command: {str(e)}")
+        return "❌ Could not list your subscriptions. Please try again later."
+
+def handle_remove_command(phone_number: str, number: Optional[int]) -> str:
+    """
+    Handle removing one or all of a user's subscriptions
+    
+    Args:
+        phone_number: User's phone number
+        number: 1-based position in the 'list' reply, or None for all
+        
+    Returns:
+        str: Response message
+    """
+    try:
+        subscriptions = matcher_service.list_subscriptions(phone_number)
+        if not subscriptions:
+            return "📭 You don't have any subscriptions to remove."
+        
+        if number is None:
+            for subscription in subscriptions:
+                matcher_service.remove_subscription(phone_number, subscription.id)
             return (
-                "❌ *Registration Failed*\n\n"
-                "There was an issue with your registration. Please try again."
+                f"🗑️ *All Subscriptions Removed*\n\n"
+                f"You won't receive job alerts until you register again."
             )
-            
+        
+        if not 1 <= number <= len(subscriptions):
+            return f"❌ You don't have a subscription #{number}. Send 'list' to see yours."
+        
+        subscription = subscriptions[number - 1]
+        matcher_service.remove_subscription(phone_number, subscription.id)
+        return (
+            f"🗑️ *Subscription Removed*\n\n"
+            f"{format_subscription(subscription)}\n\n"
+            f"You have *{len(subscriptions) - 1}* subscription(s) left."
+        )
+        
     except Exception as e:
-        logger.error(f"Error in register command: {str(e)}")
-        return "❌ Registration failed. Please try again later."
+        logger.error(f"Error in remove command: {str(e)}")
+        return "❌ Could not remove the subscription. Please try again later."
 
-def handle_post_command(phone_number: str, role: str, location: str) -> str:
+def handle_digest_command(phone_number: str, enabled: bool) -> str:
+    """
+    Handle switching a user between instant alerts and digests
+    
+    Args:
+        phone_number: User's phone number
+        enabled: True to batch alerts into digests
+        
+    Returns:
+        str: Response message
+    """
+    try:
+        if not matcher_service.set_digest_mode(phone_number, enabled):
+            return (
+                "📭 *No Subscriptions*\n\n"
+                "Send `register <role> <location>` to start getting job alerts."
+            )
+        
+        if enabled:
+            hours = Config.DIGEST_INTERVAL / 3600
+            return (
+                f"📰 *Digest Mode On*\n\n"
+                f"Matching jobs will be collected and sent together at most every "
+                f"{hours:g} hour(s), or as soon as {Config.DIGEST_MAX_JOBS} are waiting.\n"
+                f"Send 'digest off' to get each job as soon as it is posted."
+            )
+        return (
+            "🔔 *Digest Mode Off*\n\n"
+            "You'll get an alert as soon as each matching job is posted. "
+            "Jobs already collected will still arrive in one last digest."
+        )
+        
+    except Exception as e:
+        logger.error(f"Error in digest command: {str(e)}")
+        return "❌ Could not change your alert settings. Please try again later."
+
+def handle_post_command(phone_number: str, role: str, location: str,
+                        ttl_seconds: Optional[int] = None) -> str:
     """
     Handle job posting command
     
@@ -132,38 +493,72 @@ def handle_post_command(phone_number: str, role: str, location: str) -> str:
         phone_number: Employer's phone number
         role: Job role
         location: Job location
+        ttl_seconds: Optional listing lifetime requested by the employer
         
     Returns:
         str: Response message
     """
     try:
         # Post the job
-        job = matcher_service.post_job(phone_number, role, location)
+        job = matcher_service.post_job(phone_number, role, location, ttl_seconds)
         
         # Find matching users
-        matching_users = matcher_service.find_matching_users(job)
+        with _MATCH_SECONDS.time():
+            matching_users = matcher_service.find_matching_users(job)
         
-        # Send alerts to matching users
-        alert_results = notification_service.send_job_alerts(job, matching_users)
-        
-        # Send confirmation to employer
-        notification_service.send_job_posted_confirmation(
-            phone_number, job, alert_results['sent']
-        )
+        # Queue the alerts; the employer is confirmed once the fan-out finishes
+        if not alert_dispatcher.submit(job, matching_users, phone_number):
+            return (
+                f"⚠️ *Job Posted*\n\n"
+                f"*Job ID:* {job.id}\n\n"
+                f"We're experiencing high load and could not send alerts right now. "
+                f"Please try posting again in a few minutes."
+            )
         
         # Return immediate response
         return (
             f"✅ *Job Posted Successfully!*\n\n"
             f"*Job ID:* {job.id}\n"
             f"*Role:* {role.title()}\n"
-            f"*Location:* {location.title()}\n\n"
-            f"📢 *{alert_results['sent']} job seekers* have been notified!"
+            f"*Location:* {location.title()}\n"
+            f"{format_expiry_line(job)}\n"
+            f"📢 Notifying *{len(matching_users)} job seekers*. "
+            f"You'll get a confirmation once the alerts have been sent."
         )
         
     except Exception as e:
         logger.error(f"Error in post command: {str(e)}")
         return "❌ Job posting failed. Please try again later."
 
+def format_expiry_line(job) -> str:
+    """Tell the employer when a job stops being listed"""
+    if job.expires_at is None:
+        return ""
+    return f"*Open until:* {job.expires_at.strftime('%Y-%m-%d %H:%M')} (send 'close {job.id}' to end early)\n"
+
+def handle_close_command(phone_number: str, job_id: str) -> str:
+    """
+    Handle closing a job posting
+    
+    Args:
+        phone_number: Employer's phone number
+        job_id: ID of the job to close
+        
+    Returns:
+        str: Response message
+    """
+    try:
+        if matcher_service.close_job(phone_number, job_id):
+            return (
+                f"🔒 *Job Closed*\n\n"
+                f"Job {job_id} is no longer listed and won't be shown to job seekers."
+            )
+        return f"❌ No open job with ID {job_id} was posted from this number."
+        
+    except Exception as e:
+        logger.error(f"Error in close command: {str(e)}")
+        return "❌ Could not close the job. Please try again later."
+
 @webhook_bp.route('/status', methods=['GET'])
 def status():
     """
@@ -177,4 +572,53 @@ def status():
         })
     except Exception as e:
         logger.error(f"Error getting status: {str(e)}")
-        return jsonify({'status': 'error', 'message': str(e)}), 500
\ No newline at end of file
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+@webhook_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Prometheus scrape endpoint (per worker process)
+    """
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@webhook_bp.route('/admin/profiler', methods=['GET', 'POST'])
+def admin_profiler():
+    """
+    Inspect or control the webhook profiler (per worker process)
+    
+    POST action=start [fraction, interval, duration], action=stop or
+    action=dump; stop and dump reply with the collapsed-stack file path.
+    Requires the X-Admin-Token header to match ADMIN_TOKEN.
+    """
+    token = request.headers.get('X-Admin-Token', '')
+    if not Config.ADMIN_TOKEN:
+        abort(404)
+    if not hmac.compare_digest(token.encode(), Config.ADMIN_TOKEN.encode()):
+        abort(403)
+    
+    if request.method == 'GET':
+        return jsonify(profiler.status())
+    
+    action = request.values.get('action', '')
+    try:
+        if action == 'start':
+            started = profiler.start(
+                fraction=request.values.get('fraction', type=float),
+                interval=request.values.get('interval', type=float),
+                duration=request.values.get('duration', type=float),
+            )
+            if not started:
+                return jsonify({'error': 'profiler is already running', **profiler.status()}), 409
+            return jsonify(profiler.status())
+        if action == 'stop':
+            path = profiler.stop()
+            if path is None:
+                return jsonify({'error': 'profiler is not running', **profiler.status()}), 409
+            return jsonify({'path': path, **profiler.status()})
+        if action == 'dump':
+            return jsonify({'path': profiler.dump(), **profiler.status()})
+    except OSError as e:
+        logger.error(f"Could not write profile: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({'error': "action must be 'start', 'stop' or 'dump'"}), 400
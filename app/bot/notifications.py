@@ -1,23 +1,67 @@
-from typing import List
+from typing import Dict, List
 from app.models.user import User
 from app.models.job import Job
+from app.models.subscription import Subscription
+from app.services.metrics import STAGE_SECONDS
+from app.services.outbox import NotificationOutbox, OutboxEntry
 from app.services.twilio_service import TwilioService
+from config.config import Config
+from datetime import datetime
 import logging
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+_RENDER_SECONDS = STAGE_SECONDS.labels('render')
+
 class NotificationService:
     """Service for sending job notifications to users"""
     
-    def __init__(self):
+    def __init__(self, outbox: NotificationOutbox = None):
         self.twilio_service = TwilioService()
+        self.outbox = outbox or NotificationOutbox()
+    
+    def record_job_alerts(self, job: Job, matching_users: List[User]) -> int:
+        """
+        Durably record the alerts for a job before any are sent
+        
+        Args:
+            job: The job posting
+            matching_users: List of users to notify
+            
+        Returns:
+            int: Number of alerts newly recorded
+        """
+        if not matching_users:
+            return 0
+        
+        instant_users = [user for user in matching_users if not user.digest]
+        alert_message = job.get_alert_message()
+        recorded = self.outbox.enqueue_many(
+            (NotificationOutbox.make_key(job.id, user.phone_number), user.phone_number, alert_message)
+            for user in instant_users
+        )
+        if len(instant_users) < len(matching_users):
+            recorded += self._buffer_digest(job, matching_users)
+        return recorded
+    
+    def _buffer_digest(self, job: Job, matching_users: List[User]) -> int:
+        """Hold a job's alert for the matching users in digest mode"""
+        line = self.format_digest_line(job)
+        return self.outbox.buffer_digest_items(
+            (user.phone_number, job.id, line) for user in matching_users if user.digest
+        )
     
     def send_job_alerts(self, job: Job, matching_users: List[User]) -> dict:
         """
         Send job alerts to all matching users
         
+        Alerts go through the outbox: each one is recorded, claimed and then
+        marked sent or failed, so alerts that already went out are skipped
+        and failures are retried later by retry_pending_alerts. Users in
+        digest mode only have the alert buffered for send_digests.
+        
         Args:
             job: The job posting
             matching_users: List of users to notify
@@ -26,44 +70,176 @@ class NotificationService:
             dict: Summary of notification results
         """
         if not matching_users:
-            logger.info(f"No matching users found for job {job.id}")
+            logger.info("No matching users found for job %s", job.id)
             return {'sent': 0, 'failed': 0, 'total': 0}
         
+        # Digest users get this job in their next periodic summary instead
+        digested = sum(1 for user in matching_users if user.digest)
+        if digested:
+            self._buffer_digest(job, matching_users)
+        
         # Prepare the alert message
-        alert_message = job.get_alert_message()
+        with _RENDER_SECONDS.time():
+            alert_message = job.get_alert_message()
+        
+        # Get phone numbers of users alerted right away
+        phone_numbers = [user.phone_number for user in matching_users if not user.digest]
+        keys = {phone: NotificationOutbox.make_key(job.id, phone) for phone in phone_numbers}
         
-        # Get phone numbers of matching users
-        phone_numbers = [user.phone_number for user in matching_users]
+        # Record (no-op if already recorded) and claim the alerts we may send
+        self.outbox.enqueue_many((keys[phone], phone, alert_message) for phone in phone_numbers)
+        claimed = set(self.outbox.claim_many(keys.values()))
+        recipients = [phone for phone in phone_numbers if keys[phone] in claimed]
         
-        logger.info(f"Sending job alerts for {job.id} to {len(phone_numbers)} users")
+        logger.info("Sending job alerts for %s to %d users", job.id, len(recipients))
         
         # Send bulk messages
-        results = self.twilio_service.send_bulk_messages(phone_numbers, alert_message)
-        results['total'] = len(phone_numbers)
+        results = self.twilio_service.send_bulk_messages(
+            recipients, alert_message,
+            on_result=lambda phone, sent: self._record_result(keys[phone], sent)
+        )
+        results['total'] = len(matching_users)
+        results['skipped'] = len(phone_numbers) - len(recipients)
+        results['digested'] = digested
         
-        logger.info(f"Job alert results: {results}")
+        logger.info("Job alert results: %s", results)
         return results
     
-    def send_registration_confirmation(self, user: User) -> bool:
+    def retry_pending_alerts(self, batch_size: int = None) -> dict:
+        """
+        Replay alerts that failed or were never sent, e.g. after a restart
+        
+        Sends left unfinished by a crash are first checked against Twilio's
+        message log so an alert that already went out is not sent twice.
+        
+        Args:
+            batch_size: Maximum number of alerts to retry in this pass
+            
+        Returns:
+            dict: Summary of retry results
+        """
+        for entry in self.outbox.find_stale(Config.OUTBOX_STALE_AFTER):
+            try:
+                since = datetime.fromtimestamp(entry.updated_at)
+                delivered = self.twilio_service.find_sent_message(entry.to_number, entry.body, since)
+            except Exception as e:
+                logger.error(f"Could not reconcile outbox entry {entry.idempotency_key}: {str(e)}")
+                continue
+            self._record_result(entry.idempotency_key, delivered)
+        
+        entries = self.outbox.claim_due(batch_size or Config.OUTBOX_BATCH_SIZE)
+        results = {'sent': 0, 'failed': 0, 'errors': [], 'total': len(entries)}
+        if not entries:
+            return results
+        
+        # Alerts for the same job share a body, so send them as one bulk batch
+        batches: Dict[str, List[OutboxEntry]] = {}
+        for entry in entries:
+            batches.setdefault(entry.body, []).append(entry)
+        
+        for body, batch in batches.items():
+            keys = {entry.to_number: entry.idempotency_key for entry in batch}
+            batch_results = self.twilio_service.send_bulk_messages(
+                list(keys), body,
+                on_result=lambda phone, sent, keys=keys: self._record_result(keys[phone], sent)
+            )
+            results['sent'] += batch_results['sent']
+            results['failed'] += batch_results['failed']
+            results['errors'].extend(batch_results['errors'])
+        
+        logger.info("Outbox retry results: %s", results)
+        return results
+    
+    def send_digests(self, max_items: int = None, max_age: float = None) -> dict:
+        """
+        Send a combined message to every digest user who is due one
+        
+        A user is due once Config.DIGEST_MAX_JOBS alerts are buffered or the
+        oldest has waited Config.DIGEST_INTERVAL seconds. Digests are
+        recorded in the outbox, so failures are retried like any alert.
+        
+        Args:
+            max_items: Alerts per digest (defaults to Config.DIGEST_MAX_JOBS)
+            max_age: Longest wait in seconds (defaults to Config.DIGEST_INTERVAL)
+            
+        Returns:
+            dict: Summary of digest results
+        """
+        entries = self.outbox.claim_digests(
+            max_items or Config.DIGEST_MAX_JOBS,
+            Config.DIGEST_INTERVAL if max_age is None else max_age,
+            Config.OUTBOX_BATCH_SIZE,
+            self.format_digest_message
+        )
+        if not entries:
+            return {'sent': 0, 'failed': 0, 'errors': [], 'total': 0}
+        
+        # One digest per recipient per pass, so the phone number identifies the entry
+        keys = {entry.to_number: entry.idempotency_key for entry in entries}
+        results = self.twilio_service.send_messages(
+            [(entry.to_number, entry.body) for entry in entries],
+            on_result=lambda phone, sent: self._record_result(keys[phone], sent)
+        )
+        results['total'] = len(entries)
+        
+        logger.info("Digest results: %s", results)
+        return results
+    
+    @staticmethod
+    def format_digest_line(job: Job) -> str:
+        """One job's entry in a digest message"""
+        return f"• {job.role.title()} in {job.location.title()} (ID {job.id})"
+    
+    @staticmethod
+    def format_digest_message(lines: List[str]) -> str:
+        """Combine buffered job lines into one digest message"""
+        return (
+            f"📰 *Job Digest*\n\n"
+            f"{len(lines)} new job(s) matching your subscriptions:\n"
+            + "\n".join(lines)
+            + "\n\nSend 'digest off' to get each job as soon as it is posted."
+        )
+    
+    def _record_result(self, key: str, sent: bool) -> None:
+        """Mark an outbox entry as sent or failed"""
+        if sent:
+            self.outbox.mark_sent(key)
+        else:
+            self.outbox.mark_failed(key, "send failed")
+    
+    def send_registration_confirmation(self, user: User, subscription: Subscription) -> bool:
         """
         Send confirmation message to newly registered user
         
+        This runs on the webhook thread, so the send is tried once and
+        waits at most Config.TWILIO_INLINE_SEND_WAIT seconds for a
+        rate-limit slot; the webhook reply already confirms the
+        registration if it is dropped.
+        
         Args:
             user: The registered user
+            subscription: The subscription they just added
             
         Returns:
             bool: True if sent successfully
         """
+        radius_line = (
+            f"*Radius:* {round(subscription.radius_km, 1):g} km\n" if subscription.has_radius else ""
+        )
         message = (
             f"✅ *Registration Successful!*\n\n"
             f"You're now registered for:\n"
-            f"*Role:* {user.role.title()}\n"
-            f"*Location:* {user.location.title()}\n\n"
+            f"*Role:* {subscription.role.title()}\n"
+            f"*Location:* {subscription.location.title()}\n"
+            f"{radius_line}\n"
             f"You'll receive alerts when matching jobs are posted!\n\n"
-            f"To update your preferences, just register again with new details."
+            f"To follow another role or city, just register again. "
+            f"You have {user.subscription_count} subscription(s); send 'list' to see them."
         )
         
-        return self.twilio_service.send_message(user.phone_number, message)
+        return self.twilio_service.send_message(
+            user.phone_number, message, retry=False, wait=Config.TWILIO_INLINE_SEND_WAIT
+        )
     
     def send_job_posted_confirmation(self, employer_phone: str, job: Job, alert_count: int) -> bool:
         """
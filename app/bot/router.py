@@ -0,0 +1,63 @@
+from typing import Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# A command handler receives the sender's phone number and the text after
+# the command word, and returns the reply
+CommandHandler = Callable[[str, str], str]
+
+class CommandRouter:
+    """
+    Dispatches messages to command handlers by their first word
+    
+    Each message is split once into a command word and its arguments and
+    routed with a single dict lookup, so registering more commands adds no
+    per-message cost.
+    """
+    
+    def __init__(self):
+        self._routes: Dict[str, CommandHandler] = {}
+    
+    def command(self, *keywords: str) -> Callable[[CommandHandler], CommandHandler]:
+        """Decorator registering a handler under one or more command words"""
+        def decorator(handler: CommandHandler) -> CommandHandler:
+            for keyword in keywords:
+                self.add_route(keyword, handler)
+            return handler
+        return decorator
+    
+    def add_route(self, keyword: str, handler: CommandHandler) -> None:
+        """Register a handler for a command word (case-insensitive)"""
+        keyword = keyword.lower()
+        if keyword in self._routes:
+            raise ValueError(f"Command already registered: {keyword}")
+        self._routes[keyword] = handler
+    
+    @staticmethod
+    def split(message: str) -> tuple:
+        """Split a message into (lowercase command word, argument text)"""
+        parts = message.split(None, 1)
+        if not parts:
+            return '', ''
+        return parts[0].lower(), parts[1].strip() if len(parts) > 1 else ''
+    
+    def dispatch(self, message: str, phone_number: str) -> Optional[str]:
+        """
+        Route a message to the handler for its first word
+        
+        Args:
+            message: The incoming message text
+            phone_number: Sender's phone number
+            
+        Returns:
+            str: The handler's reply, or None if no command matched
+        """
+        keyword, args = self.split(message)
+        handler = self._routes.get(keyword)
+        if handler is None:
+            return None
+        return handler(phone_number, args)
+    
+    def __contains__(self, keyword: str) -> bool:
+        return keyword.lower() in self._routes
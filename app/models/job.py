@@ -1,19 +1,78 @@
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
+from app.models.vocabulary import LOCATIONS, ROLES
+import time
 import uuid
 
 class Job:
     """Represents a job posting"""
     
-    def __init__(self, employer_phone: str, role: str, location: str, description: Optional[str] = None):
+    # Same compact layout as User: vocabulary IDs and epoch-second timestamps
+    __slots__ = (
+        'id', 'employer_phone', 'role_id', 'location_id',
+        'description', '_created_ts', 'expires_ts', 'is_active'
+    )
+    
+    def __init__(self, employer_phone: str, role: str, location: str, description: Optional[str] = None,
+                 ttl_seconds: Optional[int] = None):
         self.id = str(uuid.uuid4())[:8]  # Short unique ID
         self.employer_phone = employer_phone
         self.role = role.lower().strip()
         self.location = location.lower().strip()
         self.description = description or f"{role} position in {location}"
-        self.created_at = datetime.now()
+        self._created_ts = int(time.time())
+        # Epoch second the job stops being listed, or None to keep it open
+        self.expires_ts = self._created_ts + int(ttl_seconds) if ttl_seconds else None
         self.is_active = True
     
+    @property
+    def role(self) -> str:
+        return ROLES.value(self.role_id)
+    
+    @role.setter
+    def role(self, value: str) -> None:
+        self.role_id = ROLES.intern(value)
+    
+    @property
+    def location(self) -> str:
+        return LOCATIONS.value(self.location_id)
+    
+    @location.setter
+    def location(self, value: str) -> None:
+        self.location_id = LOCATIONS.intern(value)
+    
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self._created_ts)
+    
+    @created_at.setter
+    def created_at(self, value: datetime) -> None:
+        self._created_ts = int(value.timestamp())
+    
+    @property
+    def expires_at(self) -> Optional[datetime]:
+        return datetime.fromtimestamp(self.expires_ts) if self.expires_ts is not None else None
+    
+    @expires_at.setter
+    def expires_at(self, value: Optional[datetime]) -> None:
+        self.expires_ts = int(value.timestamp()) if value is not None else None
+    
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        """Whether the job's TTL has run out"""
+        if self.expires_ts is None:
+            return False
+        return self.expires_ts <= (time.time() if now is None else now)
+    
+    @property
+    def match_key(self) -> Tuple[str, str]:
+        """Normalized (role, location) pair used by the match index"""
+        return (self.role, self.location)
+    
+    @property
+    def match_ids(self) -> Tuple[int, int]:
+        """Interned (role, location) IDs used as compact index keys"""
+        return (self.role_id, self.location_id)
+    
     def to_dict(self) -> dict:
         """Convert job to dictionary representation"""
         return {
@@ -23,17 +82,23 @@ class Job:
             'location': self.location,
             'description': self.description,
             'created_at': self.created_at.isoformat(),
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
             'is_active': self.is_active
         }
     
     def get_alert_message(self) -> str:
         """Generate alert message for job seekers"""
+        expires_line = (
+            f"*Open until:* {self.expires_at.strftime('%Y-%m-%d')}\n" if self.expires_at else ""
+        )
         return (
             f"🎯 *New Job Alert!*\n\n"
+            f"*Job ID:* {self.id}\n"
             f"*Role:* {self.role.title()}\n"
             f"*Location:* {self.location.title()}\n"
             f"*Description:* {self.description}\n"
-            f"*Posted:* {self.created_at.strftime('%Y-%m-%d %H:%M')}\n\n"
+            f"*Posted:* {self.created_at.strftime('%Y-%m-%d %H:%M')}\n"
+            f"{expires_line}\n"
             f"Interested? Contact the employer or reply for more info!"
         )
     
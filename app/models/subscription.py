@@ -0,0 +1,128 @@
+from datetime import datetime
+from typing import Optional, Tuple
+from app.models.vocabulary import LOCATIONS, ROLES
+import time
+
+# Bits given to each vocabulary ID in a packed subscription key
+_VOCAB_BITS = 24
+_VOCAB_MASK = (1 << _VOCAB_BITS) - 1
+
+class Subscription:
+    """One role and location a job seeker wants alerts for"""
+    
+    # Same compact layout as Job: vocabulary IDs and epoch-second timestamps.
+    # id is assigned by the repository when the subscription is stored.
+    __slots__ = (
+        'id', 'phone_number', 'role_id', 'location_id', '_created_ts',
+        'radius_km', 'latitude', 'longitude'
+    )
+    
+    def __init__(self, phone_number: str, role: str, location: str, radius_km: float = 0.0,
+                 coordinates: Optional[Tuple[float, float]] = None, subscription_id: Optional[int] = None):
+        self.id = subscription_id
+        self.phone_number = phone_number
+        self.role = self.normalize(role)
+        self.location = self.normalize(location)
+        self._created_ts = int(time.time())
+        self.set_radius(radius_km, coordinates)
+    
+    @staticmethod
+    def normalize(value: str) -> str:
+        """Normalize a role or location for storage and matching"""
+        return value.lower().strip()
+    
+    def set_radius(self, radius_km: float, coordinates: Optional[Tuple[float, float]]) -> None:
+        """Set the search radius around the location (0 means exact location only)"""
+        self.radius_km = radius_km or 0.0
+        self.latitude, self.longitude = coordinates if coordinates else (None, None)
+    
+    @property
+    def has_radius(self) -> bool:
+        """Whether nearby locations are matched too"""
+        return self.radius_km > 0 and self.latitude is not None
+    
+    @property
+    def role(self) -> str:
+        return ROLES.value(self.role_id)
+    
+    @role.setter
+    def role(self, value: str) -> None:
+        self.role_id = ROLES.intern(value)
+    
+    @property
+    def location(self) -> str:
+        return LOCATIONS.value(self.location_id)
+    
+    @location.setter
+    def location(self, value: str) -> None:
+        self.location_id = LOCATIONS.intern(value)
+    
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self._created_ts)
+    
+    @created_at.setter
+    def created_at(self, value: datetime) -> None:
+        self._created_ts = int(value.timestamp())
+    
+    @property
+    def match_key(self) -> Tuple[str, str]:
+        """Normalized (role, location) pair used for matching"""
+        return (self.role, self.location)
+    
+    @property
+    def match_ids(self) -> Tuple[int, int]:
+        """Interned (role, location) IDs used as compact index keys"""
+        return (self.role_id, self.location_id)
+    
+    def matches_job(self, job_role: str, job_location: str) -> bool:
+        """Check if a job posting has this subscription's role and location"""
+        return self.match_key == (self.normalize(job_role), self.normalize(job_location))
+    
+    def pack(self, owner_ts: int):
+        """
+        Compact stored form, as kept by User
+        
+        The ID, role ID and location ID become one int key. A subscription
+        with no radius that was created with its owner is stored as just the
+        key; any other is a (key, created_ts, radius_km, latitude, longitude)
+        tuple.
+        
+        Args:
+            owner_ts: The owning user's creation time in epoch seconds
+        """
+        key = (self.id or 0) << 2 * _VOCAB_BITS | self.role_id << _VOCAB_BITS | self.location_id
+        if self._created_ts == owner_ts and not self.radius_km and self.latitude is None:
+            return key
+        return (key, self._created_ts, self.radius_km, self.latitude, self.longitude)
+    
+    @classmethod
+    def unpack(cls, phone_number: str, packed, owner_ts: int) -> 'Subscription':
+        """Rebuild a subscription from the form returned by pack"""
+        if isinstance(packed, int):
+            key, created_ts, radius_km, latitude, longitude = packed, owner_ts, 0.0, None, None
+        else:
+            key, created_ts, radius_km, latitude, longitude = packed
+        subscription = cls.__new__(cls)
+        subscription.id = (key >> 2 * _VOCAB_BITS) or None
+        subscription.phone_number = phone_number
+        subscription.role_id = key >> _VOCAB_BITS & _VOCAB_MASK
+        subscription.location_id = key & _VOCAB_MASK
+        subscription._created_ts = created_ts
+        subscription.radius_km = radius_km
+        subscription.latitude = latitude
+        subscription.longitude = longitude
+        return subscription
+    
+    def to_dict(self) -> dict:
+        """Convert subscription to dictionary representation"""
+        return {
+            'id': self.id,
+            'role': self.role,
+            'location': self.location,
+            'radius_km': self.radius_km,
+            'created_at': self.created_at.isoformat()
+        }
+    
+    def __str__(self) -> str:
+        return f"Subscription({self.id}, {self.phone_number}, {self.role}, {self.location})"
@@ -1,33 +1,167 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Tuple
+from app.models.subscription import Subscription
+import time
+
+# Layout of User._state, low bits first: the active and digest flags, a
+# flag for an inline subscription, created_at in epoch seconds, and then
+# the inline subscription's packed key (Subscription.pack)
+_ACTIVE = 1
+_DIGEST = 2
+_INLINE = 4
+_TS_SHIFT = 3
+_TS_MASK = (1 << 32) - 1
+_INLINE_SHIFT = _TS_SHIFT + 32
 
 class User:
-    """Represents a job seeker user"""
+    """Represents a job seeker and the role/location pairs they follow"""
+    
+    # A million seekers must fit in one worker, so a user is three slots.
+    # _state packs the flags, created_at and, for the usual seeker with a
+    # single plain subscription, that subscription into one int; any other
+    # subscriptions are packed into the _more list. digest means alerts
+    # are batched into periodic summary messages instead of sent one by one.
+    __slots__ = ('phone_number', '_state', '_more')
+    
+    normalize = staticmethod(Subscription.normalize)
     
-    def __init__(self, phone_number: str, role: str, location: str):
+    def __init__(self, phone_number: str, role: Optional[str] = None, location: Optional[str] = None,
+                 radius_km: float = 0.0, coordinates: Optional[Tuple[float, float]] = None):
+        """
+        Args:
+            phone_number: User's WhatsApp number
+            role, location, radius_km, coordinates: Optional first subscription
+        """
         self.phone_number = phone_number
-        self.role = role.lower().strip()
-        self.location = location.lower().strip()
-        self.created_at = datetime.now()
-        self.is_active = True
+        created_ts = int(time.time())
+        self._state = _ACTIVE | created_ts << _TS_SHIFT
+        self._more: Optional[list] = None
+        if role is not None and location is not None:
+            subscription = Subscription(phone_number, role, location, radius_km, coordinates)
+            subscription._created_ts = created_ts
+            self.add_subscription(subscription)
+    
+    @property
+    def is_active(self) -> bool:
+        return bool(self._state & _ACTIVE)
+    
+    @is_active.setter
+    def is_active(self, value: bool) -> None:
+        self._state = self._state | _ACTIVE if value else self._state & ~_ACTIVE
+    
+    @property
+    def digest(self) -> bool:
+        return bool(self._state & _DIGEST)
+    
+    @digest.setter
+    def digest(self, value: bool) -> None:
+        self._state = self._state | _DIGEST if value else self._state & ~_DIGEST
+    
+    @property
+    def _created_ts(self) -> int:
+        return self._state >> _TS_SHIFT & _TS_MASK
+    
+    @property
+    def created_at(self) -> datetime:
+        return datetime.fromtimestamp(self._created_ts)
+    
+    @created_at.setter
+    def created_at(self, value: datetime) -> None:
+        # Inline subscriptions take their timestamp from the user, so repack them
+        subscriptions = self.subscriptions
+        self._state = (
+            self._state & (_ACTIVE | _DIGEST) | (int(value.timestamp()) & _TS_MASK) << _TS_SHIFT
+        )
+        self.subscriptions = subscriptions
+    
+    def _packed_subscriptions(self) -> list:
+        """The stored forms of this user's subscriptions, oldest first"""
+        packed = [self._state >> _INLINE_SHIFT] if self._state & _INLINE else []
+        if self._more:
+            packed.extend(self._more)
+        return packed
+    
+    @property
+    def subscriptions(self) -> List[Subscription]:
+        """
+        This user's subscriptions, oldest first
+        
+        The records are rebuilt on every read, so changes to them are only
+        kept by passing them back through the methods below.
+        """
+        created_ts = self._created_ts
+        return [
+            Subscription.unpack(self.phone_number, packed, created_ts)
+            for packed in self._packed_subscriptions()
+        ]
+    
+    @subscriptions.setter
+    def subscriptions(self, subscriptions: List[Subscription]) -> None:
+        created_ts = self._created_ts
+        packed = [subscription.pack(created_ts) for subscription in subscriptions]
+        state = self._state & (_ACTIVE | _DIGEST | _TS_MASK << _TS_SHIFT)
+        if packed and isinstance(packed[0], int):
+            state |= _INLINE | packed.pop(0) << _INLINE_SHIFT
+        self._state = state
+        self._more = packed or None
+    
+    @property
+    def subscription_count(self) -> int:
+        return bool(self._state & _INLINE) + len(self._more or ())
+    
+    def add_subscription(self, subscription: Subscription) -> None:
+        """Store a subscription after the existing ones"""
+        if not self._state & _INLINE and not self._more:
+            self.subscriptions = [subscription]
+        elif self._more is None:
+            self._more = [subscription.pack(self._created_ts)]
+        else:
+            self._more.append(subscription.pack(self._created_ts))
+    
+    def replace_subscription(self, subscription: Subscription) -> bool:
+        """Store a changed subscription in place of the one with the same ID"""
+        subscriptions = self.subscriptions
+        for i, existing in enumerate(subscriptions):
+            if existing.id == subscription.id:
+                subscriptions[i] = subscription
+                self.subscriptions = subscriptions
+                return True
+        return False
+    
+    def remove_subscription(self, subscription_id: int) -> Optional[Subscription]:
+        """Drop the subscription with an ID, returning it if it was found"""
+        subscriptions = self.subscriptions
+        for i, subscription in enumerate(subscriptions):
+            if subscription.id == subscription_id:
+                del subscriptions[i]
+                self.subscriptions = subscriptions
+                return subscription
+        return None
+    
+    def find_subscription(self, role: str, location: str) -> Optional[Subscription]:
+        """The subscription for a role and location, if the user has one"""
+        key = (self.normalize(role), self.normalize(location))
+        for subscription in self.subscriptions:
+            if subscription.match_key == key:
+                return subscription
+        return None
     
     def matches_job(self, job_role: str, job_location: str) -> bool:
-        """Check if this user's preferences match a job posting"""
-        return (
-            self.role == job_role.lower().strip() and 
-            self.location == job_location.lower().strip() and
-            self.is_active
+        """Check if any of this user's subscriptions match a job posting"""
+        return self.is_active and any(
+            subscription.matches_job(job_role, job_location)
+            for subscription in self.subscriptions
         )
     
     def to_dict(self) -> dict:
         """Convert user to dictionary representation"""
         return {
             'phone_number': self.phone_number,
-            'role': self.role,
-            'location': self.location,
+            'subscriptions': [subscription.to_dict() for subscription in self.subscriptions],
             'created_at': self.created_at.isoformat(),
-            'is_active': self.is_active
+            'is_active': self.is_active,
+            'digest': self.digest
         }
     
     def __str__(self) -> str:
-        return f"User({self.phone_number}, {self.role}, {self.location})" 
\ No newline at end of file
+        return f"User({self.phone_number}, {self.subscription_count} subscriptions)"
@@ -0,0 +1,44 @@
+from typing import Dict, List, Optional
+import threading
+
+class Vocabulary:
+    """
+    Interns strings into small integer IDs
+    
+    Roles and locations repeat across many users and jobs, so each distinct
+    value is stored once here and records keep only its integer ID.
+    """
+    
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._values: List[str] = []
+        self._lock = threading.Lock()
+    
+    def intern(self, value: str) -> int:
+        """Get the ID for a value, assigning a new one if it is unseen"""
+        value_id = self._ids.get(value)
+        if value_id is not None:
+            return value_id
+        
+        with self._lock:
+            value_id = self._ids.get(value)
+            if value_id is None:
+                value_id = len(self._values)
+                self._values.append(value)
+                self._ids[value] = value_id
+            return value_id
+    
+    def get_id(self, value: str) -> Optional[int]:
+        """Get the ID for a value without assigning one"""
+        return self._ids.get(value)
+    
+    def value(self, value_id: int) -> str:
+        """Get the value for an ID"""
+        return self._values[value_id]
+    
+    def __len__(self) -> int:
+        return len(self._values)
+
+# Process-wide vocabularies shared by User and Job
+ROLES = Vocabulary()
+LOCATIONS = Vocabulary()
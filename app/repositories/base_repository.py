@@ -0,0 +1,130 @@
+from typing import Iterable, List, Optional, Tuple
+from app.models.user import User
+from app.models.job import Job
+from app.models.subscription import Subscription
+
+# (latitude, longitude) in decimal degrees
+Coordinates = Tuple[float, float]
+
+class BaseRepository:
+    """
+    Storage interface for users and jobs
+    
+    MatcherService talks only to this interface so the backing store can be
+    swapped (in-memory for tests and the MVP, SQLite for persistence)
+    without touching matching logic. Roles and locations passed in are
+    already normalized.
+    """
+    
+    # Users
+    
+    def upsert_user(self, phone_number: str, role: str, location: str, radius_km: float = 0.0,
+                    coordinates: Optional[Coordinates] = None) -> Tuple[User, bool]:
+        """Create a user or replace their subscriptions with this one; returns (user, created)"""
+        raise NotImplementedError
+    
+    def upsert_users(self, rows: Iterable[Tuple[str, str, str]]) -> int:
+        """Batch upsert of (phone_number, role, location) rows; returns rows written"""
+        count = 0
+        for phone_number, role, location in rows:
+            self.upsert_user(phone_number, role, location)
+            count += 1
+        return count
+    
+    def update_user(self, phone_number: str, role: str, location: str, radius_km: float = 0.0,
+                    coordinates: Optional[Coordinates] = None) -> bool:
+        """Replace an existing user's subscriptions with this one; False if the user is unknown"""
+        raise NotImplementedError
+    
+    def add_subscription(self, phone_number: str, role: str, location: str, radius_km: float = 0.0,
+                         coordinates: Optional[Coordinates] = None) -> Tuple[Subscription, bool]:
+        """
+        Add a subscription, creating the user if needed
+        
+        A user has at most one subscription per role and location; adding
+        the same pair again only updates its radius. A deactivated user is
+        reactivated, since registering again means they want alerts.
+        Returns (subscription, created).
+        """
+        raise NotImplementedError
+    
+    def remove_subscription(self, phone_number: str, subscription_id: int) -> bool:
+        """Delete one of a user's subscriptions; False if it does not exist"""
+        raise NotImplementedError
+    
+    def deactivate_user(self, phone_number: str) -> bool:
+        """Mark a user inactive; False if the user is unknown"""
+        raise NotImplementedError
+    
+    def set_digest(self, phone_number: str, enabled: bool) -> bool:
+        """Turn digest delivery on or off for a user; False if the user is unknown"""
+        raise NotImplementedError
+    
+    def get_user(self, phone_number: str) -> Optional[User]:
+        """Look up a user by phone number"""
+        raise NotImplementedError
+    
+    def find_active_users(self, role: str, location: str) -> List[User]:
+        """Active users with a subscription for a role and location"""
+        raise NotImplementedError
+    
+    def find_users_near(self, role: str, latitude: float, longitude: float) -> List[User]:
+        """Active users with a subscription for a role whose radius covers the given point"""
+        raise NotImplementedError
+    
+    def all_users(self) -> List[User]:
+        """Every registered user in registration order"""
+        raise NotImplementedError
+    
+    def count_users(self) -> int:
+        """Number of registered users"""
+        raise NotImplementedError
+    
+    def count_active_users(self) -> int:
+        """Number of users still receiving alerts"""
+        raise NotImplementedError
+    
+    def count_subscriptions(self) -> int:
+        """Number of stored subscriptions"""
+        raise NotImplementedError
+    
+    # Jobs
+    
+    def add_job(self, job: Job) -> None:
+        """Store a new job"""
+        raise NotImplementedError
+    
+    def add_jobs(self, jobs: Iterable[Job]) -> int:
+        """Batch insert of jobs; returns jobs written"""
+        count = 0
+        for job in jobs:
+            self.add_job(job)
+            count += 1
+        return count
+    
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """Look up a job by ID"""
+        raise NotImplementedError
+    
+    def delete_job(self, job_id: str) -> bool:
+        """Remove a job and its index entries; False if the job is unknown"""
+        raise NotImplementedError
+    
+    def expire_jobs(self, now: float) -> int:
+        """Delete every job whose expiry time is at or before now; returns jobs removed"""
+        raise NotImplementedError
+    
+    def find_jobs(self, role: Optional[str] = None, location: Optional[str] = None) -> List[Job]:
+        """Jobs matching the given criteria, oldest first"""
+        raise NotImplementedError
+    
+    def find_recent_jobs(self, role: str, location: str, limit: int) -> List[Job]:
+        """Up to limit active jobs for a role and location, newest first"""
+        raise NotImplementedError
+    
+    def count_jobs(self) -> int:
+        """Number of stored jobs"""
+        raise NotImplementedError
+    
+    def close(self) -> None:
+        """Release any resources held by the backend"""
@@ -0,0 +1,28 @@
+from app.repositories.base_repository import BaseRepository
+from config.config import Config
+
+def create_repository(backend: str = None) -> BaseRepository:
+    """
+    Build the storage backend named in the configuration
+    
+    Args:
+        backend: 'memory', 'sqlite' or 'shared' (defaults to Config.STORAGE_BACKEND)
+        
+    Returns:
+        BaseRepository: The storage backend
+    """
+    backend = (backend or Config.STORAGE_BACKEND).lower()
+    
+    if backend == 'memory':
+        from app.repositories.memory_repository import InMemoryRepository
+        return InMemoryRepository()
+    
+    if backend == 'sqlite':
+        from app.repositories.sqlite_repository import SQLiteRepository
+        return SQLiteRepository(Config.DATABASE_PATH)
+    
+    if backend == 'shared':
+        from app.repositories.shared_repository import SharedRepository
+        return SharedRepository()
+    
+    raise ValueError(f"Unknown storage backend: {backend}")
@@ -0,0 +1,319 @@
+from typing import Dict, List, Optional, Tuple
+from app.models.user import User
+from app.models.job import Job
+from app.models.subscription import Subscription
+from app.models.vocabulary import LOCATIONS, ROLES
+from app.repositories.base_repository import BaseRepository, Coordinates
+from app.services.bitmap import Bitmap
+from app.services.spatial_index import GridIndex
+from config.config import Config
+from itertools import islice
+import heapq
+import threading
+import time
+
+class InMemoryRepository(BaseRepository):
+    """Process-local storage backed by dicts and hash indexes"""
+    
+    def __init__(self):
+        self._users_by_phone: Dict[str, User] = {}
+        
+        # Owner of each subscription, indexed by subscription ID (None once
+        # removed). A list slot is far smaller than a dict entry per ID.
+        self._owners: List[Optional[User]] = [None]
+        self._subscription_count = 0
+        self._next_subscription_id = 1
+        self._jobs: Dict[str, Job] = {}
+        
+        # Subscriptions of active users, as bitmaps of subscription IDs per
+        # interned role and per location. A job matches the intersection of
+        # its role's and its location's bitmaps.
+        self._role_bitmaps: Dict[int, Bitmap] = {}
+        self._location_bitmaps: Dict[int, Bitmap] = {}
+        
+        # Spatial index of subscriptions with a search radius, keyed by role ID
+        self._geo_index = GridIndex(Config.GEO_GRID_CELL_DEG, Config.MAX_MATCH_RADIUS_KM)
+        
+        # Job indexes keyed by vocabulary IDs. Each bucket is a dict of job ID
+        # to job in posting order, so the newest jobs are read from the end
+        # with reversed() and a job can be dropped without a scan.
+        self._jobs_by_key: Dict[Tuple[int, int], Dict[str, Job]] = {}
+        self._jobs_by_role: Dict[int, Dict[str, Job]] = {}
+        self._jobs_by_location: Dict[int, Dict[str, Job]] = {}
+        
+        # Min-heap of (expiry epoch second, job ID). Entries for jobs closed
+        # early are skipped when they reach the top.
+        self._expiry_heap: List[Tuple[int, str]] = []
+        
+        self._active_count = 0
+        
+        # Guards the phone map and indexes so an upsert is atomic
+        self._lock = threading.RLock()
+    
+    def upsert_user(self, phone_number: str, role: str, location: str, radius_km: float = 0.0,
+                    coordinates: Optional[Coordinates] = None) -> Tuple[User, bool]:
+        with self._lock:
+            user, created = self._get_or_create_user(phone_number)
+            for subscription in user.subscriptions:
+                self._drop_subscription(subscription)
+            user.subscriptions = []
+            self._attach_subscription(
+                user, Subscription(phone_number, role, location, radius_km, coordinates)
+            )
+            return user, created
+    
+    def load_user(self, user: User) -> None:
+        """
+        Insert or replace a user exactly as given, e.g. when mirroring a shared store
+        
+        Args:
+            user: User whose subscriptions and active flag are authoritative
+        """
+        with self._lock:
+            existing_user = self._users_by_phone.get(user.phone_number)
+            if existing_user:
+                for subscription in existing_user.subscriptions:
+                    self._drop_subscription(subscription)
+                if existing_user.is_active:
+                    self._active_count -= 1
+            
+            self._users_by_phone[user.phone_number] = user
+            subscriptions, user.subscriptions = user.subscriptions, []
+            for subscription in subscriptions:
+                self._attach_subscription(user, subscription)
+            if user.is_active:
+                self._active_count += 1
+    
+    def update_user(self, phone_number: str, role: str, location: str, radius_km: float = 0.0,
+                    coordinates: Optional[Coordinates] = None) -> bool:
+        with self._lock:
+            if phone_number not in self._users_by_phone:
+                return False
+            self.upsert_user(phone_number, role, location, radius_km, coordinates)
+            return True
+    
+    def add_subscription(self, phone_number: str, role: str, location: str, radius_km: float = 0.0,
+                         coordinates: Optional[Coordinates] = None) -> Tuple[Subscription, bool]:
+        with self._lock:
+            user, _ = self._get_or_create_user(phone_number)
+            if not user.is_active:
+                self._reactivate_user(user)
+            existing = user.find_subscription(role, location)
+            if existing:
+                self._unindex_subscription(existing)
+                existing.set_radius(radius_km, coordinates)
+                user.replace_subscription(existing)
+                if user.is_active:
+                    self._index_subscription(existing)
+                return existing, False
+            
+            subscription = Subscription(phone_number, role, location, radius_km, coordinates)
+            self._attach_subscription(user, subscription)
+            return subscription, True
+    
+    def remove_subscription(self, phone_number: str, subscription_id: int) -> bool:
+        with self._lock:
+            user = self._users_by_phone.get(phone_number)
+            if not user:
+                return False
+            subscription = user.remove_subscription(subscription_id)
+            if subscription is None:
+                return False
+            self._drop_subscription(subscription)
+            return True
+    
+    def deactivate_user(self, phone_number: str) -> bool:
+        with self._lock:
+            user = self._users_by_phone.get(phone_number)
+            if not user:
+                return False
+            if user.is_active:
+                for subscription in user.subscriptions:
+                    self._unindex_subscription(subscription)
+                user.is_active = False
+                self._active_count -= 1
+            return True
+    
+    def set_digest(self, phone_number: str, enabled: bool) -> bool:
+        with self._lock:
+            user = self._users_by_phone.get(phone_number)
+            if not user:
+                return False
+            user.digest = enabled
+            return True
+    
+    def get_user(self, phone_number: str) -> Optional[User]:
+        return self._users_by_phone.get(phone_number)
+    
+    def find_active_users(self, role: str, location: str) -> List[User]:
+        with self._lock:
+            role_bits = self._role_bitmaps.get(ROLES.get_id(role))
+            location_bits = self._location_bitmaps.get(LOCATIONS.get_id(location))
+            if not role_bits or not location_bits:
+                return []
+            return self._users_for(role_bits & location_bits)
+    
+    def find_users_near(self, role: str, latitude: float, longitude: float) -> List[User]:
+        role_id = ROLES.get_id(role)
+        if role_id is None:
+            return []
+        with self._lock:
+            return self._users_for(self._geo_index.query(role_id, latitude, longitude))
+    
+    def all_users(self) -> List[User]:
+        with self._lock:
+            return list(self._users_by_phone.values())
+    
+    def count_users(self) -> int:
+        return len(self._users_by_phone)
+    
+    def count_active_users(self) -> int:
+        return self._active_count
+    
+    def count_subscriptions(self) -> int:
+        return self._subscription_count
+    
+    def add_job(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+            self._jobs_by_key.setdefault(job.match_ids, {})[job.id] = job
+            self._jobs_by_role.setdefault(job.role_id, {})[job.id] = job
+            self._jobs_by_location.setdefault(job.location_id, {})[job.id] = job
+            if job.expires_ts is not None:
+                heapq.heappush(self._expiry_heap, (job.expires_ts, job.id))
+    
+    def get_job(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+    
+    def delete_job(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            self._remove_job(job)
+            return True
+    
+    def expire_jobs(self, now: float) -> int:
+        expired = 0
+        with self._lock:
+            heap = self._expiry_heap
+            while heap and heap[0][0] <= now:
+                _, job_id = heapq.heappop(heap)
+                job = self._jobs.get(job_id)
+                if job is not None and job.is_expired(now):
+                    self._remove_job(job)
+                    expired += 1
+        return expired
+    
+    def find_jobs(self, role: Optional[str] = None, location: Optional[str] = None) -> List[Job]:
+        role_id = ROLES.get_id(role) if role else None
+        location_id = LOCATIONS.get_id(location) if location else None
+        with self._lock:
+            if role and location:
+                jobs = self._jobs_by_key.get((role_id, location_id), {}).values()
+            elif role:
+                jobs = self._jobs_by_role.get(role_id, {}).values()
+            elif location:
+                jobs = self._jobs_by_location.get(location_id, {}).values()
+            else:
+                jobs = self._jobs.values()
+            return list(jobs)
+    
+    def find_recent_jobs(self, role: str, location: str, limit: int) -> List[Job]:
+        key = (ROLES.get_id(role), LOCATIONS.get_id(location))
+        with self._lock:
+            jobs = self._jobs_by_key.get(key)
+            if not jobs:
+                return []
+            now = time.time()
+            return list(islice(
+                (job for job in reversed(jobs.values()) if job.is_active and not job.is_expired(now)),
+                limit
+            ))
+    
+    def count_jobs(self) -> int:
+        return len(self._jobs)
+    
+    def _remove_job(self, job: Job) -> None:
+        """Drop a job from the job map and every job index"""
+        del self._jobs[job.id]
+        for index, key in (
+            (self._jobs_by_key, job.match_ids),
+            (self._jobs_by_role, job.role_id),
+            (self._jobs_by_location, job.location_id),
+        ):
+            bucket = index.get(key)
+            if bucket is None:
+                continue
+            bucket.pop(job.id, None)
+            if not bucket:
+                del index[key]
+    
+    def _get_or_create_user(self, phone_number: str) -> Tuple[User, bool]:
+        """Look up a user, registering a new one without subscriptions if unknown"""
+        user = self._users_by_phone.get(phone_number)
+        if user:
+            return user, False
+        user = User(phone_number)
+        self._users_by_phone[phone_number] = user
+        self._active_count += 1
+        return user, True
+    
+    def _reactivate_user(self, user: User) -> None:
+        """Mark a deactivated user active and index their subscriptions again"""
+        user.is_active = True
+        self._active_count += 1
+        for subscription in user.subscriptions:
+            self._index_subscription(subscription)
+    
+    def _users_for(self, subscription_ids) -> List[User]:
+        """Distinct owners of some subscriptions, in subscription order"""
+        owners = self._owners
+        return list(dict.fromkeys(owners[subscription_id] for subscription_id in subscription_ids))
+    
+    def _attach_subscription(self, user: User, subscription: Subscription) -> None:
+        """Store a subscription on a user, assigning an ID if it has none"""
+        if subscription.id is None:
+            subscription.id = self._next_subscription_id
+        self._next_subscription_id = max(self._next_subscription_id, subscription.id + 1)
+        
+        user.add_subscription(subscription)
+        owners = self._owners
+        if subscription.id >= len(owners):
+            owners.extend([None] * (subscription.id + 1 - len(owners)))
+        owners[subscription.id] = user
+        self._subscription_count += 1
+        if user.is_active:
+            self._index_subscription(subscription)
+    
+    def _drop_subscription(self, subscription: Subscription) -> None:
+        """Forget a subscription that has been detached from its user"""
+        self._unindex_subscription(subscription)
+        self._owners[subscription.id] = None
+        self._subscription_count -= 1
+    
+    def _index_subscription(self, subscription: Subscription) -> None:
+        """Add a subscription to the match bitmaps and spatial index"""
+        role_id, location_id = subscription.match_ids
+        self._role_bitmaps.setdefault(role_id, Bitmap()).add(subscription.id)
+        self._location_bitmaps.setdefault(location_id, Bitmap()).add(subscription.id)
+        if subscription.has_radius:
+            self._geo_index.add(
+                role_id, subscription.id, subscription.latitude, subscription.longitude,
+                subscription.radius_km, subscription.id
+            )
+    
+    def _unindex_subscription(self, subscription: Subscription) -> None:
+        """Remove a subscription from the match bitmaps and spatial index"""
+        role_id, location_id = subscription.match_ids
+        for bitmaps, key in ((self._role_bitmaps, role_id), (self._location_bitmaps, location_id)):
+            bitmap = bitmaps.get(key)
+            if bitmap is None:
+                continue
+            bitmap.discard(subscription.id)
+            if not bitmap:
+                del bitmaps[key]
+        if subscription.has_radius:
+            self._geo_index.remove(
+                role_id, subscription.id, subscription.latitude, subscription.longitude
+            )
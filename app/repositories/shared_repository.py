@@ -0,0 +1,187 @@
+from typing import Iterable, List, Optional, Tuple
+from app.models.user import User
+from app.models.job import Job
+from app.models.subscription import Subscription
+from app.repositories.base_repository import BaseRepository, Coordinates
+from app.repositories.memory_repository import InMemoryRepository
+from app.repositories.sqlite_repository import SQLiteRepository
+from config.config import Config
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class SharedRepository(BaseRepository):
+    """
+    Storage for multi-process deployments (e.g. several gunicorn workers)
+    
+    A single SQLite file is the source of truth for every worker. Each
+    process mirrors users into a local InMemoryRepository so matching stays
+    in memory, and keeps that mirror fresh by replaying the store's user
+    change log (which also records subscription changes) whenever another
+    process has committed a write. Jobs are read straight from the store's
+    indexes.
+    """
+    
+    def __init__(self, store: SQLiteRepository = None):
+        self.store = store or SQLiteRepository(Config.DATABASE_PATH)
+        self._lock = threading.RLock()
+        self._writes_since_prune = 0
+        self._reload()
+    
+    def _reload(self) -> None:
+        """Rebuild the local mirror from scratch"""
+        with self._lock:
+            self._data_version = self.store.data_version()
+            self._last_seq = self.store.change_seq_range()[1]
+            cache = InMemoryRepository()
+            for user in self.store.all_users():
+                cache.load_user(user)
+            self.cache = cache
+        logger.info(f"Loaded {self.cache.count_users()} users from shared store")
+    
+    def sync(self) -> None:
+        """Apply writes made by other processes since the last sync"""
+        with self._lock:
+            data_version = self.store.data_version()
+            if data_version == self._data_version:
+                return
+            self._data_version = data_version
+            
+            oldest_seq, _ = self.store.change_seq_range()
+            if oldest_seq > self._last_seq + 1:
+                # Entries we have not seen were pruned; fall back to a full load
+                self._reload()
+                return
+            
+            changes = self.store.get_user_changes(self._last_seq)
+            if not changes:
+                return
+            
+            for phone_number in dict.fromkeys(phone for _, phone in changes):
+                user = self.store.get_user(phone_number)
+                if user:
+                    self.cache.load_user(user)
+            self._last_seq = changes[-1][0]
+    
+    def _after_write(self) -> None:
+        """Occasionally trim the shared change log"""
+        self._writes_since_prune += 1
+        if self._writes_since_prune >= Config.SHARED_CHANGE_LOG_PRUNE_EVERY:
+            self._writes_since_prune = 0
+            self.store.prune_user_changes(Config.SHARED_CHANGE_LOG_RETENTION)
+    
+    def upsert_user(self, phone_number: str, role: str, location: str, radius_km: float = 0.0,
+                    coordinates: Optional[Coordinates] = None) -> Tuple[User, bool]:
+        with self._lock:
+            user, created = self.store.upsert_user(
+                phone_number, role, location, radius_km, coordinates
+            )
+            self.cache.load_user(user)
+            self._after_write()
+        return user, created
+    
+    def upsert_users(self, rows: Iterable[Tuple[str, str, str]]) -> int:
+        with self._lock:
+            count = self.store.upsert_users(rows)
+            self._data_version = None  # force the next sync to pick the batch up
+        self.sync()
+        return count
+    
+    def update_user(self, phone_number: str, role: str, location: str, radius_km: float = 0.0,
+                    coordinates: Optional[Coordinates] = None) -> bool:
+        with self._lock:
+            updated = self.store.update_user(phone_number, role, location, radius_km, coordinates)
+            if updated:
+                self.cache.load_user(self.store.get_user(phone_number))
+                self._after_write()
+        return updated
+    
+    def add_subscription(self, phone_number: str, role: str, location: str, radius_km: float = 0.0,
+                         coordinates: Optional[Coordinates] = None) -> Tuple[Subscription, bool]:
+        with self._lock:
+            subscription, created = self.store.add_subscription(
+                phone_number, role, location, radius_km, coordinates
+            )
+            self.cache.load_user(self.store.get_user(phone_number))
+            self._after_write()
+        return subscription, created
+    
+    def remove_subscription(self, phone_number: str, subscription_id: int) -> bool:
+        with self._lock:
+            removed = self.store.remove_subscription(phone_number, subscription_id)
+            if removed:
+                self.cache.load_user(self.store.get_user(phone_number))
+                self._after_write()
+        return removed
+    
+    def deactivate_user(self, phone_number: str) -> bool:
+        with self._lock:
+            deactivated = self.store.deactivate_user(phone_number)
+            if deactivated:
+                self.cache.load_user(self.store.get_user(phone_number))
+                self._after_write()
+        return deactivated
+    
+    def set_digest(self, phone_number: str, enabled: bool) -> bool:
+        with self._lock:
+            updated = self.store.set_digest(phone_number, enabled)
+            if updated:
+                self.cache.load_user(self.store.get_user(phone_number))
+                self._after_write()
+        return updated
+    
+    def get_user(self, phone_number: str) -> Optional[User]:
+        self.sync()
+        return self.cache.get_user(phone_number)
+    
+    def find_active_users(self, role: str, location: str) -> List[User]:
+        self.sync()
+        return self.cache.find_active_users(role, location)
+    
+    def find_users_near(self, role: str, latitude: float, longitude: float) -> List[User]:
+        self.sync()
+        return self.cache.find_users_near(role, latitude, longitude)
+    
+    def all_users(self) -> List[User]:
+        self.sync()
+        return self.cache.all_users()
+    
+    def count_users(self) -> int:
+        self.sync()
+        return self.cache.count_users()
+    
+    def count_active_users(self) -> int:
+        self.sync()
+        return self.cache.count_active_users()
+    
+    def count_subscriptions(self) -> int:
+        self.sync()
+        return self.cache.count_subscriptions()
+    
+    def add_job(self, job: Job) -> None:
+        self.store.add_job(job)
+    
+    def add_jobs(self, jobs: Iterable[Job]) -> int:
+        return self.store.add_jobs(jobs)
+    
+    def get_job(self, job_id: str) -> Optional[Job]:
+        return self.store.get_job(job_id)
+    
+    def delete_job(self, job_id: str) -> bool:
+        return self.store.delete_job(job_id)
+    
+    def expire_jobs(self, now: float) -> int:
+        return self.store.expire_jobs(now)
+    
+    def find_jobs(self, role: Optional[str] = None, location: Optional[str] = None) -> List[Job]:
+        return self.store.find_jobs(role, location)
+    
+    def find_recent_jobs(self, role: str, location: str, limit: int) -> List[Job]:
+        return self.store.find_recent_jobs(role, location, limit)
+    
+    def count_jobs(self) -> int:
+        return self.store.count_jobs()
+    
+    def close(self) -> None:
+        self.store.close()
@@ -0,0 +1,559 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime
+from app.models.user import User
+from app.models.job import Job
+from app.models.subscription import Subscription
+from app.repositories.base_repository import BaseRepository, Coordinates
+from app.services.spatial_index import KM_PER_DEGREE_LAT, haversine_km
+from config.config import Config
+import math
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    phone_number TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    digest INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_users_created ON users (created_at);
+
+CREATE TABLE IF NOT EXISTS subscriptions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    phone_number TEXT NOT NULL,
+    role TEXT NOT NULL,
+    location TEXT NOT NULL,
+    radius_km REAL NOT NULL DEFAULT 0,
+    latitude REAL,
+    longitude REAL,
+    created_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_subscriptions_match ON subscriptions (role, location, phone_number);
+CREATE INDEX IF NOT EXISTS idx_subscriptions_phone ON subscriptions (phone_number);
+-- Only subscriptions with a radius are searched by position, so the index stays small
+CREATE INDEX IF NOT EXISTS idx_subscriptions_geo ON subscriptions (role, latitude, longitude)
+    WHERE radius_km > 0;
+
+-- Append-only log of user writes, read by other processes to refresh caches
+CREATE TABLE IF NOT EXISTS user_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    phone_number TEXT NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS trg_users_insert AFTER INSERT ON users BEGIN
+    INSERT INTO user_changes (phone_number) VALUES (NEW.phone_number);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_users_update AFTER UPDATE ON users BEGIN
+    INSERT INTO user_changes (phone_number) VALUES (NEW.phone_number);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_subscriptions_insert AFTER INSERT ON subscriptions BEGIN
+    INSERT INTO user_changes (phone_number) VALUES (NEW.phone_number);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_subscriptions_update AFTER UPDATE ON subscriptions BEGIN
+    INSERT INTO user_changes (phone_number) VALUES (NEW.phone_number);
+END;
+CREATE TRIGGER IF NOT EXISTS trg_subscriptions_delete AFTER DELETE ON subscriptions BEGIN
+    INSERT INTO user_changes (phone_number) VALUES (OLD.phone_number);
+END;
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    employer_phone TEXT NOT NULL,
+    role TEXT NOT NULL,
+    location TEXT NOT NULL,
+    description TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_match ON jobs (role, location, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_location ON jobs (location, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at);
+
+-- Row counts maintained by triggers, so stats never scan a table
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS trg_users_count_insert AFTER INSERT ON users BEGIN
+    UPDATE counters SET value = value + 1 WHERE name = 'users';
+    UPDATE counters SET value = value + NEW.is_active WHERE name = 'active_users';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_users_count_delete AFTER DELETE ON users BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = 'users';
+    UPDATE counters SET value = value - OLD.is_active WHERE name = 'active_users';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_users_count_active AFTER UPDATE OF is_active ON users BEGIN
+    UPDATE counters SET value = value + NEW.is_active - OLD.is_active WHERE name = 'active_users';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_subscriptions_count_insert AFTER INSERT ON subscriptions BEGIN
+    UPDATE counters SET value = value + 1 WHERE name = 'subscriptions';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_subscriptions_count_delete AFTER DELETE ON subscriptions BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = 'subscriptions';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_jobs_count_insert AFTER INSERT ON jobs BEGIN
+    UPDATE counters SET value = value + 1 WHERE name = 'jobs';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_jobs_count_delete AFTER DELETE ON jobs BEGIN
+    UPDATE counters SET value = value - 1 WHERE name = 'jobs';
+END;
+"""
+
+# Counted once when a database without counters is first opened
+_SEED_COUNTERS = """
+INSERT OR IGNORE INTO counters (name, value) SELECT 'users', COUNT(*) FROM users;
+INSERT OR IGNORE INTO counters (name, value) SELECT 'active_users', COUNT(*) FROM users WHERE is_active = 1;
+INSERT OR IGNORE INTO counters (name, value) SELECT 'subscriptions', COUNT(*) FROM subscriptions;
+INSERT OR IGNORE INTO counters (name, value) SELECT 'jobs', COUNT(*) FROM jobs;
+"""
+
+# Databases from before subscriptions kept one role and location per user;
+# those rows become each user's first subscription.
+_LEGACY_SUBSCRIPTIONS = (
+    "INSERT INTO subscriptions (phone_number, role, location, radius_km, latitude, longitude, created_at) "
+    "SELECT phone_number, role, location, {radius_km}, {latitude}, {longitude}, created_at "
+    "FROM users ORDER BY created_at, rowid"
+)
+_LEGACY_USERS_REBUILD = """
+CREATE TABLE users_new (
+    phone_number TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    is_active INTEGER NOT NULL DEFAULT 1,
+    digest INTEGER NOT NULL DEFAULT 0
+);
+INSERT INTO users_new (phone_number, created_at, is_active)
+    SELECT phone_number, created_at, is_active FROM users ORDER BY created_at, rowid;
+DROP TABLE users;
+ALTER TABLE users_new RENAME TO users;
+"""
+
+# Added after the first release and applied to older databases on open
+_JOBS_EXPIRES_COLUMN = "ALTER TABLE jobs ADD COLUMN expires_at REAL"
+_USERS_DIGEST_COLUMN = "ALTER TABLE users ADD COLUMN digest INTEGER NOT NULL DEFAULT 0"
+# Only jobs with a TTL are swept, so the index stays small
+_JOBS_EXPIRY_INDEX = (
+    "CREATE INDEX IF NOT EXISTS idx_jobs_expiry ON jobs (expires_at) WHERE expires_at IS NOT NULL"
+)
+
+# Statements are module constants so sqlite3's statement cache reuses the
+# prepared form on every call instead of re-parsing the SQL.
+_USER_COLUMNS = "phone_number, created_at, is_active, digest"
+_SUBSCRIPTION_COLUMNS = "id, phone_number, role, location, radius_km, latitude, longitude, created_at"
+_JOB_COLUMNS = "id, employer_phone, role, location, description, created_at, is_active, expires_at"
+
+# Upper bound on bound parameters per IN (...) lookup
+_LOOKUP_BATCH = 500
+
+_SELECT_USER = f"SELECT {_USER_COLUMNS} FROM users WHERE phone_number = ?"
+_INSERT_USER = "INSERT OR IGNORE INTO users (phone_number, created_at, is_active) VALUES (?, ?, 1)"
+# Registering again reactivates a user who was deactivated
+_REGISTER_USER = (
+    "INSERT INTO users (phone_number, created_at, is_active) VALUES (?, ?, 1) "
+    "ON CONFLICT (phone_number) DO UPDATE SET is_active = 1 WHERE is_active = 0"
+)
+_DEACTIVATE_USER = "UPDATE users SET is_active = 0 WHERE phone_number = ?"
+_SET_USER_DIGEST = "UPDATE users SET digest = ? WHERE phone_number = ?"
+_ALL_USERS = f"SELECT {_USER_COLUMNS} FROM users ORDER BY created_at, rowid"
+
+_SELECT_SUBSCRIPTION = (
+    f"SELECT {_SUBSCRIPTION_COLUMNS} FROM subscriptions "
+    "WHERE role = ? AND location = ? AND phone_number = ?"
+)
+_INSERT_SUBSCRIPTION = (
+    "INSERT INTO subscriptions (phone_number, role, location, radius_km, latitude, longitude, created_at) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+_UPDATE_SUBSCRIPTION_RADIUS = (
+    "UPDATE subscriptions SET radius_km = ?, latitude = ?, longitude = ? WHERE id = ?"
+)
+_DELETE_SUBSCRIPTION = "DELETE FROM subscriptions WHERE id = ? AND phone_number = ?"
+_DELETE_USER_SUBSCRIPTIONS = "DELETE FROM subscriptions WHERE phone_number = ?"
+_ALL_SUBSCRIPTIONS = f"SELECT {_SUBSCRIPTION_COLUMNS} FROM subscriptions ORDER BY id"
+_MATCH_PHONES = (
+    "SELECT s.phone_number FROM subscriptions s JOIN users u ON u.phone_number = s.phone_number "
+    "WHERE s.role = ? AND s.location = ? AND u.is_active = 1 ORDER BY s.id"
+)
+_NEAR_SUBSCRIPTIONS = (
+    "SELECT s.phone_number, s.latitude, s.longitude, s.radius_km FROM subscriptions s "
+    "JOIN users u ON u.phone_number = s.phone_number "
+    "WHERE s.role = ? AND s.radius_km > 0 AND u.is_active = 1 "
+    "AND s.latitude BETWEEN ? AND ? AND s.longitude BETWEEN ? AND ? ORDER BY s.id"
+)
+
+_SELECT_COUNTER = "SELECT value FROM counters WHERE name = ?"
+
+_USER_CHANGES_SINCE = "SELECT seq, phone_number FROM user_changes WHERE seq > ? ORDER BY seq"
+_CHANGE_SEQ_RANGE = "SELECT MIN(seq), MAX(seq) FROM user_changes"
+_PRUNE_USER_CHANGES = "DELETE FROM user_changes WHERE seq <= (SELECT MAX(seq) FROM user_changes) - ?"
+
+_INSERT_JOB = f"INSERT INTO jobs ({_JOB_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+_SELECT_JOB = f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = ?"
+_DELETE_JOB = "DELETE FROM jobs WHERE id = ?"
+_EXPIRE_JOBS = "DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?"
+_SELECT_JOBS = f"SELECT {_JOB_COLUMNS} FROM jobs"
+_RECENT_JOBS = (
+    f"SELECT {_JOB_COLUMNS} FROM jobs WHERE role = ? AND location = ? AND is_active = 1 "
+    "AND (expires_at IS NULL OR expires_at > ?) ORDER BY created_at DESC, rowid DESC LIMIT ?"
+)
+
+class SQLiteRepository(BaseRepository):
+    """Persistent storage in a single SQLite database file"""
+    
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or Config.DATABASE_PATH
+        self._conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=128
+        )
+        self._lock = threading.RLock()
+        
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(f"PRAGMA busy_timeout={Config.SQLITE_BUSY_TIMEOUT_MS}")
+            self._conn.executescript(_SCHEMA)
+            self._migrate()
+            self._conn.executescript(_SEED_COUNTERS)
+    
+    def _migrate(self) -> None:
+        """Bring databases created by older versions up to the current schema"""
+        job_columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if 'expires_at' not in job_columns:
+            self._conn.execute(_JOBS_EXPIRES_COLUMN)
+        self._conn.execute(_JOBS_EXPIRY_INDEX)
+        
+        # Per-user role and location columns move into subscriptions
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(users)")}
+        if 'role' not in columns:
+            if 'digest' not in columns:
+                self._conn.execute(_USERS_DIGEST_COLUMN)
+            return
+        
+        legacy = {
+            name: name if name in columns else default
+            for name, default in (('radius_km', '0'), ('latitude', 'NULL'), ('longitude', 'NULL'))
+        }
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute(_LEGACY_SUBSCRIPTIONS.format(**legacy))
+            for statement in _LEGACY_USERS_REBUILD.split(';'):
+                if statement.strip():
+                    self._conn.execute(statement)
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+        
+        # Dropping the old table took its indexes and triggers with it
+        self._conn.executescript(_SCHEMA)
+    
+    @staticmethod
+    def _row_to_user(row: tuple) -> User:
+        """Rebuild a User, without subscriptions, from a users row"""
+        phone_number, created_at, is_active, digest = row
+        user = User(phone_number)
+        user.created_at = datetime.fromtimestamp(created_at)
+        user.is_active = bool(is_active)
+        user.digest = bool(digest)
+        return user
+    
+    @staticmethod
+    def _row_to_subscription(row: tuple) -> Subscription:
+        """Rebuild a Subscription from a subscriptions row"""
+        subscription_id, phone_number, role, location, radius_km, latitude, longitude, created_at = row
+        coordinates = (latitude, longitude) if latitude is not None else None
+        subscription = Subscription(
+            phone_number, role, location, radius_km, coordinates, subscription_id
+        )
+        subscription.created_at = datetime.fromtimestamp(created_at)
+        return subscription
+    
+    @staticmethod
+    def _row_to_job(row: tuple) -> Job:
+        """Rebuild a Job from a jobs row"""
+        job_id, employer_phone, role, location, description, created_at, is_active, expires_at = row
+        job = Job(employer_phone, role, location, description)
+        job.id = job_id
+        job.created_at = datetime.fromtimestamp(created_at)
+        job.expires_ts = int(expires_at) if expires_at is not None else None
+        job.is_active = bool(is_active)
+        return job
+    
+    @staticmethod
+    def _job_params(job: Job) -> tuple:
+        """Bind parameters for inserting a job"""
+        return (
+            job.id, job.employer_phone, job.role, job.location,
+            job.description, job.created_at.timestamp(), int(job.is_active), job.expires_ts
+        )
+    
+    @staticmethod
+    def _subscription_params(subscription: Subscription) -> tuple:
+        """Bind parameters for inserting a subscription"""
+        return (
+            subscription.phone_number, subscription.role, subscription.location,
+            subscription.radius_km, subscription.latitude, subscription.longitude,
+            subscription.created_at.timestamp()
+        )
+    
+    def _load_users(self, phone_numbers: List[str]) -> List[User]:
+        """Users and their subscriptions for some phone numbers, in the given order"""
+        users: Dict[str, User] = {}
+        phone_numbers = list(dict.fromkeys(phone_numbers))
+        for i in range(0, len(phone_numbers), _LOOKUP_BATCH):
+            batch = phone_numbers[i:i + _LOOKUP_BATCH]
+            placeholders = ", ".join("?" * len(batch))
+            for row in self._conn.execute(
+                f"SELECT {_USER_COLUMNS} FROM users WHERE phone_number IN ({placeholders})", batch
+            ):
+                users[row[0]] = self._row_to_user(row)
+            for row in self._conn.execute(
+                f"SELECT {_SUBSCRIPTION_COLUMNS} FROM subscriptions "
+                f"WHERE phone_number IN ({placeholders}) ORDER BY id", batch
+            ):
+                users[row[1]].add_subscription(self._row_to_subscription(row))
+        return [users[phone] for phone in phone_numbers if phone in users]
+    
+    def _replace_subscriptions(self, phone_number: str, subscription: Subscription) -> None:
+        """Make a subscription the user's only one, inside the caller's transaction"""
+        self._conn.execute(_DELETE_USER_SUBSCRIPTIONS, (phone_number,))
+        cursor = self._conn.execute(_INSERT_SUBSCRIPTION, self._subscription_params(subscription))
+        subscription.id = cursor.lastrowid
+    
+    def upsert_user(self, phone_number: str, role: str, location: str, radius_km: float = 0.0,
+                    coordinates: Optional[Coordinates] = None) -> Tuple[User, bool]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(_SELECT_USER, (phone_number,)).fetchone()
+                if row:
+                    user = self._row_to_user(row)
+                    created = False
+                else:
+                    user = User(phone_number)
+                    self._conn.execute(_INSERT_USER, (phone_number, user.created_at.timestamp()))
+                    created = True
+                subscription = Subscription(phone_number, role, location, radius_km, coordinates)
+                self._replace_subscriptions(phone_number, subscription)
+                user.subscriptions = [subscription]
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return user, created
+    
+    def upsert_users(self, rows: Iterable[Tuple[str, str, str]]) -> int:
+        now = int(datetime.now().timestamp())
+        rows = list(rows)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(_INSERT_USER, [(phone, now) for phone, _, _ in rows])
+                self._conn.executemany(_DELETE_USER_SUBSCRIPTIONS, [(phone,) for phone, _, _ in rows])
+                self._conn.executemany(_INSERT_SUBSCRIPTION, [
+                    (phone, role, location, 0.0, None, None, now) for phone, role, location in rows
+                ])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+    
+    def update_user(self, phone_number: str, role: str, location: str, radius_km: float = 0.0,
+                    coordinates: Optional[Coordinates] = None) -> bool:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                exists = self._conn.execute(_SELECT_USER, (phone_number,)).fetchone() is not None
+                if exists:
+                    self._replace_subscriptions(
+                        phone_number,
+                        Subscription(phone_number, role, location, radius_km, coordinates)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return exists
+    
+    def add_subscription(self, phone_number: str, role: str, location: str, radius_km: float = 0.0,
+                         coordinates: Optional[Coordinates] = None) -> Tuple[Subscription, bool]:
+        subscription = Subscription(phone_number, role, location, radius_km, coordinates)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(_REGISTER_USER, (phone_number, subscription.created_at.timestamp()))
+                row = self._conn.execute(
+                    _SELECT_SUBSCRIPTION, (role, location, phone_number)
+                ).fetchone()
+                if row:
+                    self._conn.execute(_UPDATE_SUBSCRIPTION_RADIUS, (
+                        subscription.radius_km, subscription.latitude, subscription.longitude, row[0]
+                    ))
+                    existing = self._row_to_subscription(row)
+                    existing.set_radius(radius_km, coordinates)
+                    subscription, created = existing, False
+                else:
+                    cursor = self._conn.execute(
+                        _INSERT_SUBSCRIPTION, self._subscription_params(subscription)
+                    )
+                    subscription.id = cursor.lastrowid
+                    created = True
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return subscription, created
+    
+    def remove_subscription(self, phone_number: str, subscription_id: int) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(_DELETE_SUBSCRIPTION, (subscription_id, phone_number))
+        return cursor.rowcount > 0
+    
+    def deactivate_user(self, phone_number: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(_DEACTIVATE_USER, (phone_number,))
+        return cursor.rowcount > 0
+    
+    def set_digest(self, phone_number: str, enabled: bool) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(_SET_USER_DIGEST, (int(enabled), phone_number))
+        return cursor.rowcount > 0
+    
+    def get_user(self, phone_number: str) -> Optional[User]:
+        with self._lock:
+            users = self._load_users([phone_number])
+        return users[0] if users else None
+    
+    def find_active_users(self, role: str, location: str) -> List[User]:
+        with self._lock:
+            phones = [row[0] for row in self._conn.execute(_MATCH_PHONES, (role, location))]
+            return self._load_users(phones)
+    
+    def find_users_near(self, role: str, latitude: float, longitude: float) -> List[User]:
+        # Bounding box of the largest allowed radius, refined by exact distance
+        lat_span = Config.MAX_MATCH_RADIUS_KM / KM_PER_DEGREE_LAT
+        lon_span = lat_span / max(math.cos(math.radians(latitude)), 0.01)
+        with self._lock:
+            rows = self._conn.execute(_NEAR_SUBSCRIPTIONS, (
+                role, latitude - lat_span, latitude + lat_span,
+                longitude - lon_span, longitude + lon_span
+            )).fetchall()
+            phones = [
+                phone for phone, lat, lon, radius_km in rows
+                if haversine_km(latitude, longitude, lat, lon) <= radius_km
+            ]
+            return self._load_users(phones)
+    
+    def all_users(self) -> List[User]:
+        with self._lock:
+            users = {row[0]: self._row_to_user(row) for row in self._conn.execute(_ALL_USERS)}
+            for row in self._conn.execute(_ALL_SUBSCRIPTIONS):
+                user = users.get(row[1])
+                if user:
+                    user.add_subscription(self._row_to_subscription(row))
+        return list(users.values())
+    
+    def _counter(self, name: str) -> int:
+        """Read a trigger-maintained row count"""
+        with self._lock:
+            return self._conn.execute(_SELECT_COUNTER, (name,)).fetchone()[0]
+    
+    def count_users(self) -> int:
+        return self._counter('users')
+    
+    def count_active_users(self) -> int:
+        return self._counter('active_users')
+    
+    def count_subscriptions(self) -> int:
+        return self._counter('subscriptions')
+    
+    def add_job(self, job: Job) -> None:
+        with self._lock:
+            self._conn.execute(_INSERT_JOB, self._job_params(job))
+    
+    def add_jobs(self, jobs: Iterable[Job]) -> int:
+        params = [self._job_params(job) for job in jobs]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(_INSERT_JOB, params)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(params)
+    
+    def get_job(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(_SELECT_JOB, (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+    
+    def delete_job(self, job_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(_DELETE_JOB, (job_id,))
+        return cursor.rowcount > 0
+    
+    def expire_jobs(self, now: float) -> int:
+        with self._lock:
+            cursor = self._conn.execute(_EXPIRE_JOBS, (now,))
+        return cursor.rowcount
+    
+    def find_jobs(self, role: Optional[str] = None, location: Optional[str] = None) -> List[Job]:
+        clauses, params = [], []
+        if role:
+            clauses.append("role = ?")
+            params.append(role)
+        if location:
+            clauses.append("location = ?")
+            params.append(location)
+        
+        query = _SELECT_JOBS
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY created_at, rowid"
+        
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [self._row_to_job(row) for row in rows]
+    
+    def find_recent_jobs(self, role: str, location: str, limit: int) -> List[Job]:
+        # Walks idx_jobs_match backwards, so only the returned rows are read
+        with self._lock:
+            rows = self._conn.execute(_RECENT_JOBS, (role, location, time.time(), limit)).fetchall()
+        return [self._row_to_job(row) for row in rows]
+    
+    def count_jobs(self) -> int:
+        return self._counter('jobs')
+    
+    # Change log, used by SharedRepository to keep per-process caches fresh
+    
+    def data_version(self) -> int:
+        """Counter that changes whenever another connection commits a write"""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def change_seq_range(self) -> Tuple[int, int]:
+        """Oldest and newest sequence numbers still in the user change log"""
+        with self._lock:
+            oldest, newest = self._conn.execute(_CHANGE_SEQ_RANGE).fetchone()
+        return oldest or 0, newest or 0
+    
+    def get_user_changes(self, since_seq: int) -> List[Tuple[int, str]]:
+        """(seq, phone_number) entries written after since_seq"""
+        with self._lock:
+            return self._conn.execute(_USER_CHANGES_SINCE, (since_seq,)).fetchall()
+    
+    def prune_user_changes(self, retain: int) -> int:
+        """Drop all but the newest retain change log entries"""
+        with self._lock:
+            cursor = self._conn.execute(_PRUNE_USER_CHANGES, (retain,))
+        return cursor.rowcount
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,70 @@
+from typing import Dict, Iterator
+
+# Bits per chunk; each chunk is one Python int, so updates copy at most 512 bytes
+CHUNK_BITS = 4096
+
+class Bitmap:
+    """
+    Compressed set of non-negative integers
+    
+    Bits live in fixed-size chunks held in a dict, so sparse or churned ID
+    ranges cost nothing for empty chunks, setting a bit never copies more
+    than one chunk, and intersections only visit chunks both sides share.
+    """
+    
+    __slots__ = ('_chunks',)
+    
+    def __init__(self, chunks: Dict[int, int] = None):
+        self._chunks: Dict[int, int] = chunks or {}
+    
+    def add(self, value: int) -> None:
+        """Set the bit for a value"""
+        chunk, bit = divmod(value, CHUNK_BITS)
+        self._chunks[chunk] = self._chunks.get(chunk, 0) | (1 << bit)
+    
+    def discard(self, value: int) -> None:
+        """Clear the bit for a value if it is set"""
+        chunk, bit = divmod(value, CHUNK_BITS)
+        word = self._chunks.get(chunk)
+        if word is None:
+            return
+        word &= ~(1 << bit)
+        if word:
+            self._chunks[chunk] = word
+        else:
+            del self._chunks[chunk]
+    
+    def __contains__(self, value: int) -> bool:
+        chunk, bit = divmod(value, CHUNK_BITS)
+        return bool(self._chunks.get(chunk, 0) >> bit & 1)
+    
+    def __and__(self, other: 'Bitmap') -> 'Bitmap':
+        small, large = sorted((self._chunks, other._chunks), key=len)
+        chunks = {}
+        for chunk, word in small.items():
+            common = word & large.get(chunk, 0)
+            if common:
+                chunks[chunk] = common
+        return Bitmap(chunks)
+    
+    def __or__(self, other: 'Bitmap') -> 'Bitmap':
+        chunks = dict(self._chunks)
+        for chunk, word in other._chunks.items():
+            chunks[chunk] = chunks.get(chunk, 0) | word
+        return Bitmap(chunks)
+    
+    def __iter__(self) -> Iterator[int]:
+        """Set values in ascending order"""
+        for chunk in sorted(self._chunks):
+            word = self._chunks[chunk]
+            base = chunk * CHUNK_BITS
+            while word:
+                low = word & -word
+                yield base + low.bit_length() - 1
+                word ^= low
+    
+    def __len__(self) -> int:
+        return sum(bin(word).count('1') for word in self._chunks.values())
+    
+    def __bool__(self) -> bool:
+        return bool(self._chunks)
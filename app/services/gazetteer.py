@@ -0,0 +1,191 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from config.config import Config
+import logging
+import os
+import pickle
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Bump when the compiled layout changes so stale caches are rebuilt
+_CACHE_VERSION = 2
+
+# Key under which a trie node stores the place index of a complete name.
+# Not a string, so no token (not even the '' left by a lone comma) can reach it.
+_END = None
+
+class Place:
+    """A named location with coordinates"""
+    
+    __slots__ = ('name', 'latitude', 'longitude')
+    
+    def __init__(self, name: str, latitude: float, longitude: float):
+        self.name = name
+        self.latitude = latitude
+        self.longitude = longitude
+    
+    def __str__(self) -> str:
+        return f"Place({self.name}, {self.latitude}, {self.longitude})"
+
+class Gazetteer:
+    """
+    Location names compiled into a reverse-token trie
+    
+    Every name and alternate name is split into lowercase tokens and
+    inserted last token first, so the longest known location at the end of
+    a message is found by walking the message's tokens backwards. Lookup
+    cost depends only on the number of tokens examined, not on how many
+    places are loaded.
+    """
+    
+    def __init__(self, places: List[Place] = None, trie: dict = None):
+        self.places: List[Place] = places or []
+        self._trie: dict = trie if trie is not None else {}
+    
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        """Lowercase tokens with surrounding punctuation removed"""
+        return [token.strip('.,;:!?()"\'').lower() for token in text.split()]
+    
+    def add_place(self, name: str, latitude: float, longitude: float,
+                  alternate_names: Sequence[str] = ()) -> int:
+        """
+        Add a place and index it under its name and alternates
+        
+        A name already indexed for another place keeps its first owner, so
+        load larger or more important places first.
+        
+        Returns:
+            int: Index of the new place
+        """
+        place_index = len(self.places)
+        self.places.append(Place(name, latitude, longitude))
+        for variant in (name, *alternate_names):
+            tokens = [t for t in self.tokenize(variant) if t]
+            if not tokens:
+                continue
+            node = self._trie
+            for token in reversed(tokens):
+                node = node.setdefault(token, {})
+            node.setdefault(_END, place_index)
+        return place_index
+    
+    def match_suffix(self, tokens: Sequence[str]) -> Optional[Tuple[int, Place]]:
+        """
+        Find the longest known location at the end of a token list
+        
+        Args:
+            tokens: Lowercase tokens, e.g. from Gazetteer.tokenize
+            
+        Returns:
+            Tuple[int, Place]: (number of trailing tokens matched, place), or None
+        """
+        node = self._trie
+        best = None
+        for depth, token in enumerate(reversed(tokens), start=1):
+            node = node.get(token)
+            if node is None:
+                break
+            place_index = node.get(_END)
+            if place_index is not None:
+                best = (depth, self.places[place_index])
+        return best
+    
+    def resolve(self, text: str) -> Optional[Place]:
+        """Resolve a whole string to a place, or None if it is not a known location"""
+        tokens = self.tokenize(text)
+        match = self.match_suffix(tokens)
+        if match and match[0] == len(tokens):
+            return match[1]
+        return None
+    
+    def __len__(self) -> int:
+        return len(self.places)
+    
+    @classmethod
+    def from_file(cls, path: str) -> 'Gazetteer':
+        """
+        Parse a gazetteer file
+        
+        Two tab-separated formats are accepted: the bundled
+        ``name, alternates, latitude, longitude`` layout, and GeoNames
+        ``cities*.txt`` exports (places are loaded by descending population
+        so the biggest city wins an ambiguous name).
+        """
+        rows: List[Tuple[int, str, List[str], float, float]] = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) >= 15:
+                    # GeoNames: name=1, asciiname=2, alternatenames=3, lat=4, lon=5, population=14
+                    alternates = [fields[2]] + [a for a in fields[3].split(',') if a]
+                    population = int(fields[14] or 0)
+                    rows.append((population, fields[1], alternates, float(fields[4]), float(fields[5])))
+                elif len(fields) >= 4:
+                    alternates = [a.strip() for a in fields[1].split(',') if a.strip()]
+                    rows.append((0, fields[0], alternates, float(fields[2]), float(fields[3])))
+        
+        rows.sort(key=lambda row: -row[0])
+        gazetteer = cls()
+        for _, name, alternates, latitude, longitude in rows:
+            gazetteer.add_place(name, latitude, longitude, alternates)
+        return gazetteer
+    
+    @classmethod
+    def load(cls, path: str, cache_path: Optional[str] = None) -> 'Gazetteer':
+        """
+        Load a gazetteer, reusing a compiled cache when it is up to date
+        
+        Args:
+            path: Source gazetteer file
+            cache_path: Where to keep the compiled trie (None disables caching)
+            
+        Returns:
+            Gazetteer: The loaded gazetteer
+        """
+        stat = os.stat(path)
+        signature = (_CACHE_VERSION, os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'rb') as f:
+                    cached = pickle.load(f)
+                if cached.get('signature') == signature:
+                    places = [Place(*fields) for fields in cached['places']]
+                    return cls(places, cached['trie'])
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable gazetteer cache {cache_path}: {str(e)}")
+        
+        gazetteer = cls.from_file(path)
+        logger.info(f"Compiled gazetteer with {len(gazetteer)} places from {path}")
+        
+        if cache_path:
+            try:
+                tmp_path = f"{cache_path}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump({
+                        'signature': signature,
+                        'places': [(p.name, p.latitude, p.longitude) for p in gazetteer.places],
+                        'trie': gazetteer._trie,
+                    }, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                logger.warning(f"Could not write gazetteer cache {cache_path}: {str(e)}")
+        
+        return gazetteer
+
+_default_gazetteer: Optional[Gazetteer] = None
+_default_lock = threading.Lock()
+
+def get_gazetteer() -> Gazetteer:
+    """Get the process-wide gazetteer configured by Config.GAZETTEER_PATH"""
+    global _default_gazetteer
+    if _default_gazetteer is None:
+        with _default_lock:
+            if _default_gazetteer is None:
+                _default_gazetteer = Gazetteer.load(
+                    Config.GAZETTEER_PATH, Config.GAZETTEER_CACHE_PATH or None
+                )
+    return _default_gazetteer
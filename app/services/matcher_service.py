@@ -1,51 +1,233 @@
-from typing import List
+from typing import List, Optional, Tuple
 from app.models.user import User
 from app.models.job import Job
+from app.models.subscription import Subscription
+from app.repositories.base_repository import BaseRepository
+from app.repositories.factory import create_repository
+from app.services.gazetteer import Gazetteer, get_gazetteer
+from app.services.role_taxonomy import RoleTaxonomy, get_role_taxonomy
+from app.services.structured_logging import SAMPLED
+from config.config import Config
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+class SubscriptionLimitError(Exception):
+    """Raised when a user already has Config.MAX_SUBSCRIPTIONS_PER_USER subscriptions"""
+
 class MatcherService:
     """Service for matching jobs with interested users"""
     
-    def __init__(self):
-        # In-memory storage for MVP (replace with database later)
-        self.users: List[User] = []
-        self.jobs: List[Job] = []
+    def __init__(self, repository: BaseRepository = None, role_taxonomy: RoleTaxonomy = None,
+                 gazetteer: Gazetteer = None):
+        # Storage backend chosen by Config.STORAGE_BACKEND unless injected
+        self.repository = repository or create_repository()
+        
+        # Roles are mapped to canonical names once, on the way in, so that
+        # synonyms share a vocabulary ID and matching stays an exact lookup
+        self.role_taxonomy = role_taxonomy or get_role_taxonomy()
+        
+        # Coordinates for radius matching come from the local gazetteer
+        self.gazetteer = gazetteer or get_gazetteer()
+    
+    def canonical_role(self, role: str) -> str:
+        """Canonical, normalized form of a role as stored and matched"""
+        return User.normalize(self.role_taxonomy.canonicalize(role))
+    
+    @property
+    def users(self) -> List[User]:
+        """All registered users in registration order"""
+        return self.repository.all_users()
+    
+    @property
+    def jobs(self) -> List[Job]:
+        """All posted jobs in posting order"""
+        return self.repository.find_jobs()
     
-    def register_user(self, phone_number: str, role: str, location: str) -> bool:
+    def coordinates_for(self, location: str) -> Optional[Tuple[float, float]]:
+        """(latitude, longitude) of a known location, or None"""
+        place = self.gazetteer.resolve(location)
+        return (place.latitude, place.longitude) if place else None
+    
+    def register_user(self, phone_number: str, role: str, location: str,
+                      radius_km: float = 0.0) -> bool:
         """
-        Register a new job seeker
+        Register a job seeker, adding a subscription to any they already have
         
         Args:
             phone_number: User's WhatsApp number
             role: Desired job role
             location: Preferred location
+            radius_km: Also match jobs within this distance of the location
             
         Returns:
             bool: True if registration successful
         """
         try:
-            # Check if user already exists
-            existing_user = self.get_user_by_phone(phone_number)
-            if existing_user:
-                # Update existing user's preferences
-                existing_user.role = role.lower().strip()
-                existing_user.location = location.lower().strip()
-                logger.info(f"Updated user preferences: {phone_number}")
-            else:
-                # Create new user
-                new_user = User(phone_number, role, location)
-                self.users.append(new_user)
-                logger.info(f"Registered new user: {phone_number}")
-            
+            self.add_subscription(phone_number, role, location, radius_km)
             return True
             
         except Exception as e:
             logger.error(f"Failed to register user {phone_number}: {str(e)}")
             return False
     
-    def post_job(self, employer_phone: str, role: str, location: str) -> Job:
+    def add_subscription(self, phone_number: str, role: str, location: str,
+                         radius_km: float = 0.0) -> Tuple[Subscription, bool]:
+        """
+        Subscribe a user to a role and location, creating the user if needed
+        
+        Args:
+            phone_number: User's WhatsApp number
+            role: Desired job role
+            location: Preferred location
+            radius_km: Also match jobs within this distance of the location
+            
+        Returns:
+            Tuple[Subscription, bool]: The stored subscription and True if it is new
+            
+        Raises:
+            SubscriptionLimitError: If the user cannot take another subscription
+        """
+        role = self.canonical_role(role)
+        location = User.normalize(location)
+        
+        user = self.repository.get_user(phone_number)
+        if (user and user.subscription_count >= Config.MAX_SUBSCRIPTIONS_PER_USER
+                and not user.find_subscription(role, location)):
+            raise SubscriptionLimitError(
+                f"{phone_number} already has {user.subscription_count} subscriptions"
+            )
+        
+        radius_km, coordinates = self._resolve_radius(location, radius_km)
+        subscription, created = self.repository.add_subscription(
+            phone_number, role, location, radius_km, coordinates
+        )
+        
+        if created:
+            logger.info("Added subscription %s for %s", subscription.id, phone_number, extra=SAMPLED)
+        else:
+            logger.info("Updated subscription %s for %s", subscription.id, phone_number, extra=SAMPLED)
+        return subscription, created
+    
+    def list_subscriptions(self, phone_number: str) -> List[Subscription]:
+        """A user's subscriptions, oldest first (empty if the user is unknown)"""
+        user = self.repository.get_user(phone_number)
+        return user.subscriptions if user else []
+    
+    def remove_subscription(self, phone_number: str, subscription_id: int) -> bool:
+        """
+        Delete one of a user's subscriptions
+        
+        Args:
+            phone_number: User's WhatsApp number
+            subscription_id: ID of the subscription to delete
+            
+        Returns:
+            bool: True if the subscription existed and was deleted
+        """
+        removed = self.repository.remove_subscription(phone_number, subscription_id)
+        
+        if removed:
+            logger.info("Removed subscription %s for %s", subscription_id, phone_number)
+        return removed
+    
+    def upsert_user(self, phone_number: str, role: str, location: str,
+                    radius_km: float = 0.0) -> Tuple[User, bool]:
+        """
+        Create a user or replace their subscriptions in a single atomic step
+        
+        Args:
+            phone_number: User's WhatsApp number
+            role: Desired job role
+            location: Preferred location
+            radius_km: Also match jobs within this distance of the location
+            
+        Returns:
+            Tuple[User, bool]: The stored user and True if it was newly created
+        """
+        radius_km, coordinates = self._resolve_radius(location, radius_km)
+        user, created = self.repository.upsert_user(
+            phone_number, self.canonical_role(role), User.normalize(location),
+            radius_km, coordinates
+        )
+        
+        if created:
+            logger.info("Registered new user: %s", phone_number, extra=SAMPLED)
+        else:
+            logger.info("Updated user preferences: %s", phone_number)
+        return user, created
+    
+    def update_user_preferences(self, phone_number: str, role: str, location: str,
+                                radius_km: float = 0.0) -> bool:
+        """
+        Replace a user's subscriptions with one role and location
+        
+        Args:
+            phone_number: User's WhatsApp number
+            role: New desired job role
+            location: New preferred location
+            radius_km: Also match jobs within this distance of the location
+            
+        Returns:
+            bool: True if the user exists and was updated
+        """
+        radius_km, coordinates = self._resolve_radius(location, radius_km)
+        updated = self.repository.update_user(
+            phone_number, self.canonical_role(role), User.normalize(location),
+            radius_km, coordinates
+        )
+        
+        if updated:
+            logger.info("Updated user preferences: %s", phone_number)
+        return updated
+    
+    def _resolve_radius(self, location: str,
+                        radius_km: float) -> Tuple[float, Optional[Tuple[float, float]]]:
+        """Clamp a search radius and look up the coordinates it is centred on"""
+        if not radius_km or radius_km <= 0:
+            return 0.0, None
+        coordinates = self.coordinates_for(location)
+        if coordinates is None:
+            # Unknown places have no position, so only exact matching applies
+            return 0.0, None
+        return min(float(radius_km), Config.MAX_MATCH_RADIUS_KM), coordinates
+    
+    def deactivate_user(self, phone_number: str) -> bool:
+        """
+        Stop sending alerts to a user without deleting their registration
+        
+        Args:
+            phone_number: User's WhatsApp number
+            
+        Returns:
+            bool: True if the user exists and was deactivated
+        """
+        deactivated = self.repository.deactivate_user(phone_number)
+        
+        if deactivated:
+            logger.info("Deactivated user: %s", phone_number)
+        return deactivated
+    
+    def set_digest_mode(self, phone_number: str, enabled: bool) -> bool:
+        """
+        Switch a user between instant alerts and periodic digests
+        
+        Args:
+            phone_number: User's WhatsApp number
+            enabled: True to batch alerts into digests
+            
+        Returns:
+            bool: True if the user exists and was updated
+        """
+        updated = self.repository.set_digest(phone_number, enabled)
+        
+        if updated:
+            logger.info("Digest mode %s for %s", 'on' if enabled else 'off', phone_number)
+        return updated
+    
+    def post_job(self, employer_phone: str, role: str, location: str,
+                 ttl_seconds: Optional[float] = None) -> Job:
         """
         Post a new job and return it
         
@@ -53,20 +235,65 @@ class MatcherService:
             employer_phone: Employer's WhatsApp number
             role: Job role
             location: Job location
+            ttl_seconds: Listing lifetime (defaults to Config.JOB_TTL_DAYS,
+                capped at Config.JOB_MAX_TTL_DAYS)
             
         Returns:
             Job: The created job object
         """
         try:
-            new_job = Job(employer_phone, role, location)
-            self.jobs.append(new_job)
-            logger.info(f"Posted new job: {new_job.id} - {role} in {location}")
+            new_job = Job(
+                employer_phone, self.canonical_role(role), location,
+                description=f"{role} position in {location}",
+                ttl_seconds=self._job_ttl(ttl_seconds)
+            )
+            self.repository.add_job(new_job)
+            logger.info("Posted new job: %s - %s in %s", new_job.id, role, location)
             return new_job
             
         except Exception as e:
             logger.error(f"Failed to post job: {str(e)}")
             raise
     
+    @staticmethod
+    def _job_ttl(ttl_seconds: Optional[float]) -> Optional[int]:
+        """Clamp a requested job lifetime, falling back to the configured default"""
+        if ttl_seconds is None:
+            # Only the configured default can leave a job open indefinitely
+            if Config.JOB_TTL_DAYS <= 0:
+                return None
+            ttl_seconds = Config.JOB_TTL_DAYS * 86400
+        elif ttl_seconds <= 0:
+            raise ValueError(f"Job lifetime must be positive, got {ttl_seconds}")
+        return int(min(ttl_seconds, Config.JOB_MAX_TTL_DAYS * 86400))
+    
+    def close_job(self, employer_phone: str, job_id: str) -> bool:
+        """
+        Take a job down before it expires
+        
+        Args:
+            employer_phone: Phone number of the employer closing the job
+            job_id: ID of the job to close
+            
+        Returns:
+            bool: True if the job existed, belonged to the employer and was closed
+        """
+        job = self.repository.get_job(job_id)
+        if job is None or job.employer_phone != employer_phone:
+            return False
+        
+        closed = self.repository.delete_job(job_id)
+        if closed:
+            logger.info("Closed job %s", job_id)
+        return closed
+    
+    def expire_jobs(self) -> int:
+        """Remove every job whose TTL has run out; returns the number removed"""
+        expired = self.repository.expire_jobs(time.time())
+        if expired:
+            logger.info("Expired %d jobs", expired)
+        return expired
+    
     def find_matching_users(self, job: Job) -> List[User]:
         """
         Find all users that match a job posting
@@ -77,39 +304,56 @@ class MatcherService:
         Returns:
             List[User]: List of matching users
         """
-        matching_users = []
+        matching_users = self.repository.find_active_users(job.role, job.location)
         
-        for user in self.users:
-            if user.matches_job(job.role, job.location):
-                matching_users.append(user)
+        # Seekers elsewhere whose radius reaches the job's location
+        coordinates = self.coordinates_for(job.location)
+        if coordinates is not None:
+            nearby = self.repository.find_users_near(job.role, *coordinates)
+            if nearby:
+                seen = {user.phone_number for user in matching_users}
+                matching_users.extend(
+                    user for user in nearby if user.phone_number not in seen
+                )
         
-        logger.info(f"Found {len(matching_users)} matching users for job {job.id}")
+        logger.info("Found %d matching users for job %s", len(matching_users), job.id)
         return matching_users
     
-    def get_user_by_phone(self, phone_number: str) -> User:
+    def get_user_by_phone(self, phone_number: str) -> Optional[User]:
         """Get user by phone number"""
-        for user in self.users:
-            if user.phone_number == phone_number:
-                return user
-        return None
+        return self.repository.get_user(phone_number)
     
     def get_user_stats(self) -> dict:
         """Get statistics about registered users"""
-        active_users = [u for u in self.users if u.is_active]
         return {
-            'total_users': len(self.users),
-            'active_users': len(active_users),
-            'total_jobs': len(self.jobs)
+            'total_users': self.repository.count_users(),
+            'active_users': self.repository.count_active_users(),
+            'total_subscriptions': self.repository.count_subscriptions(),
+            'total_jobs': self.repository.count_jobs()
         }
     
+    def get_recent_jobs(self, role: str, location: str, limit: int = None) -> List[Job]:
+        """
+        Latest open jobs for a role and location, newest first
+        
+        Args:
+            role: Job role
+            location: Job location
+            limit: Maximum jobs to return (defaults to Config.BACKFILL_JOB_COUNT)
+            
+        Returns:
+            List[Job]: At most limit jobs
+        """
+        limit = Config.BACKFILL_JOB_COUNT if limit is None else limit
+        if limit <= 0:
+            return []
+        return self.repository.find_recent_jobs(
+            self.canonical_role(role), User.normalize(location), limit
+        )
+    
     def get_jobs_by_criteria(self, role: str = None, location: str = None) -> List[Job]:
         """Get jobs filtered by criteria"""
-        filtered_jobs = self.jobs
-        
-        if role:
-            filtered_jobs = [j for j in filtered_jobs if j.role == role.lower().strip()]
-        
-        if location:
-            filtered_jobs = [j for j in filtered_jobs if j.location == location.lower().strip()]
-        
-        return filtered_jobs 
\ No newline at end of file
+        return self.repository.find_jobs(
+            self.canonical_role(role) if role else None,
+            User.normalize(location) if location else None
+        )
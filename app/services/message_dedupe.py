@@ -0,0 +1,203 @@
+from collections import OrderedDict
+from typing import Optional, Tuple
+from config.config import Config
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS webhook_messages (
+    message_sid TEXT PRIMARY KEY,
+    response TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_webhook_messages_created ON webhook_messages (created_at);
+"""
+
+# How often a duplicate polls for the first delivery's response, in seconds
+_POLL_INTERVAL = 0.05
+
+class MessageDedupe:
+    """
+    Remembers the reply to each inbound message so redeliveries are not reprocessed
+    
+    Twilio retries a webhook POST it considers slow, with the same
+    MessageSid. The first delivery claims the SID and stores its reply when
+    done; a duplicate gets that reply back, waiting for it if the first
+    delivery is still being processed.
+    """
+    
+    def claim(self, message_sid: str, wait: float = None) -> Tuple[bool, Optional[str]]:
+        """
+        Claim a message for processing or fetch the reply already given
+        
+        Args:
+            message_sid: Twilio's ID for the inbound message
+            wait: Seconds to wait for an in-flight first delivery
+                (defaults to Config.WEBHOOK_DEDUPE_WAIT)
+        
+        Returns:
+            (owned, response): owned is True if the caller must process the
+            message and call complete() or release(). Otherwise response is
+            the cached reply, or None if the first delivery has not finished.
+        """
+        raise NotImplementedError
+    
+    def complete(self, message_sid: str, response: str) -> None:
+        """Store the reply for a claimed message"""
+        raise NotImplementedError
+    
+    def release(self, message_sid: str) -> None:
+        """Give up a claim without a reply, so a redelivery is processed again"""
+        raise NotImplementedError
+    
+    def close(self) -> None:
+        """Release any resources held by the cache"""
+
+class MemoryMessageDedupe(MessageDedupe):
+    """Per-process LRU of recent replies, bounded by size and age"""
+    
+    def __init__(self, max_entries: int = None, ttl: float = None):
+        self.max_entries = max_entries or Config.WEBHOOK_DEDUPE_MAX_ENTRIES
+        self.ttl = Config.WEBHOOK_DEDUPE_TTL if ttl is None else ttl
+        # message_sid -> (expires_at, response); response is None while in flight
+        self._entries: OrderedDict = OrderedDict()
+        self._cond = threading.Condition()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def claim(self, message_sid: str, wait: float = None) -> Tuple[bool, Optional[str]]:
+        wait = Config.WEBHOOK_DEDUPE_WAIT if wait is None else wait
+        deadline = time.monotonic() + wait
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                entry = self._entries.get(message_sid)
+                if entry is None or entry[0] <= now:
+                    self._entries[message_sid] = (now + self.ttl, None)
+                    self._entries.move_to_end(message_sid)
+                    self._evict(now)
+                    return True, None
+                
+                self._entries.move_to_end(message_sid)
+                if entry[1] is not None or now >= deadline:
+                    return False, entry[1]
+                self._cond.wait(deadline - now)
+    
+    def complete(self, message_sid: str, response: str) -> None:
+        with self._cond:
+            self._entries[message_sid] = (time.monotonic() + self.ttl, response)
+            self._cond.notify_all()
+    
+    def release(self, message_sid: str) -> None:
+        with self._cond:
+            self._entries.pop(message_sid, None)
+            self._cond.notify_all()
+    
+    def _evict(self, now: float) -> None:
+        """Drop least recently used entries over the size bound, and expired ones at the front"""
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        while self._entries:
+            expires_at, _ = next(iter(self._entries.values()))
+            if expires_at > now:
+                break
+            self._entries.popitem(last=False)
+
+class SQLiteMessageDedupe(MessageDedupe):
+    """
+    Reply cache in a SQLite file shared by every worker process
+    
+    The PRIMARY KEY insert is the claim, so only one worker processes a
+    message even when the redelivery lands on a different process. Rows
+    older than the TTL are swept every WEBHOOK_DEDUPE_PRUNE_EVERY claims.
+    """
+    
+    def __init__(self, db_path: str = None, ttl: float = None):
+        self.db_path = db_path or Config.WEBHOOK_DEDUPE_DB_PATH
+        self.ttl = Config.WEBHOOK_DEDUPE_TTL if ttl is None else ttl
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._claims = 0
+        
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(f"PRAGMA busy_timeout={Config.SQLITE_BUSY_TIMEOUT_MS}")
+            self._conn.executescript(_SCHEMA)
+    
+    def claim(self, message_sid: str, wait: float = None) -> Tuple[bool, Optional[str]]:
+        wait = Config.WEBHOOK_DEDUPE_WAIT if wait is None else wait
+        deadline = time.monotonic() + wait
+        while True:
+            now = time.time()
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._claims += 1
+                    if self._claims % Config.WEBHOOK_DEDUPE_PRUNE_EVERY == 0:
+                        self._conn.execute(
+                            "DELETE FROM webhook_messages WHERE created_at <= ?", (now - self.ttl,)
+                        )
+                    row = self._conn.execute(
+                        "SELECT response, created_at FROM webhook_messages WHERE message_sid = ?",
+                        (message_sid,)
+                    ).fetchone()
+                    if row is None or row[1] <= now - self.ttl:
+                        self._conn.execute(
+                            "INSERT OR REPLACE INTO webhook_messages (message_sid, response, created_at) "
+                            "VALUES (?, NULL, ?)",
+                            (message_sid, now)
+                        )
+                        self._conn.execute("COMMIT")
+                        return True, None
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            
+            if row[0] is not None or time.monotonic() >= deadline:
+                return False, row[0]
+            time.sleep(_POLL_INTERVAL)
+    
+    def complete(self, message_sid: str, response: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE webhook_messages SET response = ? WHERE message_sid = ?",
+                (response, message_sid)
+            )
+    
+    def release(self, message_sid: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM webhook_messages WHERE message_sid = ? AND response IS NULL",
+                (message_sid,)
+            )
+    
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+def create_message_dedupe(backend: str = None) -> MessageDedupe:
+    """
+    Build the reply cache named in the configuration
+    
+    Args:
+        backend: 'memory' or 'sqlite' (defaults to Config.WEBHOOK_DEDUPE_BACKEND)
+    
+    Returns:
+        MessageDedupe: The reply cache
+    """
+    backend = (backend or Config.WEBHOOK_DEDUPE_BACKEND).lower()
+    
+    if backend == 'memory':
+        return MemoryMessageDedupe()
+    
+    if backend == 'sqlite':
+        return SQLiteMessageDedupe()
+    
+    raise ValueError(f"Unknown webhook dedupe backend: {backend}")
@@ -0,0 +1,211 @@
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+import threading
+import time
+
+# Latency buckets in seconds, from sub-millisecond parsing up to slow Twilio calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    """Render a Prometheus label set, e.g. {stage="parse",le="0.1"}"""
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+class _Metric:
+    """Common parts of a metric family: name, help text and labelled children"""
+    
+    kind = ''
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+    
+    def labels(self, *values: str):
+        """The child metric for one combination of label values"""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+    
+    def _new_child(self):
+        raise NotImplementedError
+    
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+    
+    def render(self) -> List[str]:
+        """Lines of the Prometheus text format for this family"""
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ] + self._samples()
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+    
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+class Counter(_Metric):
+    """Monotonically increasing count, e.g. messages sent"""
+    
+    kind = 'counter'
+    
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+    
+    def inc(self, amount: float = 1) -> None:
+        """Increment the unlabelled counter"""
+        self.labels().inc(amount)
+    
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+            for values, child in list(self._children.items())
+        ]
+
+class _Timer:
+    """Context manager that observes the elapsed time of its block"""
+    
+    __slots__ = ('_child', '_start')
+    
+    def __init__(self, child: '_HistogramChild'):
+        self._child = child
+    
+    def __enter__(self) -> '_Timer':
+        self._start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self._child.observe(time.perf_counter() - self._start)
+
+class _HistogramChild:
+    __slots__ = ('upper_bounds', 'counts', 'sum', '_lock')
+    
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # Per-bucket counts (not cumulative); the last slot is +Inf
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+    
+    def time(self) -> _Timer:
+        return _Timer(self)
+
+class Histogram(_Metric):
+    """Distribution of observed values, e.g. stage latencies in seconds"""
+    
+    kind = 'histogram'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(buckets))
+    
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.upper_bounds)
+    
+    def observe(self, value: float) -> None:
+        """Record a value in the unlabelled histogram"""
+        self.labels().observe(value)
+    
+    def time(self) -> _Timer:
+        """Time a block into the unlabelled histogram"""
+        return self.labels().time()
+    
+    def _samples(self) -> List[str]:
+        lines = []
+        for values, child in list(self._children.items()):
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for upper_bound, count in zip(self.upper_bounds + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_value(upper_bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class Gauge(_Metric):
+    """Value read from a callback at scrape time, e.g. a queue depth"""
+    
+    kind = 'gauge'
+    
+    def __init__(self, name: str, documentation: str, read: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.read = read
+    
+    def _samples(self) -> List[str]:
+        return [f"{self.name} {_format_value(self.read())}"]
+
+class MetricsRegistry:
+    """Collection of metric families rendered together for /metrics"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric family, replacing any with the same name"""
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+    
+    def gauge(self, name: str, documentation: str, read: Callable[[], float]) -> Gauge:
+        return self.register(Gauge(name, documentation, read))
+    
+    def render(self) -> str:
+        """Every registered family in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+# Process-wide registry and the metrics shared across modules
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'jobbot_stage_seconds', 'Time spent in each processing stage', ('stage',)
+)
+OUTBOUND_MESSAGES = REGISTRY.counter(
+    'jobbot_outbound_messages_total',
+    'Messages handed to Twilio, by result (sent, failed, or throttled for each HTTP 429)', ('result',)
+)
+THROTTLED_MESSAGES = REGISTRY.counter(
+    'jobbot_throttled_messages_total', 'Inbound commands rejected by per-sender limits', ('command',)
+)
@@ -0,0 +1,375 @@
+from typing import Callable, Iterable, List, Optional, Tuple
+from config.config import Config
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Delivery states of an outbox entry
+PENDING = 'pending'
+SENDING = 'sending'
+SENT = 'sent'
+FAILED = 'failed'
+DEAD = 'dead'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    idempotency_key TEXT PRIMARY KEY,
+    to_number TEXT NOT NULL,
+    body TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at);
+
+-- Alerts held back for seekers in digest mode. Rows are kept once flushed
+-- (digest_key names the outbox entry they went into), so buffering the
+-- same alert twice is a no-op.
+CREATE TABLE IF NOT EXISTS digest_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    to_number TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    line TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    digest_key TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_digest_items_job ON digest_items (to_number, job_id);
+CREATE INDEX IF NOT EXISTS idx_digest_items_pending ON digest_items (to_number, id)
+    WHERE digest_key IS NULL;
+"""
+
+class OutboxEntry:
+    """A single outbound message recorded in the outbox"""
+    
+    def __init__(self, idempotency_key: str, to_number: str, body: str,
+                 attempts: int = 0, updated_at: float = 0.0):
+        self.idempotency_key = idempotency_key
+        self.to_number = to_number
+        self.body = body
+        self.attempts = attempts
+        self.updated_at = updated_at
+    
+    def __str__(self) -> str:
+        return f"OutboxEntry({self.idempotency_key}, {self.to_number})"
+
+class NotificationOutbox:
+    """
+    Durable SQLite record of outbound alerts
+    
+    Every alert is written as ``pending`` before it is sent and moves to
+    ``sending`` through an atomic claim, so two senders (threads or
+    processes) can never both send the same idempotency key. Entries that
+    fail are retried with backoff until Config.OUTBOX_MAX_ATTEMPTS, after
+    which they are parked as ``dead``.
+    """
+    
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or Config.OUTBOX_DB_PATH
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(f"PRAGMA busy_timeout={Config.SQLITE_BUSY_TIMEOUT_MS}")
+            self._conn.executescript(_SCHEMA)
+    
+    @staticmethod
+    def make_key(job_id: str, phone_number: str) -> str:
+        """Idempotency key for one job alert to one recipient"""
+        return f"job:{job_id}:{phone_number}"
+    
+    @staticmethod
+    def make_digest_key(phone_number: str, last_item_id: int) -> str:
+        """Idempotency key for the digest ending with a given buffered item"""
+        return f"digest:{phone_number}:{last_item_id}"
+    
+    def enqueue_many(self, entries: Iterable[Tuple[str, str, str]]) -> int:
+        """
+        Record messages as pending, ignoring keys that already exist
+        
+        Args:
+            entries: (idempotency_key, to_number, body) tuples
+        
+        Returns:
+            int: Number of newly recorded entries
+        """
+        now = time.time()
+        not_before = now + Config.OUTBOX_PENDING_GRACE
+        rows = [(key, to, body, PENDING, now, now, not_before) for key, to, body in entries]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO outbox (idempotency_key, to_number, body, status, "
+                    "created_at, updated_at, next_attempt_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._conn.total_changes - before
+    
+    def claim_many(self, keys: Iterable[str]) -> List[str]:
+        """
+        Atomically mark entries as being sent
+        
+        Keys that are already sent, dead or claimed by another sender are
+        skipped, which is what makes replays safe.
+        
+        Returns:
+            List[str]: Keys this caller now owns and must send
+        """
+        now = time.time()
+        claimed = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key in keys:
+                    cursor = self._conn.execute(
+                        "UPDATE outbox SET status = ?, attempts = attempts + 1, updated_at = ? "
+                        "WHERE idempotency_key = ? AND status IN (?, ?)",
+                        (SENDING, now, key, PENDING, FAILED)
+                    )
+                    if cursor.rowcount:
+                        claimed.append(key)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return claimed
+    
+    def claim_due(self, limit: int) -> List[OutboxEntry]:
+        """
+        Claim pending or failed entries whose retry time has arrived
+        
+        Args:
+            limit: Maximum number of entries to claim
+        
+        Returns:
+            List[OutboxEntry]: Entries this caller now owns and must send
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT idempotency_key, to_number, body, attempts FROM outbox "
+                    "WHERE status IN (?, ?) AND next_attempt_at <= ? "
+                    "ORDER BY next_attempt_at LIMIT ?",
+                    (PENDING, FAILED, now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE outbox SET status = ?, attempts = attempts + 1, updated_at = ? "
+                    "WHERE idempotency_key = ?",
+                    [(SENDING, now, row[0]) for row in rows]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [OutboxEntry(key, to, body, attempts + 1, now) for key, to, body, attempts in rows]
+    
+    def find_stale(self, older_than: float) -> List[OutboxEntry]:
+        """
+        Find entries stuck in ``sending``, e.g. after a crash mid-send
+        
+        These may or may not have reached Twilio, so the caller must check
+        before releasing them for another attempt.
+        
+        Args:
+            older_than: Seconds since the claim after which an entry is stale
+        """
+        cutoff = time.time() - older_than
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idempotency_key, to_number, body, attempts, updated_at FROM outbox "
+                "WHERE status = ? AND updated_at < ?",
+                (SENDING, cutoff)
+            ).fetchall()
+        return [OutboxEntry(*row) for row in rows]
+    
+    def buffer_digest_items(self, entries: Iterable[Tuple[str, str, str]]) -> int:
+        """
+        Hold alerts for digest delivery, ignoring ones already buffered
+        
+        Args:
+            entries: (to_number, job_id, line) tuples
+        
+        Returns:
+            int: Number of newly buffered items
+        """
+        now = time.time()
+        rows = [(to, job_id, line, now) for to, job_id, line in entries]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO digest_items (to_number, job_id, line, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return self._conn.total_changes - before
+    
+    def claim_digests(self, max_items: int, max_age: float, limit: int,
+                      render: Callable[[List[str]], str]) -> List[OutboxEntry]:
+        """
+        Turn buffered alerts into digest messages and claim them for sending
+        
+        A recipient is due once they have max_items buffered alerts or the
+        oldest has waited max_age seconds. Each due recipient gets one
+        digest of up to max_items alerts, oldest first; any left over stay
+        buffered for the next pass. Items are moved into the outbox in the
+        same transaction, so a digest is never lost or built twice.
+        
+        Args:
+            max_items: Alerts per digest, and the count that makes one due
+            max_age: Seconds the oldest alert may wait before a digest is due
+            limit: Maximum number of digests to build
+            render: Builds the message body from the buffered lines
+        
+        Returns:
+            List[OutboxEntry]: Digests this caller now owns and must send
+        """
+        now = time.time()
+        entries = []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                recipients = [row[0] for row in self._conn.execute(
+                    "SELECT to_number FROM digest_items WHERE digest_key IS NULL "
+                    "GROUP BY to_number HAVING COUNT(*) >= ? OR MIN(created_at) <= ? LIMIT ?",
+                    (max_items, now - max_age, limit)
+                )]
+                for to_number in recipients:
+                    items = self._conn.execute(
+                        "SELECT id, line FROM digest_items WHERE to_number = ? AND digest_key IS NULL "
+                        "ORDER BY id LIMIT ?",
+                        (to_number, max_items)
+                    ).fetchall()
+                    key = self.make_digest_key(to_number, items[-1][0])
+                    body = render([line for _, line in items])
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO outbox (idempotency_key, to_number, body, status, attempts, "
+                        "created_at, updated_at, next_attempt_at) VALUES (?, ?, ?, ?, 1, ?, ?, ?)",
+                        (key, to_number, body, SENDING, now, now, now)
+                    )
+                    self._conn.execute(
+                        "UPDATE digest_items SET digest_key = ? "
+                        "WHERE to_number = ? AND digest_key IS NULL AND id <= ?",
+                        (key, to_number, items[-1][0])
+                    )
+                    entries.append(OutboxEntry(key, to_number, body, 1, now))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return entries
+    
+    def count_buffered(self) -> int:
+        """Number of alerts waiting for a digest"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM digest_items WHERE digest_key IS NULL"
+            ).fetchone()
+        return row[0]
+    
+    def mark_sent(self, key: str) -> None:
+        """Record that an entry was delivered to Twilio"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, last_error = NULL, updated_at = ? "
+                "WHERE idempotency_key = ?",
+                (SENT, time.time(), key)
+            )
+    
+    def mark_failed(self, key: str, error: Optional[str] = None) -> None:
+        """Schedule an entry for retry, or park it once attempts run out"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts FROM outbox WHERE idempotency_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return
+            attempts = row[0]
+            if attempts >= Config.OUTBOX_MAX_ATTEMPTS:
+                status, next_attempt = DEAD, now
+                logger.error(f"Giving up on outbox entry {key} after {attempts} attempts")
+            else:
+                delay = min(Config.OUTBOX_RETRY_MAX_DELAY,
+                            Config.OUTBOX_RETRY_INTERVAL * (2 ** (attempts - 1)))
+                status, next_attempt = FAILED, now + delay
+            self._conn.execute(
+                "UPDATE outbox SET status = ?, last_error = ?, updated_at = ?, next_attempt_at = ? "
+                "WHERE idempotency_key = ?",
+                (status, error, now, next_attempt, key)
+            )
+    
+    def prune(self, older_than: float) -> int:
+        """
+        Delete delivered and parked entries last touched before the cutoff
+        
+        Digest items flushed before the cutoff go too. A pruned key can be
+        recorded again, so older_than must outlast any replay of the same
+        job's alerts.
+        
+        Args:
+            older_than: Seconds a sent or dead entry is kept
+        
+        Returns:
+            int: Number of entries deleted
+        """
+        cutoff = time.time() - older_than
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM outbox WHERE status IN (?, ?) AND updated_at < ?",
+                (SENT, DEAD, cutoff)
+            )
+            self._conn.execute(
+                "DELETE FROM digest_items WHERE digest_key IS NOT NULL AND created_at < ?",
+                (cutoff,)
+            )
+        return cursor.rowcount
+    
+    def get_status(self, key: str) -> Optional[str]:
+        """Get the delivery state of an entry, or None if unknown"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status FROM outbox WHERE idempotency_key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+    
+    def count_pending(self) -> int:
+        """Number of entries not yet delivered or parked (an index range scan)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status IN (?, ?, ?)", (PENDING, SENDING, FAILED)
+            ).fetchone()
+        return row[0]
+    
+    def count_by_status(self) -> dict:
+        """Number of entries in each delivery state"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM outbox GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+    
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,234 @@
+from collections import Counter
+from typing import Dict, List, Optional
+from config.config import Config
+import logging
+import os
+import random
+import signal
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class _Tracked:
+    """Context manager marking the current thread as one to sample"""
+    
+    __slots__ = ('_profiler', '_ident')
+    
+    def __init__(self, profiler: 'SamplingProfiler'):
+        self._profiler = profiler
+    
+    def __enter__(self) -> '_Tracked':
+        self._ident = threading.get_ident()
+        self._profiler._tracked[self._ident] = True
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self._profiler._tracked.pop(self._ident, None)
+
+class SamplingProfiler:
+    """
+    Statistical profiler for a sample of live webhook requests
+    
+    While running, a background thread wakes every interval, reads the
+    stacks of the threads currently serving a sampled request from
+    sys._current_frames(), and counts each distinct stack. Results are
+    written in the collapsed-stack format read by flamegraph.pl and
+    speedscope ("frame;frame;frame count" per line).
+    
+    When stopped there is no sampler thread, and the request path only
+    checks the active flag, so the cost is a single attribute read.
+    """
+    
+    def __init__(self, output_dir: str = None):
+        self.output_dir = output_dir or Config.PROFILER_OUTPUT_DIR
+        self.active = False
+        self.fraction = Config.PROFILER_SAMPLE_RATE
+        self.interval = Config.PROFILER_INTERVAL
+        self.requests_sampled = 0
+        self.samples = 0
+        self.started_at: Optional[float] = None
+        self._counts: Counter = Counter()
+        # thread ident -> True for threads inside a sampled request
+        self._tracked: Dict[int, bool] = {}
+        # code object -> frame label, so each sample only joins strings
+        self._labels: Dict[object, str] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self, fraction: float = None, interval: float = None, duration: float = None) -> bool:
+        """
+        Start sampling requests, discarding stacks from any earlier run
+        
+        Args:
+            fraction: Share of requests to profile (defaults to Config.PROFILER_SAMPLE_RATE)
+            interval: Seconds between stack samples (defaults to Config.PROFILER_INTERVAL)
+            duration: Seconds after which profiling stops and dumps by itself
+                (defaults to Config.PROFILER_MAX_SECONDS; 0 runs until stopped)
+        
+        Returns:
+            bool: False if the profiler was already running
+        """
+        duration = Config.PROFILER_MAX_SECONDS if duration is None else duration
+        with self._lock:
+            if self.active:
+                return False
+            self.fraction = min(1.0, max(0.0, Config.PROFILER_SAMPLE_RATE if fraction is None else fraction))
+            self.interval = max(0.001, interval or Config.PROFILER_INTERVAL)
+            self.requests_sampled = 0
+            self.samples = 0
+            self.started_at = time.time()
+            self._counts = Counter()
+            self._stop_event = threading.Event()
+            deadline = time.monotonic() + duration if duration else None
+            self._thread = threading.Thread(
+                target=self._run, args=(self._stop_event, deadline), name="webhook-profiler", daemon=True
+            )
+            self.active = True
+            self._thread.start()
+        
+        logger.info(f"Profiling {self.fraction:.0%} of webhook requests every {self.interval * 1000:g} ms")
+        return True
+    
+    def stop(self) -> Optional[str]:
+        """
+        Stop sampling and write the collected stacks
+        
+        Returns:
+            str: Path of the collapsed-stack file, or None if not running
+        """
+        with self._lock:
+            if not self.active:
+                return None
+            self.active = False
+            self._stop_event.set()
+            thread = self._thread
+        if thread is not threading.current_thread():
+            thread.join()
+        self._tracked.clear()
+        return self.dump()
+    
+    def toggle(self) -> Optional[str]:
+        """Start if stopped, otherwise stop and return the dump path"""
+        if self.active:
+            return self.stop()
+        self.start()
+        return None
+    
+    def should_sample(self) -> bool:
+        """Decide whether to profile one request; call only while active"""
+        if random.random() >= self.fraction:
+            return False
+        self.requests_sampled += 1
+        return True
+    
+    def track(self) -> _Tracked:
+        """Context manager that has the current thread's stack sampled"""
+        return _Tracked(self)
+    
+    def collapsed(self) -> List[str]:
+        """Aggregated stacks as collapsed-stack lines, most frequent first"""
+        with self._lock:
+            counts = list(self._counts.items())
+        counts.sort(key=lambda item: -item[1])
+        return [f"{stack} {count}" for stack, count in counts]
+    
+    def dump(self, path: str = None) -> str:
+        """
+        Write the stacks collected so far
+        
+        Args:
+            path: File to write (defaults to a timestamped file in output_dir)
+        
+        Returns:
+            str: The path written
+        """
+        if path is None:
+            stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started_at or time.time()))
+            path = os.path.join(self.output_dir, f"webhook-profile-{os.getpid()}-{stamp}.folded")
+        lines = self.collapsed()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + ('\n' if lines else ''))
+        logger.info(f"Wrote {self.samples} stack samples from {self.requests_sampled} requests to {path}")
+        return path
+    
+    def status(self) -> dict:
+        """Current settings and counts, for the admin endpoint"""
+        return {
+            'active': self.active,
+            'fraction': self.fraction,
+            'interval': self.interval,
+            'requests_sampled': self.requests_sampled,
+            'samples': self.samples,
+            'stacks': len(self._counts),
+            'started_at': self.started_at,
+        }
+    
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+    
+    def _sample(self) -> None:
+        """Record the current stack of every tracked thread"""
+        tracked = list(self._tracked)
+        if not tracked:
+            return
+        frames = sys._current_frames()
+        stacks = []
+        for ident in tracked:
+            frame = frames.get(ident)
+            labels = []
+            while frame is not None:
+                labels.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                labels.reverse()
+                stacks.append(';'.join(labels))
+        with self._lock:
+            self._counts.update(stacks)
+            self.samples += len(stacks)
+    
+    def _run(self, stop_event: threading.Event, deadline: Optional[float]) -> None:
+        while not stop_event.wait(self.interval):
+            try:
+                self._sample()
+            except Exception as e:
+                logger.error(f"Profiler sample failed: {str(e)}")
+            if deadline is not None and time.monotonic() >= deadline:
+                logger.info("Profiling time limit reached")
+                self.stop()
+
+def install_signal_handler(profiler: SamplingProfiler, signal_name: str = None) -> bool:
+    """
+    Toggle the profiler when the process receives a signal
+    
+    The toggle runs on its own thread so the handler never blocks on the
+    profiler's lock or on writing the dump.
+    
+    Args:
+        profiler: The profiler to toggle
+        signal_name: e.g. 'SIGUSR2' (defaults to Config.PROFILER_SIGNAL; '' disables)
+    
+    Returns:
+        bool: True if the handler was installed
+    """
+    signal_name = Config.PROFILER_SIGNAL if signal_name is None else signal_name
+    signum = getattr(signal, signal_name, None) if signal_name else None
+    if signum is None:
+        return False
+    
+    def handler(signum, frame):
+        threading.Thread(target=profiler.toggle, name="profiler-toggle", daemon=True).start()
+    
+    try:
+        signal.signal(signum, handler)
+    except ValueError:
+        # Only the main thread may install handlers, e.g. not under some test runners
+        logger.warning(f"Could not install {signal_name} handler for the profiler")
+        return False
+    return True
@@ -0,0 +1,216 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """Thread-safe token bucket that limits how often an action may run"""
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: Tokens added per second; 0 or less disables the limit
+            capacity: Maximum burst size (defaults to one second of tokens)
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.unlimited = self.rate <= 0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last update"""
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+    
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens if available without waiting"""
+        if self.unlimited:
+            return True
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+    
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Take tokens, sleeping until enough have accumulated
+        
+        Args:
+            tokens: Number of tokens to take
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+        
+        Returns:
+            bool: True if the tokens were taken, False on timeout
+        """
+        if self.unlimited:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+class KeyedRateLimiter:
+    """
+    One token bucket per key (e.g. per sender), kept in a bounded LRU
+    
+    A bucket left idle long enough to refill completely is indistinguishable
+    from a new one, so it is dropped; this keeps memory proportional to the
+    keys active in the last refill period. Past max_keys the least recently
+    used bucket is dropped too.
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None, max_keys: int = 100000):
+        """
+        Args:
+            rate: Tokens added per second to each bucket; 0 or less disables the limit
+            capacity: Maximum burst per key (defaults to one second of tokens)
+            max_keys: Maximum number of buckets kept
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(rate, 1))
+        self.max_keys = max_keys
+        self.unlimited = self.rate <= 0
+        self._idle_after = 0.0 if self.unlimited else self.capacity / self.rate
+        # key -> [tokens, last update]; least recently used first
+        self._buckets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._buckets)
+    
+    def try_acquire(self, key: Hashable, tokens: float = 1) -> bool:
+        """Take tokens from a key's bucket if available without waiting"""
+        if self.unlimited:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._evict_idle(now)
+            
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.capacity, now]
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                bucket[0] = min(self.capacity, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+            
+            if bucket[0] >= tokens:
+                bucket[0] -= tokens
+                return True
+            return False
+    
+    def _evict_idle(self, now: float) -> None:
+        """Drop buckets, oldest first, that have been idle long enough to be full"""
+        cutoff = now - self._idle_after
+        while self._buckets:
+            _, updated = next(iter(self._buckets.values()))
+            if updated > cutoff:
+                break
+            self._buckets.popitem(last=False)
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Caps in-flight requests with an AIMD limit
+    
+    The limit halves whenever the remote side throttles us and grows by one
+    after a full window of successful requests, so sustained throughput
+    settles just under what the API will accept.
+    """
+    
+    def __init__(self, initial_limit: int, min_limit: int = 1, max_limit: Optional[int] = None):
+        self.min_limit = min_limit
+        self.max_limit = max_limit or initial_limit
+        self._limit = max(min_limit, min(initial_limit, self.max_limit))
+        self._in_flight = 0
+        self._successes = 0
+        self._cond = threading.Condition()
+    
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight"""
+        return self._limit
+    
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for an in-flight slot
+        
+        Args:
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+        
+        Returns:
+            bool: True if a slot was taken, False on timeout
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._in_flight < self._limit, timeout):
+                return False
+            self._in_flight += 1
+            return True
+    
+    def release(self) -> None:
+        """Return an in-flight slot"""
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify()
+    
+    def on_success(self) -> None:
+        """Grow the limit by one after a window of successes"""
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self._limit and self._limit < self.max_limit:
+                self._limit += 1
+                self._successes = 0
+                self._cond.notify()
+    
+    def on_throttle(self) -> None:
+        """Halve the limit after the API signalled it is overloaded"""
+        with self._cond:
+            new_limit = max(self.min_limit, self._limit // 2)
+            if new_limit != self._limit:
+                logger.warning(f"Throttled by API, reducing send concurrency to {new_limit}")
+            self._limit = new_limit
+            self._successes = 0
+
+# Buckets shared by every TwilioService in the process, keyed by account or sender
+_shared_buckets: Dict[str, TokenBucket] = {}
+_shared_buckets_lock = threading.Lock()
+
+def get_shared_bucket(key: str, rate: float, capacity: Optional[float] = None) -> TokenBucket:
+    """
+    Get the process-wide token bucket for a key, creating it on first use
+    
+    Args:
+        key: Identifier of the limited resource (e.g. "account:AC123")
+        rate: Tokens per second for a new bucket
+        capacity: Burst size for a new bucket
+    
+    Returns:
+        TokenBucket: The shared bucket
+    """
+    with _shared_buckets_lock:
+        bucket = _shared_buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(rate, capacity)
+            _shared_buckets[key] = bucket
+        return bucket
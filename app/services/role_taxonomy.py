@@ -0,0 +1,78 @@
+from typing import Dict, Optional, Sequence
+from config.config import Config
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class RoleTaxonomy:
+    """
+    Canonical job roles with their synonyms and abbreviations
+    
+    Every known spelling is compiled into one dict from normalized phrase
+    to canonical role, so "dev", "developer" and "software engineer" all
+    collapse to the same role at register/post time and matching stays an
+    exact lookup on the canonical role's vocabulary ID.
+    """
+    
+    def __init__(self):
+        self._index: Dict[str, str] = {}
+    
+    @staticmethod
+    def normalize(role: str) -> str:
+        """Lowercase a role and collapse internal whitespace"""
+        return ' '.join(role.lower().split())
+    
+    def add_role(self, canonical: str, synonyms: Sequence[str] = ()) -> None:
+        """Register a canonical role and the phrases that mean the same thing"""
+        canonical = self.normalize(canonical)
+        for phrase in (canonical, *synonyms):
+            phrase = self.normalize(phrase)
+            if not phrase:
+                continue
+            existing = self._index.get(phrase)
+            if existing and existing != canonical:
+                logger.warning(f"Role synonym '{phrase}' already maps to '{existing}', ignoring for '{canonical}'")
+                continue
+            self._index[phrase] = canonical
+    
+    def lookup(self, role: str) -> Optional[str]:
+        """Canonical role for a phrase, or None if it is not in the taxonomy"""
+        phrase = self.normalize(role)
+        canonical = self._index.get(phrase)
+        if canonical is None and phrase.endswith('s'):
+            # Plurals such as "developers" or "nurses"
+            canonical = self._index.get(phrase[:-1])
+        return canonical
+    
+    def canonicalize(self, role: str) -> str:
+        """Canonical role for a phrase, falling back to the normalized phrase"""
+        return self.lookup(role) or self.normalize(role)
+    
+    def __len__(self) -> int:
+        return len(set(self._index.values()))
+    
+    @classmethod
+    def from_file(cls, path: str) -> 'RoleTaxonomy':
+        """Load a ``canonical<TAB>synonym,synonym`` file"""
+        taxonomy = cls()
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip() or line.startswith('#'):
+                    continue
+                canonical, _, synonyms = line.rstrip('\n').partition('\t')
+                taxonomy.add_role(canonical, [s for s in synonyms.split(',') if s.strip()])
+        return taxonomy
+
+_default_taxonomy: Optional[RoleTaxonomy] = None
+_default_lock = threading.Lock()
+
+def get_role_taxonomy() -> RoleTaxonomy:
+    """Get the process-wide taxonomy configured by Config.ROLE_TAXONOMY_PATH"""
+    global _default_taxonomy
+    if _default_taxonomy is None:
+        with _default_lock:
+            if _default_taxonomy is None:
+                _default_taxonomy = RoleTaxonomy.from_file(Config.ROLE_TAXONOMY_PATH)
+                logger.info(f"Loaded {len(_default_taxonomy)} canonical roles")
+    return _default_taxonomy
@@ -0,0 +1,88 @@
+from typing import Dict, Iterator, List, Tuple
+import math
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE_LAT = 111.32
+
+Cell = Tuple[int, int]
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometres"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+class GridIndex:
+    """
+    Fixed-size lat/lon grid of items with a per-item search radius
+    
+    Items are bucketed by key (e.g. role ID) and grid cell. A query only
+    visits the cells that could hold an item within max_radius_km of the
+    point, then checks each candidate against its own radius, so cost
+    depends on local density rather than the total number of items.
+    """
+    
+    def __init__(self, cell_size_deg: float, max_radius_km: float):
+        self.cell_size_deg = cell_size_deg
+        self.max_radius_km = max_radius_km
+        # key -> cell -> item id -> (latitude, longitude, radius_km, item)
+        self._cells: Dict[object, Dict[Cell, Dict[object, tuple]]] = {}
+    
+    def cell_for(self, latitude: float, longitude: float) -> Cell:
+        """Grid cell containing a point"""
+        return (
+            int(math.floor(latitude / self.cell_size_deg)),
+            int(math.floor(longitude / self.cell_size_deg))
+        )
+    
+    def cells_within(self, latitude: float, longitude: float, radius_km: float) -> Iterator[Cell]:
+        """Every cell overlapping the bounding box of a circle"""
+        lat_span = radius_km / KM_PER_DEGREE_LAT
+        cos_lat = max(math.cos(math.radians(latitude)), 0.01)
+        lon_span = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+        
+        min_lat, min_lon = self.cell_for(latitude - lat_span, longitude - lon_span)
+        max_lat, max_lon = self.cell_for(latitude + lat_span, longitude + lon_span)
+        for cell_lat in range(min_lat, max_lat + 1):
+            for cell_lon in range(min_lon, max_lon + 1):
+                yield (cell_lat, cell_lon)
+    
+    def add(self, key, item_id, latitude: float, longitude: float, radius_km: float, item) -> None:
+        """Index an item at a point under a key"""
+        cells = self._cells.setdefault(key, {})
+        cells.setdefault(self.cell_for(latitude, longitude), {})[item_id] = (
+            latitude, longitude, min(radius_km, self.max_radius_km), item
+        )
+    
+    def remove(self, key, item_id, latitude: float, longitude: float) -> None:
+        """Remove an item previously added at the same key and point"""
+        cells = self._cells.get(key)
+        if not cells:
+            return
+        cell = self.cell_for(latitude, longitude)
+        bucket = cells.get(cell)
+        if bucket is None:
+            return
+        bucket.pop(item_id, None)
+        if not bucket:
+            del cells[cell]
+            if not cells:
+                del self._cells[key]
+    
+    def query(self, key, latitude: float, longitude: float) -> List[object]:
+        """Items under a key whose own radius covers the point"""
+        cells = self._cells.get(key)
+        if not cells:
+            return []
+        
+        results = []
+        for cell in self.cells_within(latitude, longitude, self.max_radius_km):
+            bucket = cells.get(cell)
+            if not bucket:
+                continue
+            for item_lat, item_lon, radius_km, item in bucket.values():
+                if haversine_km(latitude, longitude, item_lat, item_lon) <= radius_km:
+                    results.append(item)
+        return results
@@ -0,0 +1,188 @@
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+from config.config import Config
+import atexit
+import itertools
+import json
+import logging
+import queue
+import re
+import sys
+import threading
+
+# International numbers, written with a leading + or after Twilio's
+# whatsapp: prefix. Bare digit runs (dates, counts, IDs) are left alone.
+PHONE_PATTERN = re.compile(r'(?:(?<=whatsapp:)|\+)\d[\d ()-]{6,}\d')
+
+# Pass as extra= on high-volume success lines (one per message sent or
+# received); only one in LOG_SAMPLE_EVERY of each such line is kept
+SAMPLED = {'sampled': True}
+
+# Attributes every LogRecord has; anything else came from extra= and is written as a field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'sampled'}
+
+_TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Library loggers that write several INFO lines per outbound message
+_NOISY_LOGGERS = ('twilio.http_client',)
+
+def redact(text: str) -> str:
+    """Mask phone numbers, keeping the last four digits for correlation"""
+    return PHONE_PATTERN.sub(lambda match: '***' + ''.join(filter(str.isdigit, match.group()))[-4:], text)
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, with phone numbers redacted"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': redact(record.getMessage()),
+            'thread': record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = redact(value) if isinstance(value, str) else value
+        if record.exc_info:
+            entry['exc'] = redact(self.formatException(record.exc_info))
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class RedactingFormatter(logging.Formatter):
+    """The classic text format, with phone numbers redacted"""
+    
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        record.message = redact(record.message)
+        return super().formatMessage(record)
+    
+    def formatException(self, exc_info) -> str:
+        return redact(super().formatException(exc_info))
+
+class SuccessSampler(logging.Filter):
+    """
+    Keep the first and then every Nth record of each sampled line
+    
+    Lines are told apart by their unformatted message template, so a
+    sampled record costs a dict lookup and a counter step before it is
+    dropped. Kept records carry the rate as a sample_every field.
+    """
+    
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._counters: Dict[tuple, itertools.count] = {}
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, 'sampled', False) or self.every == 1:
+            return True
+        key = (record.name, record.msg)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = self._counters.setdefault(key, itertools.count())
+        if next(counter) % self.every:
+            return False
+        record.sample_every = self.every
+        return True
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hands records to the writer thread without formatting or waiting
+    
+    The stock QueueHandler formats the message on the calling thread;
+    here the record is queued as is and formatted by the writer. When the
+    queue is full the record is dropped and counted rather than blocking
+    the request.
+    """
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class _Listener(QueueListener):
+    """Writer thread that also reports records dropped on a full queue"""
+    
+    def __init__(self, log_queue: queue.Queue, source: NonBlockingQueueHandler, *handlers):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.source = source
+        self._reported = 0
+    
+    def enqueue_sentinel(self) -> None:
+        # Wait for room so shutdown is not lost behind a full queue
+        self.queue.put(self._sentinel)
+    
+    def handle(self, record: logging.LogRecord) -> None:
+        dropped = self.source.dropped
+        if dropped > self._reported:
+            super().handle(logging.makeLogRecord({
+                'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                'msg': 'Dropped %d log records, queue full', 'args': (dropped - self._reported,),
+            }))
+            self._reported = dropped
+        super().handle(record)
+
+_lock = threading.Lock()
+_listener: Optional[_Listener] = None
+
+def configure_logging(level: str = None, fmt: str = None, stream=None) -> Optional[NonBlockingQueueHandler]:
+    """
+    Route the root logger through a bounded queue to a background writer
+    
+    Records are filtered and queued on the logging thread; formatting,
+    redaction and I/O happen on the writer. Calling this again does nothing.
+    
+    Args:
+        level: Root log level (defaults to Config.LOG_LEVEL)
+        fmt: 'json' or 'text' (defaults to Config.LOG_FORMAT)
+        stream: Where the writer writes (defaults to stderr)
+    
+    Returns:
+        NonBlockingQueueHandler: The installed handler, or None if already configured
+    """
+    global _listener
+    
+    with _lock:
+        if _listener is not None:
+            return None
+        
+        fmt = (fmt or Config.LOG_FORMAT).lower()
+        if fmt not in ('json', 'text'):
+            raise ValueError(f"Unknown log format: {fmt}")
+        
+        output = logging.StreamHandler(stream or sys.stderr)
+        output.setFormatter(JSONFormatter() if fmt == 'json' else RedactingFormatter(_TEXT_FORMAT))
+        
+        log_queue = queue.Queue(Config.LOG_QUEUE_SIZE)
+        handler = NonBlockingQueueHandler(log_queue)
+        handler.addFilter(SuccessSampler(Config.LOG_SAMPLE_EVERY))
+        
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel((level or Config.LOG_LEVEL).upper())
+        for name in _NOISY_LOGGERS:
+            logging.getLogger(name).setLevel(logging.WARNING)
+        
+        _listener = _Listener(log_queue, handler, output)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return handler
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
@@ -0,0 +1,108 @@
+from typing import Iterator, Optional
+from app.services.structured_logging import PHONE_PATTERN
+from config.config import Config
+import hashlib
+import hmac
+import json
+import logging
+import re
+import secrets
+import threading
+
+logger = logging.getLogger(__name__)
+
+class TrafficRecorder:
+    """
+    Append-only log of inbound webhook messages for replaying real traffic
+    
+    Each message becomes one compact JSON line:
+        {"t": arrival epoch seconds, "d": handling ms, "f": sender, "b": body}
+    Phone numbers, the sender and any in the body, are replaced by keyed
+    hashes shaped like numbers in the unassigned +999 country code. The same
+    number always maps to the same pseudonym, so a replay keeps each sender's
+    registrations, posts and closes together.
+    
+    Without a private salt (unset, or the public development SECRET_KEY) the
+    hashes could be reversed by hashing every possible number, so a random
+    salt is used instead; pseudonyms then only hold within one recording.
+    """
+    
+    def __init__(self, path: str, salt: str = None):
+        self.path = path
+        salt = salt or Config.WEBHOOK_RECORD_SALT
+        if not salt or salt == Config.DEV_SECRET_KEY:
+            logger.warning("WEBHOOK_RECORD_SALT is not set to a private value; "
+                           "using a random salt, so pseudonyms will not match other recordings")
+            salt = secrets.token_hex(32)
+        self._key = salt.encode()
+        self._lock = threading.Lock()
+        # Line buffered in append mode: every record is one write to the end of the file
+        self._file = open(path, 'a', encoding='utf-8', buffering=1)
+        self.recorded = 0
+    
+    def pseudonymize(self, phone_number: str) -> str:
+        """Stable, non-reversible stand-in for a phone number"""
+        digits = re.sub(r'\D', '', phone_number)
+        digest = hmac.new(self._key, digits.encode(), hashlib.sha256).digest()
+        return f"+999{int.from_bytes(digest[:8], 'big') % 10 ** 11:011d}"
+    
+    def anonymize_body(self, body: str) -> str:
+        """Message text with phone numbers replaced by their pseudonyms"""
+        return PHONE_PATTERN.sub(lambda match: self.pseudonymize(match.group()), body)
+    
+    def record(self, from_number: str, body: str, received_at: float, duration: float) -> None:
+        """
+        Append one message to the log
+        
+        Args:
+            from_number: Sender's phone number (hashed before writing)
+            body: Message text
+            received_at: Epoch seconds when the webhook was called
+            duration: Seconds the webhook took to reply
+        """
+        line = json.dumps({
+            't': round(received_at, 3),
+            'd': round(duration * 1000, 2),
+            'f': self.pseudonymize(from_number),
+            'b': self.anonymize_body(body),
+        }, ensure_ascii=False, separators=(',', ':'))
+        try:
+            with self._lock:
+                self._file.write(line + '\n')
+                self.recorded += 1
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not record webhook message: {str(e)}")
+    
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+def read_recording(path: str) -> Iterator[dict]:
+    """
+    Records from a traffic log in the order they were written
+    
+    A partly written last line (the recorder was killed mid-write) is skipped.
+    """
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping unreadable line in {path}")
+
+def create_traffic_recorder(path: str = None) -> Optional[TrafficRecorder]:
+    """
+    Build the recorder named in the configuration
+    
+    Args:
+        path: Log file to append to (defaults to Config.WEBHOOK_RECORD_PATH)
+    
+    Returns:
+        TrafficRecorder: The recorder, or None if recording is off
+    """
+    path = path or Config.WEBHOOK_RECORD_PATH
+    if not path:
+        return None
+    
+    logger.info(f"Recording webhook traffic to {path}")
+    return TrafficRecorder(path)
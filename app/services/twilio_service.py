@@ -1,63 +1,286 @@
 from twilio.rest import Client
+from twilio.base.exceptions import TwilioRestException
+from twilio.http.http_client import TwilioHttpClient
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, Timeout
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import urlsplit
+from app.services.metrics import OUTBOUND_MESSAGES, STAGE_SECONDS
+from app.services.rate_limiter import AdaptiveConcurrencyLimiter, get_shared_bucket
+from app.services.structured_logging import SAMPLED
 from config.config import Config
 import logging
+import random
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+_SEND_SECONDS = STAGE_SECONDS.labels('twilio_send')
+_THROTTLED_SENDS = OUTBOUND_MESSAGES.labels('throttled')
+
+class _RedirectingHttpClient(TwilioHttpClient):
+    """HTTP client that sends every API request to another base URL"""
+    
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip('/')
+    
+    def request(self, method: str, url: str, *args, **kwargs):
+        parts = urlsplit(url)
+        url = f"{self.base_url}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+        return super().request(method, url, *args, **kwargs)
+
+class SendSlotTimeout(Exception):
+    """No rate-limit or concurrency slot freed up within the caller's wait"""
+    pass
+
 class TwilioService:
     """Service for sending WhatsApp messages via Twilio"""
     
-    def __init__(self):
-        self.client = Client(Config.TWILIO_ACCOUNT_SID, Config.TWILIO_AUTH_TOKEN)
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or Config.TWILIO_MAX_WORKERS
+        self.http_client = self._build_http_client(self.max_workers)
+        self.client = Client(
+            Config.TWILIO_ACCOUNT_SID,
+            Config.TWILIO_AUTH_TOKEN,
+            http_client=self.http_client
+        )
         self.from_number = f"whatsapp:{Config.TWILIO_PHONE_NUMBER}"
+        
+        # Outbound throughput caps, shared with other instances in this process.
+        # Each server process gets an equal slice of the account-wide limits.
+        self.account_bucket = get_shared_bucket(
+            f"account:{Config.TWILIO_ACCOUNT_SID}",
+            Config.TWILIO_ACCOUNT_RATE / Config.WORKER_PROCESSES
+        )
+        self.sender_bucket = get_shared_bucket(
+            f"sender:{self.from_number}",
+            Config.TWILIO_SENDER_RATE / Config.WORKER_PROCESSES
+        )
+        self.concurrency = AdaptiveConcurrencyLimiter(self.max_workers)
+        
+        # Worker pool for bulk sends, created on first use
+        self._executor = None
+        self._executor_lock = threading.Lock()
     
-    def send_message(self, to_number: str, message: str) -> bool:
+    @staticmethod
+    def _build_http_client(max_workers: int) -> TwilioHttpClient:
+        """
+        Build a keep-alive HTTP client shared by all send workers
+        
+        The connection pool is sized to the worker count so concurrent
+        sends reuse open TLS connections instead of reconnecting. Setting
+        Config.TWILIO_API_URL sends requests elsewhere, e.g. to the local
+        stand-in used by benchmarks.load_benchmark.
+        """
+        if Config.TWILIO_API_URL:
+            http_client = _RedirectingHttpClient(
+                Config.TWILIO_API_URL, pool_connections=True, timeout=Config.TWILIO_HTTP_TIMEOUT
+            )
+        else:
+            http_client = TwilioHttpClient(pool_connections=True, timeout=Config.TWILIO_HTTP_TIMEOUT)
+        for prefix in ("https://", "http://"):
+            http_client.session.mount(
+                prefix, HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+            )
+        return http_client
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the bulk send worker pool, creating it if needed"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="twilio-send"
+                )
+            return self._executor
+    
+    def close(self) -> None:
+        """Stop the bulk send workers and release pooled connections"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        self.http_client.session.close()
+    
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Whether a send failure is transient and worth retrying"""
+        if isinstance(error, TwilioRestException):
+            return error.status == 429 or error.status >= 500
+        return isinstance(error, (ConnectionError, Timeout))
+    
+    @staticmethod
+    def _backoff_delay(attempt: int) -> float:
+        """Exponential backoff with full jitter for the given retry attempt"""
+        ceiling = min(Config.TWILIO_BACKOFF_MAX, Config.TWILIO_BACKOFF_BASE * (2 ** attempt))
+        return random.uniform(0, ceiling)
+    
+    def _create_message(self, to_number: str, message: str, wait: Optional[float] = None):
+        """Make one rate-limited Messages API call, waiting at most wait seconds for a slot"""
+        deadline = None if wait is None else time.monotonic() + wait
+        
+        def remaining() -> Optional[float]:
+            return None if deadline is None else max(0.0, deadline - time.monotonic())
+        
+        if not (self.account_bucket.acquire(timeout=remaining())
+                and self.sender_bucket.acquire(timeout=remaining())
+                and self.concurrency.acquire(timeout=remaining())):
+            raise SendSlotTimeout(f"no send slot free within {wait}s")
+        try:
+            return self.client.messages.create(
+                body=message,
+                from_=self.from_number,
+                to=to_number
+            )
+        finally:
+            self.concurrency.release()
+    
+    def send_message(self, to_number: str, message: str, retry: bool = True,
+                     wait: Optional[float] = None) -> bool:
         """
         Send a WhatsApp message to a phone number
         
+        Sends are paced by the account and sender token buckets. Throttling
+        (HTTP 429), server errors and network failures are retried with
+        jittered exponential backoff up to Config.TWILIO_MAX_RETRIES times.
+        Callers on the webhook thread pass retry=False and a wait limit so
+        a busy account fails the send instead of outlasting Twilio's
+        webhook timeout.
+        
         Args:
             to_number: Phone number in format +1234567890
             message: Message content to send
+            retry: Whether to retry transient failures
+            wait: Maximum seconds to wait for a send slot, or None to wait indefinitely
             
         Returns:
             bool: True if message sent successfully, False otherwise
         """
-        try:
-            # Ensure phone number has whatsapp: prefix
-            if not to_number.startswith('whatsapp:'):
-                to_number = f"whatsapp:{to_number}"
-            
-            message = self.client.messages.create(
-                body=message,
-                from_=self.from_number,
-                to=to_number
+        # Ensure phone number has whatsapp: prefix
+        if not to_number.startswith('whatsapp:'):
+            to_number = f"whatsapp:{to_number}"
+        
+        with _SEND_SECONDS.time():
+            sent = self._send_with_retries(
+                to_number, message, Config.TWILIO_MAX_RETRIES if retry else 0, wait
             )
+        OUTBOUND_MESSAGES.labels('sent' if sent else 'failed').inc()
+        return sent
+    
+    def _send_with_retries(self, to_number: str, message: str, max_retries: int,
+                           wait: Optional[float]) -> bool:
+        """Create the message, retrying transient failures with backoff"""
+        attempt = 0
+        while True:
+            try:
+                sent = self._create_message(to_number, message, wait)
+                self.concurrency.on_success()
+                logger.info("Message sent successfully. SID: %s", sent.sid, extra=SAMPLED)
+                return True
+                
+            except Exception as e:
+                if isinstance(e, TwilioRestException) and e.status == 429:
+                    _THROTTLED_SENDS.inc()
+                    self.concurrency.on_throttle()
+                
+                if not self._is_retryable(e) or attempt >= max_retries:
+                    logger.error("Failed to send message to %s: %s", to_number, e)
+                    return False
+                
+                delay = self._backoff_delay(attempt)
+                attempt += 1
+                logger.warning(
+                    "Retrying message to %s in %.2fs (attempt %d/%d): %s",
+                    to_number, delay, attempt, max_retries, e
+                )
+                time.sleep(delay)
+    
+    def find_sent_message(self, to_number: str, message: str, since: datetime) -> bool:
+        """
+        Check whether Twilio already accepted a message, e.g. after a crash mid-send
+        
+        Args:
+            to_number: Phone number the message was addressed to
+            message: Exact message body
+            since: Earliest time the message could have been sent
             
-            logger.info(f"Message sent successfully. SID: {message.sid}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to send message to {to_number}: {str(e)}")
-            return False
+        Returns:
+            bool: True if a matching message exists in the account's log
+        """
+        if not to_number.startswith('whatsapp:'):
+            to_number = f"whatsapp:{to_number}"
+        
+        self.account_bucket.acquire()
+        messages = self.client.messages.list(
+            to=to_number,
+            from_=self.from_number,
+            date_sent_after=since,
+            limit=50
+        )
+        return any(m.body == message for m in messages)
     
-    def send_bulk_messages(self, recipients: list, message: str) -> dict:
+    def send_bulk_messages(self, recipients: list, message: str,
+                           on_result: Optional[Callable[[str, bool], None]] = None) -> dict:
         """
         Send the same message to multiple recipients
         
         Args:
             recipients: List of phone numbers
             message: Message content to send
+            on_result: Optional callback invoked with (phone_number, sent)
+                as soon as each send finishes
+            
+        Returns:
+            dict: Summary of sent/failed messages
+        """
+        return self.send_messages([(phone_number, message) for phone_number in recipients], on_result)
+    
+    def send_messages(self, messages: List[Tuple[str, str]],
+                      on_result: Optional[Callable[[str, bool], None]] = None) -> dict:
+        """
+        Send a batch of messages, each with its own body
+        
+        Sends run concurrently on a bounded worker pool that shares one
+        keep-alive HTTP session.
+        
+        Args:
+            messages: (phone_number, message) pairs
+            on_result: Optional callback invoked with (phone_number, sent)
+                as soon as each send finishes
             
         Returns:
             dict: Summary of sent/failed messages
         """
         results = {'sent': 0, 'failed': 0, 'errors': []}
         
-        for phone_number in recipients:
-            if self.send_message(phone_number, message):
+        if not messages:
+            return results
+        
+        def send_one(phone_number: str, message: str) -> bool:
+            sent = self.send_message(phone_number, message)
+            if on_result is not None:
+                on_result(phone_number, sent)
+            return sent
+        
+        executor = self._get_executor()
+        futures = []
+        for phone_number, message in messages:
+            try:
+                futures.append(executor.submit(send_one, phone_number, message))
+            except RuntimeError:
+                # The pool refuses work during interpreter shutdown; send inline
+                futures.append(None)
+        
+        for (phone_number, message), future in zip(messages, futures):
+            sent = future.result() if future is not None else send_one(phone_number, message)
+            if sent:
                 results['sent'] += 1
             else:
                 results['failed'] += 1
                 results['errors'].append(phone_number)
         
-        return results 
\ No newline at end of file
+        return results
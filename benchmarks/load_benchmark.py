@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Load benchmark: webhook latency and alert delivery end to end
+
+Starts the app from create_app() with TwilioService pointed at a local
+stand-in for the Messages API (configurable latency and error rate), then
+drives /webhook with N seeker registrations followed by a mix of register
+and post traffic. Reports webhook latency percentiles, alerts per second
+and the time from each post to its last alert, against the 5-second
+alert target.
+
+Usage:
+    python -m benchmarks.load_benchmark --seekers 10000 --messages 2000 --post-ratio 0.1
+    python -m benchmarks.load_benchmark --twilio-latency 0.2 --error-rate 0.02 --twilio-rate 80
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+ROLES = ['developer', 'designer', 'data scientist', 'nurse', 'driver',
+         'electrician', 'accountant', 'teacher', 'chef', 'plumber']
+LOCATIONS = ['london', 'paris', 'new york', 'mumbai', 'bangalore', 'berlin',
+             'pune', 'dubai', 'toronto', 'sydney']
+
+ALERT_TARGET_SECONDS = 5.0
+
+JOB_ID_PATTERN = re.compile(r'\*Job ID:\* (\w+)')
+
+class FakeMessagesAPI:
+    """
+    Local stand-in for Twilio's Messages API
+    
+    Accepts message creates after a simulated latency, fails a fraction of
+    them with a retryable 500, and records when each accepted job alert
+    arrived so delivery times can be measured.
+    """
+    
+    def __init__(self, latency: float, jitter: float, error_rate: float, seed: int = 42):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.accepted = 0
+        self.rejected = 0
+        # job_id -> [alerts received, monotonic time of the last one]
+        self.alerts = {}
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-twilio", daemon=True)
+    
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+    
+    def start(self) -> None:
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def alert_count(self) -> int:
+        with self._lock:
+            return sum(count for count, _ in self.alerts.values())
+    
+    def _decide(self) -> tuple:
+        """(delay, fail) for one request"""
+        with self._lock:
+            delay = max(0.0, self._rng.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+            return delay, self._rng.random() < self.error_rate
+    
+    def _record(self, fields: dict) -> dict:
+        body = fields.get('Body', [''])[0]
+        with self._lock:
+            self.accepted += 1
+            sid = f"SM{self.accepted:032x}"
+            match = JOB_ID_PATTERN.search(body)
+            if match and body.startswith('🎯'):
+                entry = self.alerts.setdefault(match.group(1), [0, 0.0])
+                entry[0] += 1
+                entry[1] = time.monotonic()
+        return {'sid': sid, 'status': 'queued', 'to': fields.get('To', [''])[0], 'body': body}
+    
+    def _handler(self):
+        api = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def log_message(self, *args):
+                pass
+            
+            def _reply(self, status: int, payload: dict) -> None:
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                fields = parse_qs(self.rfile.read(length).decode())
+                delay, fail = api._decide()
+                time.sleep(delay)
+                if fail:
+                    with api._lock:
+                        api.rejected += 1
+                    self._reply(500, {'code': 20500, 'message': 'Injected failure', 'status': 500})
+                else:
+                    self._reply(201, api._record(fields))
+            
+            def do_GET(self):
+                # Message log lookups made when reconciling interrupted sends
+                self._reply(200, {'messages': [], 'meta': {'key': 'messages', 'next_page_url': None}})
+        
+        return Handler
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def configure_environment(args, fake_api: FakeMessagesAPI, workdir: str) -> None:
+    """Point the app at the stand-in and scratch files; must run before app imports"""
+    os.environ.update({
+        'TWILIO_API_URL': fake_api.base_url,
+        'TWILIO_ACCOUNT_SID': 'AC' + '0' * 32,
+        'TWILIO_AUTH_TOKEN': 'benchmark',
+        'TWILIO_PHONE_NUMBER': '+14155238886',
+        'TWILIO_ACCOUNT_RATE': str(args.twilio_rate),
+        'TWILIO_SENDER_RATE': str(args.twilio_rate),
+        'TWILIO_MAX_WORKERS': str(args.send_workers),
+        'STORAGE_BACKEND': args.storage,
+        'DATABASE_PATH': os.path.join(workdir, 'jobbot.db'),
+        'OUTBOX_DB_PATH': os.path.join(workdir, 'outbox.db'),
+        # Benchmark traffic comes from few employers; flood limits are not under test
+        'SENDER_POSTS_PER_HOUR': '1e9',
+        'SENDER_POST_BURST': '1000000',
+        'SENDER_REGISTRATIONS_PER_HOUR': '1e9',
+        'SENDER_REGISTRATION_BURST': '1000000',
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seekers', type=int, default=5000, help='seekers registered before the mixed phase')
+    parser.add_argument('--messages', type=int, default=1000, help='messages in the mixed phase')
+    parser.add_argument('--post-ratio', type=float, default=0.05, help='share of mixed messages that are posts')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent webhook clients')
+    parser.add_argument('--storage', default='memory', help="STORAGE_BACKEND ('memory', 'sqlite' or 'shared')")
+    parser.add_argument('--twilio-latency', type=float, default=0.05, help='stand-in seconds per message create')
+    parser.add_argument('--twilio-jitter', type=float, default=0.01, help='standard deviation of that latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of creates failed with HTTP 500')
+    parser.add_argument('--twilio-rate', type=float, default=1000, help='TWILIO_ACCOUNT_RATE/SENDER_RATE')
+    parser.add_argument('--send-workers', type=int, default=32, help='TWILIO_MAX_WORKERS')
+    parser.add_argument('--drain-timeout', type=float, default=120, help='seconds to wait for alerts')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    
+    logging.disable(logging.ERROR)
+    rng = random.Random(args.seed)
+    fake_api = FakeMessagesAPI(args.twilio_latency, args.twilio_jitter, args.error_rate, args.seed)
+    fake_api.start()
+    workdir = tempfile.TemporaryDirectory()
+    configure_environment(args, fake_api, workdir.name)
+    
+    from app import create_app
+    from app.bot import message_handler
+    
+    app = create_app()
+    local = threading.local()
+    sid_counter = iter(range(1, 1 << 62))
+    sid_lock = threading.Lock()
+    
+    def send(phone: str, body: str) -> tuple:
+        """POST one message to /webhook; returns (latency seconds, reply text)"""
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        with sid_lock:
+            sid = f"SM{next(sid_counter):032x}"
+        start = time.perf_counter()
+        reply = client.post('/webhook', data={'Body': body, 'From': f"whatsapp:{phone}", 'MessageSid': sid})
+        return time.perf_counter() - start, reply.get_data(as_text=True)
+    
+    def run_phase(messages):
+        """Send (kind, phone, body) messages concurrently; returns [(kind, latency, reply, sent_at)]"""
+        def one(message):
+            kind, phone, body = message
+            sent_at = time.monotonic()
+            latency, reply = send(phone, body)
+            return kind, latency, reply, sent_at
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            return list(pool.map(one, messages))
+    
+    def register_message(i: int) -> tuple:
+        return 'register', f"+1{5550000000 + i}", f"register {rng.choice(ROLES)} {rng.choice(LOCATIONS)}"
+    
+    # Phase 1: seekers register
+    started = time.perf_counter()
+    setup = run_phase([register_message(i) for i in range(args.seekers)])
+    setup_seconds = time.perf_counter() - started
+    
+    # Phase 2: mixed register/post traffic
+    mixed = []
+    for i in range(args.messages):
+        if rng.random() < args.post_ratio:
+            mixed.append(('post', f"+1{4440000000 + i % 50}", f"post {rng.choice(ROLES)} {rng.choice(LOCATIONS)}"))
+        else:
+            mixed.append(register_message(args.seekers + i))
+    started = time.perf_counter()
+    results = run_phase(mixed)
+    mixed_seconds = time.perf_counter() - started
+    
+    # Expected recipients per job, from the "Notifying N job seekers" reply
+    posts = {}
+    for kind, _, reply, sent_at in results:
+        if kind == 'post':
+            job_id = JOB_ID_PATTERN.search(reply)
+            count = re.search(r'Notifying \*(\d+) job seekers', reply)
+            if job_id and count:
+                posts[job_id.group(1)] = (sent_at, int(count.group(1)))
+    expected = sum(count for _, count in posts.values())
+    
+    # Wait for the fan-out to finish (retries included)
+    deadline = time.monotonic() + args.drain_timeout
+    while fake_api.alert_count() < expected and time.monotonic() < deadline:
+        time.sleep(0.05)
+    message_handler.alert_dispatcher.shutdown()
+    delivered = fake_api.alert_count()
+    
+    # Report
+    print(f"Seekers: {args.seekers:,} registered in {setup_seconds:.1f}s "
+          f"({args.seekers / setup_seconds:,.0f} msg/s); storage={args.storage}")
+    print(f"Mixed phase: {args.messages:,} messages ({len(posts)} posts) in {mixed_seconds:.1f}s "
+          f"({args.messages / mixed_seconds:,.0f} msg/s), concurrency {args.concurrency}")
+    print(f"Twilio stand-in: {args.twilio_latency * 1000:.0f} ms latency, "
+          f"{args.error_rate:.1%} errors, {fake_api.rejected} failures injected")
+    print()
+    print(f"{'Webhook latency (ms)':<22}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'count':>9}")
+    phases = {
+        'register (setup)': [latency for _, latency, _, _ in setup],
+        'register (mixed)': [latency for kind, latency, _, _ in results if kind == 'register'],
+        'post': [latency for kind, latency, _, _ in results if kind == 'post'],
+    }
+    for label, latencies in phases.items():
+        ms = [latency * 1000 for latency in latencies]
+        print(f"  {label:<20}{percentile(ms, .5):9.2f}{percentile(ms, .95):9.2f}"
+              f"{percentile(ms, .99):9.2f}{max(ms, default=float('nan')):9.2f}{len(ms):9,}")
+    print()
+    
+    # Posts with no matching seekers have nothing to time, so they are counted
+    # apart; posts still short of their alerts at the deadline likewise
+    delays = []
+    no_recipients = incomplete = 0
+    for job_id, (sent_at, count) in posts.items():
+        received, last_at = fake_api.alerts.get(job_id, (0, 0.0))
+        if not count:
+            no_recipients += 1
+        elif received >= count:
+            delays.append(last_at - sent_at)
+        else:
+            incomplete += 1
+    if posts:
+        first_post = min(sent_at for sent_at, _ in posts.values())
+        last_alert = max((last_at for _, last_at in fake_api.alerts.values()), default=first_post)
+        span = max(last_alert - first_post, 1e-9)
+        print(f"Alerts delivered: {delivered:,} of {expected:,} in {span:.1f}s ({delivered / span:,.0f} alerts/s)")
+    if delays:
+        within = sum(1 for delay in delays if delay <= ALERT_TARGET_SECONDS)
+        print(f"Post to last alert (s): p50 {percentile(delays, .5):.2f}  p95 {percentile(delays, .95):.2f}  "
+              f"p99 {percentile(delays, .99):.2f}  max {max(delays):.2f}")
+        print(f"Posts fully alerted within {ALERT_TARGET_SECONDS:g}s: {within}/{len(delays)}")
+    if no_recipients or incomplete:
+        print(f"Posts not timed: {no_recipients} with no matching seekers, "
+              f"{incomplete} not fully alerted by the drain timeout")
+    
+    fake_api.stop()
+    workdir.cleanup()
+
+if __name__ == '__main__':
+    main()
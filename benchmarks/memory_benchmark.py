@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: bytes per registered user
+
+Compares the original dict-backed User layout against the packed User,
+whose flags, timestamp and single vocabulary-interned subscription share
+one int, both as bare objects and as stored in InMemoryRepository (phone
+map, subscription owners and match bitmaps).
+
+Usage:
+    python -m benchmarks.memory_benchmark --users 1000000
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+from datetime import datetime
+from app.models.user import User
+from app.repositories.memory_repository import InMemoryRepository
+
+ROLES = ['developer', 'designer', 'data scientist', 'marketing manager', 'nurse',
+         'driver', 'electrician', 'accountant', 'teacher', 'sales executive']
+LOCATIONS = ['london', 'paris', 'new york', 'mumbai', 'bangalore', 'berlin',
+             'pune', 'kolkata', 'san francisco', 'dubai']
+
+class LegacyUser:
+    """The User layout before compaction, kept here as the baseline"""
+    
+    def __init__(self, phone_number: str, role: str, location: str):
+        self.phone_number = phone_number
+        self.role = role.lower().strip()
+        self.location = location.lower().strip()
+        self.created_at = datetime.now()
+        self.is_active = True
+
+def generate_rows(count: int, seed: int = 42):
+    """Synthetic (phone, role, location) rows with realistic mixed casing"""
+    rng = random.Random(seed)
+    for i in range(count):
+        role = rng.choice(ROLES)
+        location = rng.choice(LOCATIONS)
+        yield f"+91{9000000000 + i}", role.title(), f" {location.upper()} "
+
+def measure(build, rows) -> int:
+    """Net bytes allocated by build(rows) and still alive afterwards"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build(rows)
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+def build_legacy(rows):
+    return [LegacyUser(*row) for row in rows]
+
+def build_compact(rows):
+    return [User(*row) for row in rows]
+
+def build_repository(rows):
+    repository = InMemoryRepository()
+    for phone, role, location in rows:
+        repository.upsert_user(phone, User.normalize(role), User.normalize(location))
+    return repository
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=100000, help='number of users to create')
+    args = parser.parse_args()
+    
+    # Phone strings are materialized up front so they count for neither layout
+    rows = list(generate_rows(args.users))
+    
+    results = [
+        ('legacy User objects', measure(build_legacy, rows)),
+        ('compact User objects', measure(build_compact, rows)),
+        ('InMemoryRepository', measure(build_repository, rows)),
+    ]
+    
+    print(f"Users: {args.users:,}")
+    for label, total in results:
+        print(f"  {label:<22} {total / args.users:8.1f} bytes/user  ({total / 2**20:8.1f} MiB)")
+
+if __name__ == '__main__':
+    main()
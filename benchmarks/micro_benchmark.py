@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks for the parser and matcher hot paths, with regression checks
+
+Times per-call cost of command parsing, registration, matching and job
+lookup against repositories holding 1k, 100k and 1M records. Each result
+is compared with the stored baseline, and the run exits non-zero when any
+path got slower than the baseline by more than max_ratio, which is how an
+accidental O(n) scan shows up.
+
+Baselines are machine-specific: regenerate them with --update on the
+machine (or CI runner class) that runs the check.
+
+Usage:
+    python -m benchmarks.micro_benchmark
+    python -m benchmarks.micro_benchmark --sizes 1000,100000 --only find_matching_users
+    python -m benchmarks.micro_benchmark --update
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from app.bot.commands import CommandParser
+from app.models.job import Job
+from app.repositories.memory_repository import InMemoryRepository
+from app.services.matcher_service import MatcherService
+
+DEFAULT_SIZES = (1000, 100000, 1000000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'micro_benchmark.json')
+DEFAULT_MAX_RATIO = 2.0
+
+# Records in the queried role/location; fixed so per-call work does not grow with size
+MATCHES = 100
+
+ROLES = ['developer', 'designer', 'data scientist', 'nurse', 'driver',
+         'electrician', 'accountant', 'teacher', 'chef', 'plumber']
+
+MESSAGES = [
+    'register Data Scientist New York',
+    'register developer london',
+    'register senior react developer san francisco',
+    'register nurse bombay',
+    'register chef some unknown town',
+]
+
+# name -> (setup(size) -> zero-argument callable to time, whether size applies)
+BENCHMARKS = {}
+
+def benchmark(name: str, scales: bool = True):
+    """Register a setup function; it builds state for a size and returns the call to time"""
+    def decorator(setup):
+        BENCHMARKS[name] = (setup, scales)
+        return setup
+    return decorator
+
+def populated_matcher(size: int) -> MatcherService:
+    """Matcher over size seekers, MATCHES of them developers in London"""
+    repository = InMemoryRepository()
+    repository.upsert_users(
+        (f"+1{5000000000 + i}", 'developer', 'london') if i < MATCHES
+        else (f"+1{5000000000 + i}", ROLES[i % len(ROLES)], f"area {i % 1000}")
+        for i in range(size)
+    )
+    return MatcherService(repository)
+
+@benchmark('smart_split_role_location', scales=False)
+def bench_smart_split(size):
+    contents = itertools.cycle([message.split(None, 1)[1] for message in MESSAGES])
+    return lambda: CommandParser._smart_split_role_location(next(contents))
+
+@benchmark('parse_register_command', scales=False)
+def bench_parse_register(size):
+    messages = itertools.cycle(MESSAGES)
+    return lambda: CommandParser.parse_register_command(next(messages))
+
+@benchmark('register_user')
+def bench_register_user(size):
+    matcher = populated_matcher(size)
+    phones = (f"+2{i:010d}" for i in itertools.count())
+    return lambda: matcher.register_user(next(phones), 'designer', 'paris')
+
+@benchmark('find_matching_users')
+def bench_find_matching_users(size):
+    matcher = populated_matcher(size)
+    job = Job('+19999999999', 'developer', 'london')
+    return lambda: matcher.find_matching_users(job)
+
+@benchmark('get_jobs_by_criteria')
+def bench_get_jobs_by_criteria(size):
+    matcher = MatcherService(InMemoryRepository())
+    matcher.repository.add_jobs(
+        Job('+19999999999', 'developer', 'london') if i < MATCHES
+        else Job('+19999999999', ROLES[i % len(ROLES)], f"area {i % 1000}")
+        for i in range(size)
+    )
+    return lambda: matcher.get_jobs_by_criteria('Developer', 'London')
+
+def time_call(call, min_time: float = 0.2, repeat: int = 5) -> float:
+    """Best per-call time in nanoseconds over several timed rounds"""
+    # Calibrate the loop count so each round lasts about min_time
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10 or number >= 1 << 20:
+            break
+        number *= 10
+    number = max(1, int(number * (min_time / max(elapsed, 1e-9))))
+    
+    best = float('inf')
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                call()
+            best = min(best, (time.perf_counter() - start) / number)
+    finally:
+        gc.enable()
+    return best * 1e9
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {'max_ratio': DEFAULT_MAX_RATIO, 'results': {}}
+    with open(path) as f:
+        return json.load(f)
+
+def save_baseline(path: str, baseline: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma-separated record counts')
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS), help='benchmarks to run')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--max-ratio', type=float, help='allowed slowdown over baseline (overrides the file)')
+    parser.add_argument('--update', action='store_true', help='store these results as the new baseline')
+    args = parser.parse_args()
+    
+    logging.disable(logging.INFO)
+    sizes = [int(size) for size in args.sizes.split(',')]
+    baseline = load_baseline(args.baseline)
+    max_ratio = args.max_ratio or baseline.get('max_ratio', DEFAULT_MAX_RATIO)
+    
+    regressions = []
+    print(f"{'benchmark':<28}{'records':>10}{'ns/call':>12}{'baseline':>12}{'ratio':>8}")
+    for name in args.only or BENCHMARKS:
+        setup, scales = BENCHMARKS[name]
+        for size in (sizes if scales else [None]):
+            key = str(size) if size is not None else '-'
+            call = setup(size)
+            nanoseconds = time_call(call)
+            del call
+            gc.collect()
+            
+            previous = baseline['results'].get(name, {}).get(key)
+            ratio = nanoseconds / previous if previous else None
+            flag = ''
+            if ratio is not None and ratio > max_ratio:
+                regressions.append((name, key, ratio))
+                flag = '  REGRESSION'
+            print(f"{name:<28}{key:>10}{nanoseconds:>12,.0f}"
+                  f"{(f'{previous:,.0f}' if previous else 'new'):>12}"
+                  f"{(f'{ratio:.2f}' if ratio is not None else '-'):>8}{flag}")
+            
+            if args.update:
+                baseline['results'].setdefault(name, {})[key] = round(nanoseconds, 1)
+    
+    if args.update:
+        baseline.setdefault('max_ratio', DEFAULT_MAX_RATIO)
+        save_baseline(args.baseline, baseline)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {max_ratio:g}x baseline:")
+        for name, key, ratio in regressions:
+            print(f"  {name} at {key} records: {ratio:.2f}x")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Replay recorded webhook traffic through the message handler
+
+Feeds a log written with WEBHOOK_RECORD_PATH back through process_message
+in recorded order, at the recorded pace (--speed 1), N times faster
+(--speed N) or as fast as possible (--speed 0). Notifications go to a stub
+that only counts them, so the run measures parsing, storage and matching
+on the real mix of commands rather than Twilio. Reports throughput and
+per-command latency next to the latency recorded in production.
+
+Usage:
+    python -m benchmarks.replay_traffic webhook-traffic.jsonl
+    python -m benchmarks.replay_traffic webhook-traffic.jsonl --speed 10
+    python -m benchmarks.replay_traffic webhook-traffic.jsonl --speed 0 --storage sqlite
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+class StubNotificationService:
+    """Stands in for NotificationService, counting messages instead of sending them"""
+    
+    def __init__(self):
+        self.alerts = 0
+        self.confirmations = 0
+    
+    def record_job_alerts(self, job, matching_users) -> int:
+        return len(matching_users)
+    
+    def send_job_alerts(self, job, matching_users) -> dict:
+        self.alerts += len(matching_users)
+        return {'total': len(matching_users), 'sent': len(matching_users), 'failed': 0}
+    
+    def send_registration_confirmation(self, user, subscription) -> bool:
+        self.confirmations += 1
+        return True
+    
+    def send_job_posted_confirmation(self, employer_phone, job, alert_count) -> bool:
+        self.confirmations += 1
+        return True
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def configure_environment(args, workdir: str) -> None:
+    """Keep the replay away from real storage and Twilio; must run before app imports"""
+    os.environ.update({
+        'TWILIO_ACCOUNT_SID': 'AC' + '0' * 32,
+        'TWILIO_AUTH_TOKEN': 'replay',
+        'TWILIO_PHONE_NUMBER': '+14155238886',
+        'STORAGE_BACKEND': args.storage,
+        'DATABASE_PATH': os.path.join(workdir, 'jobbot.db'),
+        'OUTBOX_DB_PATH': os.path.join(workdir, 'outbox.db'),
+        'WEBHOOK_RECORD_PATH': '',
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('log', help='traffic log written by the webhook recorder')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='replay rate relative to the recording; 0 replays as fast as possible')
+    parser.add_argument('--storage', default='memory', help="STORAGE_BACKEND ('memory', 'sqlite' or 'shared')")
+    parser.add_argument('--limit', type=int, help='replay only the first N messages')
+    args = parser.parse_args()
+    
+    logging.disable(logging.ERROR)
+    workdir = tempfile.TemporaryDirectory()
+    configure_environment(args, workdir.name)
+    
+    from app.bot import message_handler
+    from app.bot.router import CommandRouter
+    from app.services.traffic_recorder import read_recording
+    
+    # Replies and alerts are generated but never leave the process
+    stub = StubNotificationService()
+    message_handler.notification_service = stub
+    message_handler.alert_dispatcher.notification_service = stub
+    
+    records = list(read_recording(args.log))[:args.limit]
+    if not records:
+        print(f"No messages in {args.log}")
+        return
+    
+    latencies = defaultdict(list)
+    recorded = defaultdict(list)
+    max_lag = 0.0
+    first_at = records[0]['t']
+    started = time.perf_counter()
+    for record in records:
+        if args.speed > 0:
+            due = started + (record['t'] - first_at) / args.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                max_lag = max(max_lag, -delay)
+        
+        body = record['b'].strip()
+        command = CommandRouter.split(body)[0]
+        if command not in message_handler.command_router:
+            command = 'other'
+        
+        start = time.perf_counter()
+        message_handler.process_message(body, record['f'])
+        latencies[command].append((time.perf_counter() - start) * 1000)
+        recorded[command].append(record['d'])
+    elapsed = time.perf_counter() - started
+    
+    message_handler.alert_dispatcher.shutdown()
+    
+    span = records[-1]['t'] - first_at
+    pace = 'max speed' if args.speed <= 0 else f"{args.speed:g}x"
+    print(f"Replayed {len(records):,} messages recorded over {span:,.1f}s in {elapsed:,.1f}s "
+          f"({len(records) / max(elapsed, 1e-9):,.0f} msg/s) at {pace}; storage={args.storage}")
+    if args.speed > 0:
+        print(f"Largest lag behind the recorded schedule: {max_lag * 1000:,.1f} ms")
+    print(f"Stubbed notifications: {stub.alerts:,} alerts, {stub.confirmations:,} confirmations")
+    print()
+    print(f"{'Latency (ms)':<14}{'count':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}{'recorded p50':>14}")
+    for command in sorted(latencies, key=lambda name: -len(latencies[name])):
+        ms = latencies[command]
+        print(f"  {command:<12}{len(ms):9,}{percentile(ms, .5):9.2f}{percentile(ms, .95):9.2f}"
+              f"{percentile(ms, .99):9.2f}{max(ms):9.2f}{percentile(recorded[command], .5):14.2f}")
+    
+    workdir.cleanup()
+
+if __name__ == '__main__':
+    main()
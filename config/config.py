@@ -3,17 +3,115 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 class Config:
     # Twilio Configuration
     TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
     TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
     TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER')
+    TWILIO_MAX_WORKERS = int(os.getenv('TWILIO_MAX_WORKERS', 8))  # concurrent bulk sends
+    TWILIO_HTTP_TIMEOUT = 10  # seconds per Messages API request
+    TWILIO_API_URL = os.getenv('TWILIO_API_URL', '')  # overrides https://api.twilio.com, e.g. a local stand-in
+    TWILIO_ACCOUNT_RATE = float(os.getenv('TWILIO_ACCOUNT_RATE', 100))  # messages/second, 0 for no limit
+    TWILIO_SENDER_RATE = float(os.getenv('TWILIO_SENDER_RATE', 80))  # messages/second per number, 0 for no limit
+    TWILIO_MAX_RETRIES = 3
+    TWILIO_BACKOFF_BASE = 0.5  # seconds
+    TWILIO_BACKOFF_MAX = 8  # seconds
+    TWILIO_INLINE_SEND_WAIT = 2  # seconds a send on the webhook thread waits for a rate-limit slot
     
     # Flask Configuration
-    SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+    DEV_SECRET_KEY = 'dev-secret-key-change-in-production'
+    SECRET_KEY = os.getenv('SECRET_KEY', DEV_SECRET_KEY)
     DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
     
     # Bot Configuration
     BOT_NAME = "JobBot"
     MAX_USERS = 100
-    ALERT_TIMEOUT = 5  # seconds 
\ No newline at end of file
+    ALERT_TIMEOUT = 5  # seconds
+    
+    # Location Gazetteer Configuration
+    GAZETTEER_PATH = os.getenv('GAZETTEER_PATH', os.path.join(BASE_DIR, 'data', 'locations.tsv'))
+    GAZETTEER_CACHE_PATH = os.getenv('GAZETTEER_CACHE_PATH', f"{GAZETTEER_PATH}.cache")  # '' disables
+    
+    # Subscription Configuration
+    MAX_SUBSCRIPTIONS_PER_USER = int(os.getenv('MAX_SUBSCRIPTIONS_PER_USER', 10))
+    BACKFILL_JOB_COUNT = int(os.getenv('BACKFILL_JOB_COUNT', 3))  # recent jobs shown on register, 0 disables
+    
+    # Job Expiry Configuration
+    JOB_TTL_DAYS = float(os.getenv('JOB_TTL_DAYS', 30))  # default listing lifetime, 0 keeps jobs open
+    JOB_MAX_TTL_DAYS = float(os.getenv('JOB_MAX_TTL_DAYS', 90))
+    JOB_EXPIRY_INTERVAL = int(os.getenv('JOB_EXPIRY_INTERVAL', 60))  # seconds between expiry sweeps
+    
+    # Radius Matching Configuration
+    MAX_MATCH_RADIUS_KM = float(os.getenv('MAX_MATCH_RADIUS_KM', 100))  # largest radius a seeker may register
+    GEO_GRID_CELL_DEG = float(os.getenv('GEO_GRID_CELL_DEG', 0.5))  # spatial index cell size (~55 km of latitude)
+    
+    # Role Taxonomy Configuration
+    ROLE_TAXONOMY_PATH = os.getenv('ROLE_TAXONOMY_PATH', os.path.join(BASE_DIR, 'data', 'roles.tsv'))
+    
+    # Storage Configuration
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'memory')  # 'memory', 'sqlite' or 'shared'
+    DATABASE_PATH = os.getenv('DATABASE_PATH', 'jobbot.db')
+    SHARED_CHANGE_LOG_RETENTION = 10000  # user change entries kept for other workers
+    SHARED_CHANGE_LOG_PRUNE_EVERY = 1000  # writes between change log trims
+    
+    # Webhook Dedupe Configuration (Twilio redelivers slow webhooks with the same MessageSid)
+    WEBHOOK_DEDUPE_BACKEND = os.getenv(
+        'WEBHOOK_DEDUPE_BACKEND', 'sqlite' if STORAGE_BACKEND == 'shared' else 'memory'
+    )  # 'memory' (per process) or 'sqlite' (shared by all workers)
+    WEBHOOK_DEDUPE_DB_PATH = os.getenv('WEBHOOK_DEDUPE_DB_PATH', os.getenv('OUTBOX_DB_PATH', 'outbox.db'))
+    WEBHOOK_DEDUPE_TTL = int(os.getenv('WEBHOOK_DEDUPE_TTL', 900))  # seconds a reply is remembered
+    WEBHOOK_DEDUPE_MAX_ENTRIES = int(os.getenv('WEBHOOK_DEDUPE_MAX_ENTRIES', 10000))  # memory backend only
+    WEBHOOK_DEDUPE_WAIT = 10  # seconds a redelivery waits for the first delivery's reply
+    WEBHOOK_DEDUPE_PRUNE_EVERY = 1000  # claims between sweeps of expired replies
+    
+    # Logging Configuration (records are written by a background thread)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # 'json' (one object per line) or 'text'
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))  # records beyond this are dropped and counted
+    LOG_SAMPLE_EVERY = int(os.getenv('LOG_SAMPLE_EVERY', 100))  # keep 1 in N per-message success lines
+    
+    # Webhook Traffic Recording (anonymized log for benchmarks/replay_traffic.py)
+    WEBHOOK_RECORD_PATH = os.getenv('WEBHOOK_RECORD_PATH', '')  # '' disables recording
+    WEBHOOK_RECORD_SALT = os.getenv('WEBHOOK_RECORD_SALT', SECRET_KEY)  # key for hashing phone numbers, random if unset
+    
+    # Webhook Profiler Configuration (off until started via /admin/profiler or the signal)
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')  # X-Admin-Token for /admin endpoints; '' disables them
+    PROFILER_SAMPLE_RATE = float(os.getenv('PROFILER_SAMPLE_RATE', 0.1))  # share of requests profiled
+    PROFILER_INTERVAL = float(os.getenv('PROFILER_INTERVAL', 0.005))  # seconds between stack samples
+    PROFILER_MAX_SECONDS = float(os.getenv('PROFILER_MAX_SECONDS', 300))  # auto-stop, 0 runs until stopped
+    PROFILER_OUTPUT_DIR = os.getenv('PROFILER_OUTPUT_DIR', '.')  # where collapsed-stack files are written
+    PROFILER_SIGNAL = os.getenv('PROFILER_SIGNAL', 'SIGUSR2')  # toggles profiling in a worker; '' disables
+    
+    # Per-Sender Flood Protection (hourly rates are split between worker processes)
+    SENDER_POSTS_PER_HOUR = float(os.getenv('SENDER_POSTS_PER_HOUR', 20))
+    SENDER_POST_BURST = int(os.getenv('SENDER_POST_BURST', 5))
+    SENDER_REGISTRATIONS_PER_HOUR = float(os.getenv('SENDER_REGISTRATIONS_PER_HOUR', 30))
+    SENDER_REGISTRATION_BURST = int(os.getenv('SENDER_REGISTRATION_BURST', 10))
+    SENDER_LIMIT_MAX_TRACKED = 100000  # senders with a partly used budget kept in memory
+    
+    # Number of server processes sharing the Twilio and per-sender rate limits (gunicorn sets WEB_CONCURRENCY)
+    WORKER_PROCESSES = max(1, int(os.getenv('WEB_CONCURRENCY', 1)))
+    
+    # Alert Dispatch Configuration
+    DISPATCH_WORKERS = int(os.getenv('DISPATCH_WORKERS', 4))
+    DISPATCH_QUEUE_SIZE = int(os.getenv('DISPATCH_QUEUE_SIZE', 1000))
+    DISPATCH_SUBMIT_TIMEOUT = 1  # seconds to wait for queue space
+    DISPATCH_DRAIN_TIMEOUT = 30  # seconds to wait for queued alerts on shutdown
+    
+    # Notification Outbox Configuration
+    OUTBOX_DB_PATH = os.getenv('OUTBOX_DB_PATH', 'outbox.db')
+    OUTBOX_MAX_ATTEMPTS = 5
+    OUTBOX_RETRY_INTERVAL = 30  # seconds between retry sweeps and base retry delay
+    OUTBOX_RETRY_MAX_DELAY = 3600  # seconds
+    OUTBOX_PENDING_GRACE = 60  # seconds before the retry worker picks up unsent alerts
+    OUTBOX_STALE_AFTER = 300  # seconds before an unfinished send is reconciled
+    OUTBOX_BATCH_SIZE = 100
+    OUTBOX_RETENTION_DAYS = float(os.getenv('OUTBOX_RETENTION_DAYS', 7))  # how long sent and dead entries are kept
+    
+    # Digest Configuration (seekers who send 'digest on')
+    DIGEST_INTERVAL = int(os.getenv('DIGEST_INTERVAL', 3600))  # longest an alert waits for a digest, seconds
+    DIGEST_MAX_JOBS = int(os.getenv('DIGEST_MAX_JOBS', 10))  # jobs per digest; reaching it sends one early
+    DIGEST_FLUSH_INTERVAL = int(os.getenv('DIGEST_FLUSH_INTERVAL', 60))  # seconds between digest sweeps
+    SQLITE_BUSY_TIMEOUT_MS = 5000 
\ No newline at end of file
@@ -6,12 +6,10 @@ WhatsApp Job Board Bot - Entry Point
 import logging
 import os
 from app import create_app
+from app.services.structured_logging import configure_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging (JSON records written off the request thread)
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +23,7 @@ def main():
         port = int(os.getenv('PORT', 5000))
         
         logger.info("Starting WhatsApp Job Board Bot...")
-        logger.info(f"Server will run on port {port}")
+        logger.info("Server will run on port %d", port)
         logger.info("Webhook endpoint: /webhook")
         logger.info("Status endpoint: /status")
         
@@ -0,0 +1,43 @@
+import unittest
+from app.services.bitmap import CHUNK_BITS, Bitmap
+
+class TestBitmap(unittest.TestCase):
+    """Test cases for the chunked bitmap"""
+    
+    def test_add_discard_contains(self):
+        """Test membership across chunk boundaries"""
+        bitmap = Bitmap()
+        for value in (0, 5, CHUNK_BITS - 1, CHUNK_BITS, 10 * CHUNK_BITS + 3):
+            bitmap.add(value)
+        
+        self.assertIn(CHUNK_BITS, bitmap)
+        self.assertNotIn(6, bitmap)
+        self.assertEqual(len(bitmap), 5)
+        
+        bitmap.discard(5)
+        bitmap.discard(7)
+        self.assertEqual(list(bitmap), [0, CHUNK_BITS - 1, CHUNK_BITS, 10 * CHUNK_BITS + 3])
+    
+    def test_empty_chunks_are_dropped(self):
+        """Test a bitmap is falsy once every value is discarded"""
+        bitmap = Bitmap()
+        bitmap.add(3 * CHUNK_BITS)
+        self.assertTrue(bitmap)
+        bitmap.discard(3 * CHUNK_BITS)
+        self.assertFalse(bitmap)
+    
+    def test_intersection_and_union(self):
+        """Test set operations return values in ascending order"""
+        evens, threes = Bitmap(), Bitmap()
+        for value in range(0, 3 * CHUNK_BITS, 2):
+            evens.add(value)
+        for value in range(0, 3 * CHUNK_BITS, 3):
+            threes.add(value)
+        
+        self.assertEqual(list(evens & threes), list(range(0, 3 * CHUNK_BITS, 6)))
+        expected = set(range(0, 3 * CHUNK_BITS, 2)) | set(range(0, 3 * CHUNK_BITS, 3))
+        self.assertEqual(list(evens | threes), sorted(expected))
+        self.assertFalse(Bitmap() & evens)
+
+if __name__ == '__main__':
+    unittest.main()
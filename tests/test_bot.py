@@ -1,13 +1,37 @@
 import unittest
+from datetime import datetime
 from unittest.mock import Mock, patch
 from app.bot.commands import CommandParser
+from app.bot.dispatcher import AlertDispatcher, PeriodicWorker
+from app.bot.router import CommandRouter
+from app.models.subscription import Subscription
 from app.models.user import User
 from app.models.job import Job
-from app.services.matcher_service import MatcherService
+from app.services.matcher_service import MatcherService, SubscriptionLimitError
+from app.services.twilio_service import TwilioService
+import threading
+import time
 
 class TestCommandParser(unittest.TestCase):
     """Test cases for command parsing"""
     
+    def test_split_radius(self):
+        """Test a trailing radius is split off and converted to km"""
+        self.assertEqual(
+            CommandParser.split_radius("developer pune within 30 km"), ("developer pune", 30.0)
+        )
+        text, radius = CommandParser.split_radius("developer pune 10 miles")
+        self.assertEqual(text, "developer pune")
+        self.assertAlmostEqual(radius, 16.09344)
+        self.assertEqual(CommandParser.split_radius("developer pune"), ("developer pune", None))
+    
+    def test_split_ttl(self):
+        """Test a trailing job lifetime is split off and converted to seconds"""
+        self.assertEqual(CommandParser.split_ttl("driver pune for 7 days"), ("driver pune", 7 * 86400))
+        self.assertEqual(CommandParser.split_ttl("driver pune for 2 weeks"), ("driver pune", 14 * 86400))
+        self.assertEqual(CommandParser.split_ttl("driver pune for 12h"), ("driver pune", 12 * 3600))
+        self.assertEqual(CommandParser.split_ttl("driver pune"), ("driver pune", None))
+    
     def test_parse_register_command_valid(self):
         """Test valid register command parsing"""
         result = CommandParser.parse_register_command("register developer london")
@@ -51,6 +75,38 @@ class TestCommandParser(unittest.TestCase):
         self.assertTrue(CommandParser.is_help_command("hello"))
         self.assertTrue(CommandParser.is_help_command("what can you do"))
         self.assertFalse(CommandParser.is_help_command("register developer london"))
+        self.assertTrue(CommandParser.is_help_command("hi!"))
+        self.assertFalse(CommandParser.is_help_command("post php developer howrah"))
+        self.assertFalse(CommandParser.is_help_command("register showroom manager pune"))
+
+class TestCommandRouter(unittest.TestCase):
+    """Test cases for first-word command dispatch"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.router = CommandRouter()
+        self.calls = []
+        
+        @self.router.command('post', 'job')
+        def post(phone_number, args):
+            self.calls.append((phone_number, args))
+            return "posted"
+    
+    def test_dispatch_by_first_word(self):
+        """Test routing is case-insensitive and passes the argument text"""
+        self.assertEqual(self.router.dispatch("POST  php developer howrah ", "+1"), "posted")
+        self.assertEqual(self.router.dispatch("job nurse pune", "+2"), "posted")
+        self.assertEqual(self.calls, [("+1", "php developer howrah"), ("+2", "nurse pune")])
+    
+    def test_unknown_command(self):
+        """Test unmatched and empty messages return None"""
+        self.assertIsNone(self.router.dispatch("what can you do", "+1"))
+        self.assertIsNone(self.router.dispatch("   ", "+1"))
+    
+    def test_duplicate_route_rejected(self):
+        """Test a command word can only be registered once"""
+        with self.assertRaises(ValueError):
+            self.router.add_route('POST', lambda phone, args: "")
 
 class TestUser(unittest.TestCase):
     """Test cases for User model"""
@@ -59,9 +115,10 @@ class TestUser(unittest.TestCase):
         """Test user creation"""
         user = User("+1234567890", "Developer", "London")
         self.assertEqual(user.phone_number, "+1234567890")
-        self.assertEqual(user.role, "developer")
-        self.assertEqual(user.location, "london")
+        self.assertEqual(user.subscriptions[0].role, "developer")
+        self.assertEqual(user.subscriptions[0].location, "london")
         self.assertTrue(user.is_active)
+        self.assertEqual(User("+1234567890").subscriptions, [])
     
     def test_user_matches_job(self):
         """Test job matching logic"""
@@ -75,6 +132,45 @@ class TestUser(unittest.TestCase):
         self.assertFalse(user.matches_job("designer", "london"))
         self.assertFalse(user.matches_job("developer", "paris"))
 
+    def test_user_interns_role_and_location(self):
+        """Test users share vocabulary IDs instead of per-user strings"""
+        first = User("+1111111111", "Developer", "London").subscriptions[0]
+        second = User("+2222222222", " developer ", "LONDON").subscriptions[0]
+        self.assertEqual(first.match_ids, second.match_ids)
+        self.assertIs(first.role, second.role)
+        self.assertFalse(hasattr(first, '__dict__'))
+        self.assertFalse(hasattr(User("+1111111111"), '__dict__'))
+    
+    def test_packed_subscriptions_round_trip(self):
+        """Test flags, timestamps and every kind of subscription survive packing"""
+        user = User("+1234567890", "developer", "london")
+        user.digest = True
+        user.subscriptions[0].id = 7  # a copy, so the stored one is unchanged
+        self.assertIsNone(user.subscriptions[0].id)
+        
+        near = Subscription("+1234567890", "nurse", "pune", 25.0, (18.52, 73.86), subscription_id=9)
+        later = Subscription("+1234567890", "driver", "paris", subscription_id=3)
+        later.created_at = datetime(2024, 1, 1)
+        user.add_subscription(near)
+        user.add_subscription(later)
+        self.assertEqual(user.subscription_count, 3)
+        self.assertEqual([s.id for s in user.subscriptions], [None, 9, 3])
+        self.assertEqual((user.subscriptions[1].radius_km, user.subscriptions[1].latitude), (25.0, 18.52))
+        self.assertEqual(user.subscriptions[2].created_at, datetime(2024, 1, 1))
+        
+        registered_at = user.subscriptions[0].created_at
+        user.created_at = datetime(2023, 6, 1)
+        user.is_active = False
+        self.assertEqual(user.created_at, datetime(2023, 6, 1))
+        self.assertEqual(user.subscriptions[0].created_at, registered_at)
+        self.assertEqual((user.is_active, user.digest), (False, True))
+        
+        self.assertEqual(user.remove_subscription(None).match_key, ("developer", "london"))
+        self.assertEqual([s.match_key for s in user.subscriptions], [("nurse", "pune"), ("driver", "paris")])
+        near.set_radius(0, None)
+        self.assertTrue(user.replace_subscription(near))
+        self.assertFalse(user.subscriptions[0].has_radius)
+
 class TestJob(unittest.TestCase):
     """Test cases for Job model"""
     
@@ -109,20 +205,89 @@ class TestMatcherService(unittest.TestCase):
         
         user = self.matcher.get_user_by_phone("+1234567890")
         self.assertIsNotNone(user)
-        self.assertEqual(user.role, "developer")
-        self.assertEqual(user.location, "london")
+        self.assertEqual(user.subscriptions[0].match_key, ("developer", "london"))
     
-    def test_register_user_update(self):
-        """Test updating existing user"""
-        # Register user first time
+    def test_register_adds_subscriptions(self):
+        """Test registering again adds a subscription instead of replacing"""
         self.matcher.register_user("+1234567890", "developer", "london")
+        self.matcher.register_user("+1234567890", "designer", "paris")
+        self.matcher.register_user("+1234567890", "Developer", "London")
+        
+        subscriptions = self.matcher.list_subscriptions("+1234567890")
+        self.assertEqual(
+            [s.match_key for s in subscriptions], [("developer", "london"), ("designer", "paris")]
+        )
+        self.assertEqual(len(self.matcher.users), 1)
         
-        # Update user preferences
+        for role, location in (("developer", "london"), ("designer", "paris")):
+            job = self.matcher.post_job("+9999999999", role, location)
+            matches = self.matcher.find_matching_users(job)
+            self.assertEqual([u.phone_number for u in matches], ["+1234567890"])
+    
+    def test_remove_subscription(self):
+        """Test a removed subscription stops matching while others remain"""
+        self.matcher.register_user("+1234567890", "developer", "london")
         self.matcher.register_user("+1234567890", "designer", "paris")
+        first = self.matcher.list_subscriptions("+1234567890")[0]
         
-        user = self.matcher.get_user_by_phone("+1234567890")
-        self.assertEqual(user.role, "designer")
-        self.assertEqual(user.location, "paris")
+        self.assertTrue(self.matcher.remove_subscription("+1234567890", first.id))
+        self.assertFalse(self.matcher.remove_subscription("+1234567890", first.id))
+        self.assertFalse(self.matcher.remove_subscription("+0000000000", first.id))
+        
+        job = self.matcher.post_job("+9999999999", "developer", "london")
+        self.assertEqual(self.matcher.find_matching_users(job), [])
+        job = self.matcher.post_job("+9999999999", "designer", "paris")
+        self.assertEqual(len(self.matcher.find_matching_users(job)), 1)
+    
+    def test_subscription_limit(self):
+        """Test users cannot exceed the subscription limit"""
+        with patch('app.services.matcher_service.Config.MAX_SUBSCRIPTIONS_PER_USER', 2):
+            self.matcher.add_subscription("+1234567890", "developer", "london")
+            self.matcher.add_subscription("+1234567890", "designer", "paris")
+            # Re-adding an existing pair is an update, not a new subscription
+            self.matcher.add_subscription("+1234567890", "designer", "paris")
+            with self.assertRaises(SubscriptionLimitError):
+                self.matcher.add_subscription("+1234567890", "nurse", "pune")
+            self.assertFalse(self.matcher.register_user("+1234567890", "nurse", "pune"))
+    
+    def test_upsert_user(self):
+        """Test upsert reports creation and reuses the stored user"""
+        user, created = self.matcher.upsert_user("+1234567890", "developer", "london")
+        self.assertTrue(created)
+        
+        same_user, created = self.matcher.upsert_user("+1234567890", "designer", "paris")
+        self.assertFalse(created)
+        self.assertIs(same_user, user)
+        self.assertEqual([s.match_key for s in same_user.subscriptions], [("designer", "paris")])
+        self.assertEqual(len(self.matcher.users), 1)
+    
+    def test_radius_matching(self):
+        """Test seekers are alerted to jobs within their registered radius"""
+        self.matcher.register_user("+1111111111", "developer", "pune", radius_km=30)
+        self.matcher.register_user("+2222222222", "developer", "pune")
+        self.matcher.register_user("+3333333333", "developer", "pimpri", radius_km=30)
+        
+        job = self.matcher.post_job("+9999999999", "developer", "pimpri")
+        matches = self.matcher.find_matching_users(job)
+        self.assertEqual(
+            sorted(u.phone_number for u in matches), ["+1111111111", "+3333333333"]
+        )
+    
+    def test_radius_ignored_for_unknown_location(self):
+        """Test a radius is dropped when the location has no coordinates"""
+        self.matcher.register_user("+1111111111", "developer", "atlantis", radius_km=30)
+        user = self.matcher.get_user_by_phone("+1111111111")
+        self.assertFalse(user.subscriptions[0].has_radius)
+        self.assertEqual(user.subscriptions[0].radius_km, 0)
+    
+    def test_get_recent_jobs(self):
+        """Test registration backfill returns the latest matching jobs"""
+        jobs = [self.matcher.post_job("+9999999999", "Developer", "London") for _ in range(4)]
+        self.matcher.post_job("+9999999999", "developer", "paris")
+        
+        recent = self.matcher.get_recent_jobs("developer", "london", limit=2)
+        self.assertEqual([j.id for j in recent], [jobs[3].id, jobs[2].id])
+        self.assertEqual(self.matcher.get_recent_jobs("developer", "london", limit=0), [])
     
     def test_post_job(self):
         """Test job posting"""
@@ -131,6 +296,32 @@ class TestMatcherService(unittest.TestCase):
         self.assertEqual(job.role, "developer")
         self.assertEqual(job.location, "london")
     
+    def test_job_ttl(self):
+        """Test jobs get the default lifetime and long requests are capped"""
+        with patch('app.services.matcher_service.Config.JOB_TTL_DAYS', 30), \
+             patch('app.services.matcher_service.Config.JOB_MAX_TTL_DAYS', 90):
+            default = self.matcher.post_job("+9999999999", "developer", "london")
+            capped = self.matcher.post_job("+9999999999", "developer", "london", ttl_seconds=10 ** 9)
+        self.assertEqual(default.expires_ts - default.created_at.timestamp(), 30 * 86400)
+        self.assertEqual(capped.expires_ts - capped.created_at.timestamp(), 90 * 86400)
+    
+    def test_job_ttl_must_be_positive(self):
+        """Test a zero lifetime is refused instead of leaving the job open forever"""
+        with patch('app.services.matcher_service.Config.JOB_TTL_DAYS', 30):
+            with self.assertRaises(ValueError):
+                self.matcher.post_job("+9999999999", "developer", "london", ttl_seconds=0)
+        with patch('app.services.matcher_service.Config.JOB_TTL_DAYS', 0):
+            unlimited = self.matcher.post_job("+9999999999", "developer", "london")
+        self.assertIsNone(unlimited.expires_ts)
+    
+    def test_close_job(self):
+        """Test only the posting employer can close a job"""
+        job = self.matcher.post_job("+9999999999", "developer", "london")
+        self.assertFalse(self.matcher.close_job("+1111111111", job.id))
+        self.assertTrue(self.matcher.close_job("+9999999999", job.id))
+        self.assertFalse(self.matcher.close_job("+9999999999", job.id))
+        self.assertEqual(self.matcher.get_jobs_by_criteria("developer", "london"), [])
+    
     def test_find_matching_users(self):
         """Test finding matching users for a job"""
         # Register some users
@@ -148,6 +339,27 @@ class TestMatcherService(unittest.TestCase):
         self.assertEqual(len(matches), 1)
         self.assertEqual(matches[0].phone_number, "+1111111111")
     
+    def test_find_matching_users_after_preference_change(self):
+        """Test that changing preferences moves the user to the new match bucket"""
+        self.matcher.register_user("+1111111111", "developer", "london")
+        self.assertTrue(self.matcher.update_user_preferences("+1111111111", "designer", "paris"))
+        
+        old_job = self.matcher.post_job("+9999999999", "developer", "london")
+        new_job = self.matcher.post_job("+9999999999", "Designer", " Paris ")
+        
+        self.assertEqual(self.matcher.find_matching_users(old_job), [])
+        matches = self.matcher.find_matching_users(new_job)
+        self.assertEqual([u.phone_number for u in matches], ["+1111111111"])
+    
+    def test_deactivated_user_not_matched(self):
+        """Test that deactivated users are dropped from matching"""
+        self.matcher.register_user("+1111111111", "developer", "london")
+        self.assertTrue(self.matcher.deactivate_user("+1111111111"))
+        self.assertFalse(self.matcher.deactivate_user("+0000000000"))
+        
+        job = self.matcher.post_job("+9999999999", "developer", "london")
+        self.assertEqual(self.matcher.find_matching_users(job), [])
+    
     def test_get_user_stats(self):
         """Test getting user statistics"""
         # Register some users
@@ -162,5 +374,114 @@ class TestMatcherService(unittest.TestCase):
         self.assertEqual(stats['active_users'], 2)
         self.assertEqual(stats['total_jobs'], 1)
 
+class TestAlertDispatcher(unittest.TestCase):
+    """Test cases for background alert dispatch"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.notification_service = Mock()
+        self.notification_service.send_job_alerts.return_value = {'sent': 2, 'failed': 0, 'total': 2}
+        self.dispatcher = AlertDispatcher(self.notification_service, num_workers=2, max_queue_size=10)
+    
+    def test_submit_and_drain(self):
+        """Test queued fan-outs finish before shutdown returns"""
+        self.dispatcher.start()
+        job = Job("+9999999999", "developer", "london")
+        users = [User("+1111111111", "developer", "london"), User("+2222222222", "developer", "london")]
+        
+        self.assertTrue(self.dispatcher.submit(job, users, "+9999999999"))
+        self.dispatcher.shutdown(drain=True)
+        
+        self.notification_service.send_job_alerts.assert_called_once_with(job, users)
+        self.notification_service.send_job_posted_confirmation.assert_called_once_with(
+            "+9999999999", job, 2
+        )
+    
+    def test_submit_when_stopped(self):
+        """Test submit is rejected when the dispatcher is not running"""
+        job = Job("+9999999999", "developer", "london")
+        self.assertFalse(self.dispatcher.submit(job, [], "+9999999999"))
+        self.notification_service.send_job_alerts.assert_not_called()
+    
+    def test_rejected_submit_not_recorded(self):
+        """Test a fan-out turned away by a full queue leaves nothing in the outbox"""
+        release = threading.Event()
+        self.notification_service.send_job_alerts.side_effect = lambda job, users: (
+            release.wait(2) and {'sent': 0, 'failed': 0, 'total': 0}
+        )
+        dispatcher = AlertDispatcher(self.notification_service, num_workers=1, max_queue_size=1)
+        dispatcher.start()
+        users = [User("+1111111111", "developer", "london")]
+        jobs = [Job("+9999999999", "developer", "london") for _ in range(3)]
+        
+        try:
+            # The worker holds the first job and the second fills the queue
+            self.assertTrue(dispatcher.submit(jobs[0], users, "+9999999999"))
+            while dispatcher.queue_depth:
+                time.sleep(0.01)
+            self.assertTrue(dispatcher.submit(jobs[1], users, "+9999999999"))
+            self.assertFalse(dispatcher.submit(jobs[2], users, "+9999999999", timeout=0.01))
+        finally:
+            release.set()
+            dispatcher.shutdown(drain=True)
+        
+        recorded = [call.args[0] for call in self.notification_service.record_job_alerts.call_args_list]
+        self.assertEqual(recorded, jobs[:2])
+
+class TestPeriodicWorker(unittest.TestCase):
+    """Test cases for the background task loop"""
+    
+    def test_runs_until_stopped(self):
+        """Test the task repeats after a failure and stops running once stopped"""
+        ran = threading.Semaphore(0)
+        
+        def task():
+            ran.release()
+            raise RuntimeError("boom")
+        
+        worker = PeriodicWorker('test-worker', 0.01, task)
+        worker.start()
+        try:
+            self.assertTrue(ran.acquire(timeout=2))
+            self.assertTrue(ran.acquire(timeout=2))
+        finally:
+            worker.stop()
+        
+        self.assertTrue(worker.stopping)
+        while ran.acquire(blocking=False):
+            pass
+        time.sleep(0.05)
+        self.assertFalse(ran.acquire(blocking=False))
+
+class TestTwilioService(unittest.TestCase):
+    """Test cases for bulk sending"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.service = TwilioService(max_workers=3)
+    
+    def tearDown(self):
+        self.service.close()
+    
+    def test_send_bulk_messages_results(self):
+        """Test the sent/failed/errors contract is preserved"""
+        with patch.object(self.service, 'send_message', side_effect=lambda to, msg: to != "+2"):
+            results = self.service.send_bulk_messages(["+1", "+2", "+3"], "hello")
+        
+        self.assertEqual(results, {'sent': 2, 'failed': 1, 'errors': ["+2"]})
+    
+    def test_send_bulk_messages_concurrent(self):
+        """Test bulk sends overlap instead of running one at a time"""
+        barrier = threading.Barrier(3, timeout=2)
+        
+        def send(to, msg):
+            barrier.wait()
+            return True
+        
+        with patch.object(self.service, 'send_message', side_effect=send):
+            results = self.service.send_bulk_messages(["+1", "+2", "+3"], "hello")
+        
+        self.assertEqual(results['sent'], 3)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+from app.bot.commands import CommandParser
+from app.services.gazetteer import Gazetteer
+
+class TestGazetteer(unittest.TestCase):
+    """Test cases for the reverse-token location trie"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.gazetteer = Gazetteer()
+        self.gazetteer.add_place("York", 53.96, -1.08)
+        self.gazetteer.add_place("New York", 40.71, -74.01, ["nyc"])
+    
+    def test_longest_suffix_wins(self):
+        """Test the longest matching location is chosen"""
+        count, place = self.gazetteer.match_suffix(Gazetteer.tokenize("data scientist new york"))
+        self.assertEqual((count, place.name), (2, "New York"))
+        
+        count, place = self.gazetteer.match_suffix(Gazetteer.tokenize("developer york"))
+        self.assertEqual((count, place.name), (1, "York"))
+    
+    def test_alternate_names_and_misses(self):
+        """Test alternate names resolve and unknown places do not"""
+        self.assertEqual(self.gazetteer.resolve("NYC").name, "New York")
+        self.assertIsNone(self.gazetteer.resolve("springfield"))
+        self.assertIsNone(self.gazetteer.match_suffix(["developer", "springfield"]))
+    
+    def test_load_uses_cache(self):
+        """Test a compiled cache is written and reused until the source changes"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, "places.tsv")
+            cache = os.path.join(tmpdir, "places.cache")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write("# comment\nPune\tpoona\t18.52\t73.86\n")
+            
+            first = Gazetteer.load(source, cache)
+            self.assertTrue(os.path.exists(cache))
+            second = Gazetteer.load(source, cache)
+            self.assertEqual(second.resolve("poona").name, "Pune")
+            self.assertEqual(len(first), len(second))
+    
+    def test_geonames_format(self):
+        """Test GeoNames exports load with the most populous place first"""
+        fields_small = ["1", "Springfield", "Springfield", "", "39.8", "-89.6"] + [""] * 8 + ["100"]
+        fields_big = ["2", "Springfield", "Springfield", "", "42.1", "-72.6"] + [""] * 8 + ["150000"]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            source = os.path.join(tmpdir, "cities.txt")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write("\t".join(fields_small) + "\n" + "\t".join(fields_big) + "\n")
+            gazetteer = Gazetteer.from_file(source)
+        
+        self.assertEqual(gazetteer.resolve("springfield").latitude, 42.1)
+
+class TestCommandParserLocations(unittest.TestCase):
+    """Test cases for gazetteer-backed role/location splitting"""
+    
+    def test_multi_word_and_alternate_locations(self):
+        """Test bundled gazetteer entries drive the split"""
+        self.assertEqual(
+            CommandParser.parse_post_command("post php developer pimpri chinchwad"),
+            ("php developer", "Pimpri")
+        )
+        self.assertEqual(
+            CommandParser.parse_register_command("register developer bombay"),
+            ("developer", "Mumbai")
+        )
+        self.assertEqual(
+            CommandParser.parse_register_command("register nurse san diego"),
+            ("nurse", "san diego")
+        )
+    
+    def test_punctuation_only_words(self):
+        """Test a word that tokenizes to nothing does not break the suffix walk"""
+        self.assertEqual(
+            CommandParser.parse_register_command("register driver , pune"),
+            ("driver ,", "pune")
+        )
+        self.assertEqual(
+            CommandParser.parse_register_command("register dev ... new york"),
+            ("dev ...", "new york")
+        )
+
+if __name__ == '__main__':
+    unittest.main()
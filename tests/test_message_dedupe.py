@@ -0,0 +1,93 @@
+import os
+import tempfile
+import threading
+import unittest
+from app.services.message_dedupe import MemoryMessageDedupe, SQLiteMessageDedupe, create_message_dedupe
+
+class MessageDedupeContractTests:
+    """Behaviour every reply cache must share"""
+    
+    def create_cache(self):
+        raise NotImplementedError
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.cache = self.create_cache()
+    
+    def tearDown(self):
+        self.cache.close()
+    
+    def test_duplicate_gets_cached_reply(self):
+        """Test only the first delivery is processed and redeliveries get its reply"""
+        self.assertEqual(self.cache.claim("SM1"), (True, None))
+        self.cache.complete("SM1", "<Response/>")
+        self.assertEqual(self.cache.claim("SM1"), (False, "<Response/>"))
+        self.assertEqual(self.cache.claim("SM2"), (True, None))
+    
+    def test_in_flight_duplicate_waits(self):
+        """Test a redelivery during processing waits for the first reply"""
+        self.cache.claim("SM1")
+        self.assertEqual(self.cache.claim("SM1", wait=0), (False, None))
+        
+        timer = threading.Timer(0.1, self.cache.complete, ("SM1", "done"))
+        timer.start()
+        self.assertEqual(self.cache.claim("SM1", wait=5), (False, "done"))
+        timer.join()
+    
+    def test_release_allows_reprocessing(self):
+        """Test a failed delivery can be processed again"""
+        self.cache.claim("SM1")
+        self.cache.release("SM1")
+        self.assertEqual(self.cache.claim("SM1"), (True, None))
+
+class TestMemoryMessageDedupe(MessageDedupeContractTests, unittest.TestCase):
+    """Tests for the per-process reply cache"""
+    
+    def create_cache(self):
+        return MemoryMessageDedupe(max_entries=3, ttl=60)
+    
+    def test_bounded_lru(self):
+        """Test the least recently used replies are evicted first"""
+        for sid in ("SM1", "SM2", "SM3"):
+            self.cache.claim(sid)
+            self.cache.complete(sid, sid)
+        self.cache.claim("SM1")
+        self.cache.claim("SM4")
+        
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(self.cache.claim("SM1"), (False, "SM1"))
+        self.assertEqual(self.cache.claim("SM2"), (True, None))
+    
+    def test_expired_reply_forgotten(self):
+        """Test replies older than the TTL no longer short-circuit"""
+        cache = MemoryMessageDedupe(ttl=0)
+        cache.claim("SM1")
+        cache.complete("SM1", "old")
+        self.assertEqual(cache.claim("SM1"), (True, None))
+
+class TestSQLiteMessageDedupe(MessageDedupeContractTests, unittest.TestCase):
+    """Tests for the reply cache shared by worker processes"""
+    
+    def create_cache(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.db_path = os.path.join(self.tmpdir.name, "dedupe.db")
+        return SQLiteMessageDedupe(self.db_path, ttl=60)
+    
+    def test_shared_between_workers(self):
+        """Test a redelivery to another worker gets the first worker's reply"""
+        other = SQLiteMessageDedupe(self.db_path, ttl=60)
+        self.addCleanup(other.close)
+        
+        self.cache.claim("SM1")
+        self.assertEqual(other.claim("SM1", wait=0), (False, None))
+        self.cache.complete("SM1", "reply")
+        self.assertEqual(other.claim("SM1"), (False, "reply"))
+    
+    def test_unknown_backend(self):
+        """Test the factory rejects unknown backends"""
+        with self.assertRaises(ValueError):
+            create_message_dedupe("redis")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+import uuid
+from unittest.mock import Mock, patch
+from flask import Flask
+from app.services.rate_limiter import KeyedRateLimiter
+from config.config import Config
+
+class TestWebhook(unittest.TestCase):
+    """Test cases for the webhook's dedupe and throttling, driven through Flask"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Import the handler with its outbox in a temporary directory"""
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        db_path = os.path.join(cls.tmpdir.name, 'outbox.db')
+        with patch.object(Config, 'OUTBOX_DB_PATH', db_path), \
+             patch.object(Config, 'WEBHOOK_DEDUPE_DB_PATH', db_path):
+            from app.bot import message_handler
+        cls.handler = message_handler
+        
+        app = Flask(__name__)
+        app.register_blueprint(message_handler.webhook_bp)
+        cls.client = app.test_client()
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+    
+    def post(self, body: str, message_sid: str = None, sender: str = "+15550000001") -> str:
+        """Deliver one message to the webhook and return the TwiML reply"""
+        data = {'Body': body, 'From': f"whatsapp:{sender}"}
+        if message_sid:
+            data['MessageSid'] = message_sid
+        response = self.client.post('/webhook', data=data)
+        self.assertEqual(response.status_code, 200)
+        return response.get_data(as_text=True)
+    
+    def test_redelivery_gets_cached_reply(self):
+        """Test a repeated MessageSid is answered from cache without running the handler"""
+        message_sid = f"SM{uuid.uuid4().hex}"
+        with patch.object(self.handler, 'process_message', return_value="first reply") as process:
+            first = self.post("help", message_sid)
+            second = self.post("help", message_sid)
+        
+        self.assertIn("first reply", first)
+        self.assertEqual(second, first)
+        process.assert_called_once_with("help", "+15550000001")
+    
+    def test_failed_delivery_released(self):
+        """Test a delivery whose handler raised is processed again on redelivery"""
+        message_sid = f"SM{uuid.uuid4().hex}"
+        with patch.object(self.handler, 'process_message',
+                          side_effect=[RuntimeError("boom"), "second try"]) as process:
+            first = self.post("help", message_sid)
+            second = self.post("help", message_sid)
+        
+        self.assertIn("something went wrong", first)
+        self.assertIn("second try", second)
+        self.assertEqual(process.call_count, 2)
+    
+    def test_throttled_sender_not_matched(self):
+        """Test a sender over their post budget gets the canned reply before any matching"""
+        # A zero-capacity bucket turns every post away
+        limiter = KeyedRateLimiter(rate=0.001, capacity=0)
+        matcher = Mock()
+        with patch.dict(self.handler.sender_limits, {'post': limiter}), \
+             patch.object(self.handler, 'matcher_service', matcher):
+            reply = self.post("post developer london", f"SM{uuid.uuid4().hex}", "+15550000002")
+        
+        self.assertEqual(reply, self.handler.THROTTLED_REPLIES['post'])
+        self.assertEqual(matcher.mock_calls, [])
+    
+    def test_zero_lifetime_rejected(self):
+        """Test 'for 0 days' gets a usage reply instead of a job that never expires"""
+        matcher = Mock()
+        with patch.object(self.handler, 'matcher_service', matcher):
+            reply = self.post("post driver pune for 0 days", f"SM{uuid.uuid4().hex}", "+15550000003")
+        
+        self.assertIn("at least an hour", reply)
+        self.assertEqual(matcher.mock_calls, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from app.services.metrics import MetricsRegistry
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases for the Prometheus text exposition"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.registry = MetricsRegistry()
+    
+    def test_counter(self):
+        """Test labelled counters render one sample per label value"""
+        counter = self.registry.counter('sent_total', 'Messages sent', ('result',))
+        counter.labels('sent').inc()
+        counter.labels('sent').inc(2)
+        counter.labels('failed').inc()
+        
+        text = self.registry.render()
+        self.assertIn('# TYPE sent_total counter', text)
+        self.assertIn('sent_total{result="sent"} 3', text)
+        self.assertIn('sent_total{result="failed"} 1', text)
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count follow the exposition format"""
+        histogram = self.registry.histogram('stage_seconds', 'Stage time', ('stage',), buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.labels('parse').observe(value)
+        with histogram.labels('match').time():
+            pass
+        
+        lines = self.registry.render().splitlines()
+        self.assertIn('stage_seconds_bucket{stage="parse",le="0.1"} 1', lines)
+        self.assertIn('stage_seconds_bucket{stage="parse",le="1"} 2', lines)
+        self.assertIn('stage_seconds_bucket{stage="parse",le="+Inf"} 3', lines)
+        self.assertIn('stage_seconds_sum{stage="parse"} 5.55', lines)
+        self.assertIn('stage_seconds_count{stage="match"} 1', lines)
+    
+    def test_gauge_reads_callback(self):
+        """Test gauges are read at render time"""
+        depth = [3]
+        self.registry.gauge('queue_depth', 'Queued items', lambda: depth[0])
+        depth[0] = 7
+        self.assertIn('queue_depth 7', self.registry.render())
+    
+    def test_wrong_label_count(self):
+        """Test labels must match the declared label names"""
+        counter = self.registry.counter('throttled_total', 'Throttled', ('command',))
+        with self.assertRaises(ValueError):
+            counter.labels()
+
+if __name__ == '__main__':
+    unittest.main()
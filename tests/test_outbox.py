@@ -0,0 +1,208 @@
+import sqlite3
+import time
+import unittest
+from unittest.mock import ANY, Mock, patch
+from app.bot.notifications import NotificationService
+from app.models.job import Job
+from app.models.user import User
+from app.services.outbox import NotificationOutbox
+
+class TestNotificationOutbox(unittest.TestCase):
+    """Test cases for the durable outbox"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.outbox = NotificationOutbox(":memory:")
+    
+    def tearDown(self):
+        self.outbox.close()
+    
+    def test_enqueue_is_idempotent(self):
+        """Test re-recording the same key does not create a duplicate"""
+        self.assertEqual(self.outbox.enqueue_many([("k1", "+1", "hi"), ("k2", "+2", "hi")]), 2)
+        self.assertEqual(self.outbox.enqueue_many([("k1", "+1", "hi")]), 0)
+        self.assertEqual(self.outbox.count_by_status(), {'pending': 2})
+    
+    def test_claim_only_once(self):
+        """Test a key can be claimed by one sender only"""
+        self.outbox.enqueue_many([("k1", "+1", "hi")])
+        self.assertEqual(self.outbox.claim_many(["k1"]), ["k1"])
+        self.assertEqual(self.outbox.claim_many(["k1"]), [])
+        
+        self.outbox.mark_sent("k1")
+        self.assertEqual(self.outbox.claim_many(["k1"]), [])
+        self.assertEqual(self.outbox.get_status("k1"), 'sent')
+    
+    def test_failed_entry_is_retried_then_parked(self):
+        """Test failures are rescheduled until attempts run out"""
+        self.outbox.enqueue_many([("k1", "+1", "hi")])
+        self.outbox.claim_many(["k1"])
+        self.outbox.mark_failed("k1", "boom")
+        self.assertEqual(self.outbox.get_status("k1"), 'failed')
+        
+        with patch('app.services.outbox.Config.OUTBOX_MAX_ATTEMPTS', 2), \
+             patch('app.services.outbox.time.time', return_value=time.time() + 10**6):
+            entries = self.outbox.claim_due(10)
+            self.assertEqual([e.idempotency_key for e in entries], ["k1"])
+            self.outbox.mark_failed("k1", "boom")
+        
+        self.assertEqual(self.outbox.get_status("k1"), 'dead')
+    
+    def test_failed_claim_rolls_back(self):
+        """Test an error mid-transaction leaves the connection usable and nothing claimed"""
+        self.outbox.enqueue_many([("k1", "+1", "hi")])
+        
+        def keys():
+            yield "k1"
+            raise RuntimeError("boom")
+        
+        with self.assertRaises(RuntimeError):
+            self.outbox.claim_many(keys())
+        self.assertEqual(self.outbox.get_status("k1"), 'pending')
+        self.assertEqual(self.outbox.enqueue_many([("k2", "+2", "hi")]), 1)
+        self.assertEqual(self.outbox.claim_many(["k1"]), ["k1"])
+    
+    def test_prune_keeps_undelivered(self):
+        """Test old sent and dead entries are deleted but pending ones kept"""
+        self.outbox.enqueue_many([("k1", "+1", "hi"), ("k2", "+2", "hi")])
+        self.outbox.claim_many(["k1"])
+        self.outbox.mark_sent("k1")
+        self.assertEqual(self.outbox.prune(3600), 0)
+        
+        with patch('app.services.outbox.time.time', return_value=time.time() + 7200):
+            self.assertEqual(self.outbox.prune(3600), 1)
+        self.assertIsNone(self.outbox.get_status("k1"))
+        self.assertEqual(self.outbox.get_status("k2"), 'pending')
+    
+    def test_digest_flushed_on_size_or_age(self):
+        """Test buffered alerts become one digest once enough pile up or they get old"""
+        render = lambda lines: "|".join(lines)
+        self.assertEqual(self.outbox.buffer_digest_items([("+1", "j1", "a"), ("+1", "j2", "b")]), 2)
+        self.assertEqual(self.outbox.buffer_digest_items([("+1", "j1", "a"), ("+2", "j1", "a")]), 1)
+        self.assertEqual(self.outbox.claim_digests(3, 3600, 10, render), [])
+        
+        self.outbox.buffer_digest_items([("+1", "j3", "c"), ("+1", "j4", "d")])
+        entries = self.outbox.claim_digests(3, 3600, 10, render)
+        self.assertEqual([(e.to_number, e.body) for e in entries], [("+1", "a|b|c")])
+        self.assertEqual(self.outbox.get_status(entries[0].idempotency_key), 'sending')
+        self.assertEqual(self.outbox.count_buffered(), 2)
+        
+        # Re-buffering a flushed alert does not send it again
+        self.assertEqual(self.outbox.buffer_digest_items([("+1", "j1", "a")]), 0)
+        
+        with patch('app.services.outbox.time.time', return_value=time.time() + 7200):
+            entries = self.outbox.claim_digests(3, 3600, 10, render)
+        self.assertEqual(sorted((e.to_number, e.body) for e in entries), [("+1", "d"), ("+2", "a")])
+        self.assertEqual(self.outbox.count_buffered(), 0)
+    
+    def test_failed_buffer_rolls_back(self):
+        """Test an error while buffering undoes the batch and leaves the connection usable"""
+        with self.assertRaises(sqlite3.Error):
+            self.outbox.buffer_digest_items([("+1", "j1", "a"), ("+1", "j2", object())])
+        self.assertEqual(self.outbox.count_buffered(), 0)
+        self.assertEqual(self.outbox.buffer_digest_items([("+1", "j1", "a")]), 1)
+    
+    def test_prune_drops_flushed_digest_items(self):
+        """Test pruning forgets digest items once their digest is old"""
+        self.outbox.buffer_digest_items([("+1", "j1", "a"), ("+2", "j1", "a")])
+        with patch('app.services.outbox.time.time', return_value=time.time() + 7200):
+            entries = self.outbox.claim_digests(3, 3600, 10, "|".join)
+        for entry in entries:
+            self.outbox.mark_sent(entry.idempotency_key)
+        
+        with patch('app.services.outbox.time.time', return_value=time.time() + 10**6):
+            self.assertEqual(self.outbox.prune(3600), 2)
+        self.assertEqual(self.outbox.buffer_digest_items([("+1", "j1", "a")]), 1)
+
+class TestNotificationServiceOutbox(unittest.TestCase):
+    """Test cases for outbox-backed alert delivery"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.outbox = NotificationOutbox(":memory:")
+        self.service = NotificationService(outbox=self.outbox)
+        self.service.twilio_service = Mock()
+        self.job = Job("+9999999999", "developer", "london")
+        self.users = [User("+1111111111", "developer", "london"), User("+2222222222", "developer", "london")]
+    
+    def tearDown(self):
+        self.outbox.close()
+    
+    def _bulk_send(self, failing=()):
+        def send(recipients, message, on_result=None):
+            results = {'sent': 0, 'failed': 0, 'errors': []}
+            for phone in recipients:
+                sent = phone not in failing
+                on_result(phone, sent)
+                results['sent' if sent else 'failed'] += 1
+                if not sent:
+                    results['errors'].append(phone)
+            return results
+        return send
+    
+    def test_alerts_not_resent(self):
+        """Test a replayed fan-out skips alerts that already went out"""
+        self.service.twilio_service.send_bulk_messages.side_effect = self._bulk_send(failing={"+2222222222"})
+        results = self.service.send_job_alerts(self.job, self.users)
+        self.assertEqual((results['sent'], results['failed']), (1, 1))
+        
+        key = NotificationOutbox.make_key(self.job.id, "+2222222222")
+        self.assertEqual(self.outbox.get_status(key), 'failed')
+        
+        self.service.twilio_service.send_bulk_messages.side_effect = self._bulk_send()
+        results = self.service.send_job_alerts(self.job, self.users)
+        self.assertEqual((results['sent'], results['skipped']), (1, 1))
+        self.assertEqual(self.outbox.get_status(key), 'sent')
+    
+    def test_retry_replays_failures(self):
+        """Test the retry pass sends failed alerts once they are due"""
+        self.service.twilio_service.send_bulk_messages.side_effect = self._bulk_send(failing={"+2222222222"})
+        self.service.send_job_alerts(self.job, self.users)
+        
+        self.service.twilio_service.send_bulk_messages.side_effect = self._bulk_send()
+        with patch('app.services.outbox.time.time', return_value=time.time() + 10**6):
+            results = self.service.retry_pending_alerts()
+        
+        self.assertEqual(results['sent'], 1)
+        key = NotificationOutbox.make_key(self.job.id, "+2222222222")
+        self.assertEqual(self.outbox.get_status(key), 'sent')
+    
+    def test_digest_users_batched(self):
+        """Test digest users get one combined message instead of per-job alerts"""
+        self.users[1].digest = True
+        self.service.twilio_service.send_bulk_messages.side_effect = self._bulk_send()
+        results = self.service.send_job_alerts(self.job, self.users)
+        self.assertEqual((results['sent'], results['digested'], results['total']), (1, 1, 2))
+        self.service.twilio_service.send_bulk_messages.assert_called_once_with(
+            ["+1111111111"], self.job.get_alert_message(), on_result=ANY
+        )
+        
+        second_job = Job("+9999999999", "developer", "london")
+        self.service.send_job_alerts(second_job, self.users[1:])
+        self.assertEqual(self.service.send_digests()['total'], 0)
+        
+        self.service.twilio_service.send_messages.return_value = {'sent': 1, 'failed': 0, 'errors': []}
+        results = self.service.send_digests(max_items=2)
+        self.assertEqual(results['total'], 1)
+        (messages,), _ = self.service.twilio_service.send_messages.call_args
+        self.assertEqual(len(messages), 1)
+        phone, body = messages[0]
+        self.assertEqual(phone, "+2222222222")
+        self.assertIn(self.job.id, body)
+        self.assertIn(second_job.id, body)
+    
+    def test_stale_send_reconciled(self):
+        """Test an interrupted send found in Twilio's log is not sent again"""
+        self.service.record_job_alerts(self.job, self.users[:1])
+        key = NotificationOutbox.make_key(self.job.id, "+1111111111")
+        self.outbox.claim_many([key])
+        self.service.twilio_service.find_sent_message.return_value = True
+        
+        with patch('app.bot.notifications.Config.OUTBOX_STALE_AFTER', -1):
+            self.service.retry_pending_alerts()
+        
+        self.assertEqual(self.outbox.get_status(key), 'sent')
+        self.service.twilio_service.send_bulk_messages.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from app.services.profiler import SamplingProfiler
+
+def busy_request(duration: float) -> None:
+    """Stand-in for a slow webhook: spins for a while"""
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        pass
+
+class TestSamplingProfiler(unittest.TestCase):
+    """Test cases for the webhook sampling profiler"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.profiler = SamplingProfiler(output_dir=self.tmpdir.name)
+    
+    def tearDown(self):
+        self.profiler.stop()
+        self.tmpdir.cleanup()
+    
+    def test_idle_until_started(self):
+        """Test a stopped profiler runs no thread and stop is a no-op"""
+        self.assertFalse(self.profiler.active)
+        self.assertIsNone(self.profiler.stop())
+        self.assertFalse(any(thread.name == "webhook-profiler" for thread in threading.enumerate()))
+    
+    def test_collects_tracked_stacks(self):
+        """Test sampled requests show up as collapsed stacks in the dump"""
+        self.assertTrue(self.profiler.start(fraction=1.0, interval=0.001, duration=0))
+        self.assertFalse(self.profiler.start())
+        self.assertTrue(self.profiler.should_sample())
+        
+        with self.profiler.track():
+            busy_request(0.2)
+        # Threads outside a sampled request are ignored
+        busy_request(0.05)
+        
+        path = self.profiler.stop()
+        self.assertFalse(self.profiler.active)
+        self.assertTrue(os.path.exists(path))
+        self.assertTrue(path.endswith('.folded'))
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, count = line.rsplit(' ', 1)
+            self.assertGreater(int(count), 0)
+            self.assertIn('test_collects_tracked_stacks', stack)
+        self.assertTrue(any(line.split(';')[-1].startswith('busy_request') for line in lines))
+        self.assertEqual(self.profiler.status()['requests_sampled'], 1)
+    
+    def test_fraction_zero_samples_nothing(self):
+        """Test requests are skipped when the sample rate is zero"""
+        self.profiler.start(fraction=0.0, duration=0)
+        self.assertFalse(any(self.profiler.should_sample() for _ in range(100)))
+    
+    def test_stops_after_duration(self):
+        """Test profiling stops and dumps by itself after the time limit"""
+        self.profiler.start(fraction=1.0, interval=0.001, duration=0.05)
+        deadline = time.monotonic() + 5
+        while self.profiler.active and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(self.profiler.active)
+        self.assertTrue(any(name.endswith('.folded') for name in os.listdir(self.tmpdir.name)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+import unittest
+from unittest.mock import Mock, patch
+from twilio.base.exceptions import TwilioRestException
+from app.services.metrics import OUTBOUND_MESSAGES
+from app.services.rate_limiter import AdaptiveConcurrencyLimiter, KeyedRateLimiter, TokenBucket
+from app.services.twilio_service import TwilioService
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for the token bucket"""
+    
+    def test_burst_then_empty(self):
+        """Test the bucket allows a burst up to capacity"""
+        bucket = TokenBucket(rate=0.001, capacity=2)
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+    
+    def test_acquire_timeout(self):
+        """Test acquire gives up after the timeout"""
+        bucket = TokenBucket(rate=0.001, capacity=1)
+        bucket.try_acquire()
+        self.assertFalse(bucket.acquire(timeout=0.01))
+    
+    def test_zero_rate_is_unlimited(self):
+        """Test a rate of 0 disables the limit instead of dividing by zero"""
+        bucket = TokenBucket(rate=0, capacity=1)
+        self.assertTrue(all(bucket.acquire() for _ in range(100)))
+        self.assertTrue(bucket.try_acquire())
+
+class TestKeyedRateLimiter(unittest.TestCase):
+    """Test cases for per-key token buckets"""
+    
+    def test_keys_have_separate_budgets(self):
+        """Test one key running out does not affect another"""
+        limiter = KeyedRateLimiter(rate=0.001, capacity=2)
+        self.assertTrue(limiter.try_acquire("+1"))
+        self.assertTrue(limiter.try_acquire("+1"))
+        self.assertFalse(limiter.try_acquire("+1"))
+        self.assertTrue(limiter.try_acquire("+2"))
+    
+    def test_idle_buckets_evicted(self):
+        """Test buckets that have refilled are dropped, keeping memory bounded"""
+        limiter = KeyedRateLimiter(rate=1, capacity=2)
+        with patch('app.services.rate_limiter.time.monotonic', return_value=100.0):
+            limiter.try_acquire("+1")
+            limiter.try_acquire("+1")
+            self.assertFalse(limiter.try_acquire("+1"))
+        with patch('app.services.rate_limiter.time.monotonic', return_value=101.0):
+            limiter.try_acquire("+2")
+            self.assertEqual(len(limiter), 2)
+        with patch('app.services.rate_limiter.time.monotonic', return_value=102.5):
+            self.assertTrue(limiter.try_acquire("+2"))
+            self.assertEqual(len(limiter), 1)
+    
+    def test_zero_rate_is_unlimited(self):
+        """Test a rate of 0 disables the limit instead of failing"""
+        limiter = KeyedRateLimiter(rate=0, capacity=1)
+        self.assertTrue(all(limiter.try_acquire("+1") for _ in range(100)))
+        self.assertEqual(len(limiter), 0)
+    
+    def test_max_keys(self):
+        """Test the least recently used bucket is dropped past max_keys"""
+        limiter = KeyedRateLimiter(rate=0.001, capacity=1, max_keys=2)
+        for phone in ("+1", "+2", "+3"):
+            limiter.try_acquire(phone)
+        self.assertEqual(len(limiter), 2)
+        self.assertTrue(limiter.try_acquire("+1"))
+        self.assertFalse(limiter.try_acquire("+3"))
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+    """Test cases for the AIMD concurrency limit"""
+    
+    def test_throttle_halves_limit(self):
+        """Test throttling shrinks the limit but not below the minimum"""
+        limiter = AdaptiveConcurrencyLimiter(8, min_limit=2)
+        limiter.on_throttle()
+        self.assertEqual(limiter.limit, 4)
+        limiter.on_throttle()
+        limiter.on_throttle()
+        self.assertEqual(limiter.limit, 2)
+    
+    def test_success_grows_limit(self):
+        """Test a full window of successes grows the limit back"""
+        limiter = AdaptiveConcurrencyLimiter(4, max_limit=8)
+        limiter.on_throttle()
+        for _ in range(2):
+            limiter.on_success()
+        self.assertEqual(limiter.limit, 3)
+    
+    def test_acquire_timeout(self):
+        """Test acquire gives up when every slot stays taken"""
+        limiter = AdaptiveConcurrencyLimiter(1)
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire(timeout=0.01))
+        limiter.release()
+        self.assertTrue(limiter.acquire(timeout=0.01))
+
+class TestTwilioServiceRetry(unittest.TestCase):
+    """Test cases for retrying transient send failures"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.service = TwilioService(max_workers=4)
+        self.service.client = Mock()
+        sleep_patcher = patch('app.services.twilio_service.time.sleep')
+        self.sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+    
+    def tearDown(self):
+        self.service.close()
+    
+    def test_retries_on_throttle(self):
+        """Test a 429 is retried with backoff and shrinks concurrency"""
+        self.service.client.messages.create.side_effect = [
+            TwilioRestException(429, "uri", "Too Many Requests"),
+            Mock(sid="SM123"),
+        ]
+        throttled = OUTBOUND_MESSAGES.labels('throttled').value
+        
+        self.assertTrue(self.service.send_message("+1234567890", "hello"))
+        self.assertEqual(OUTBOUND_MESSAGES.labels('throttled').value, throttled + 1)
+        self.assertEqual(self.service.client.messages.create.call_count, 2)
+        self.assertEqual(self.sleep.call_count, 1)
+        self.assertEqual(self.service.concurrency.limit, 2)
+    
+    def test_no_retry_on_client_error(self):
+        """Test a permanent error fails immediately"""
+        self.service.client.messages.create.side_effect = TwilioRestException(400, "uri", "Bad number")
+        
+        self.assertFalse(self.service.send_message("+1234567890", "hello"))
+        self.assertEqual(self.service.client.messages.create.call_count, 1)
+        self.sleep.assert_not_called()
+    
+    def test_gives_up_after_max_retries(self):
+        """Test server errors stop being retried after the configured limit"""
+        self.service.client.messages.create.side_effect = TwilioRestException(503, "uri", "Unavailable")
+        
+        with patch('app.services.twilio_service.Config.TWILIO_MAX_RETRIES', 2):
+            self.assertFalse(self.service.send_message("+1234567890", "hello"))
+        self.assertEqual(self.service.client.messages.create.call_count, 3)
+    
+    def test_inline_send_does_not_retry(self):
+        """Test a webhook-thread send fails on the first transient error"""
+        self.service.client.messages.create.side_effect = TwilioRestException(503, "uri", "Unavailable")
+        
+        self.assertFalse(self.service.send_message("+1234567890", "hello", retry=False, wait=1))
+        self.assertEqual(self.service.client.messages.create.call_count, 1)
+        self.sleep.assert_not_called()
+    
+    def test_inline_send_gives_up_waiting_for_slot(self):
+        """Test a send with a wait limit fails instead of blocking on an empty bucket"""
+        self.service.sender_bucket = TokenBucket(rate=0.001, capacity=1)
+        self.service.sender_bucket.try_acquire()
+        
+        self.assertFalse(self.service.send_message("+1234567890", "hello", retry=False, wait=0.01))
+        self.service.client.messages.create.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
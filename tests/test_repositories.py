@@ -0,0 +1,296 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+from app.models.job import Job
+from app.repositories.memory_repository import InMemoryRepository
+from app.repositories.shared_repository import SharedRepository
+from app.repositories.sqlite_repository import SQLiteRepository
+from app.services.matcher_service import MatcherService
+
+class RepositoryContractTests:
+    """Behaviour every storage backend must share"""
+    
+    def create_repository(self):
+        raise NotImplementedError
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.repository = self.create_repository()
+    
+    def tearDown(self):
+        self.repository.close()
+    
+    def test_upsert_and_get_user(self):
+        """Test users are created once and updated afterwards"""
+        user, created = self.repository.upsert_user("+1111111111", "developer", "london")
+        self.assertTrue(created)
+        
+        user, created = self.repository.upsert_user("+1111111111", "designer", "paris")
+        self.assertFalse(created)
+        
+        stored = self.repository.get_user("+1111111111")
+        self.assertEqual([s.match_key for s in stored.subscriptions], [("designer", "paris")])
+        self.assertEqual(self.repository.count_users(), 1)
+        self.assertIsNone(self.repository.get_user("+0000000000"))
+    
+    def test_find_active_users(self):
+        """Test matching returns only active users with the same role and location"""
+        self.repository.upsert_users([
+            ("+1111111111", "developer", "london"),
+            ("+2222222222", "developer", "london"),
+            ("+3333333333", "developer", "paris"),
+        ])
+        self.repository.deactivate_user("+2222222222")
+        
+        matches = self.repository.find_active_users("developer", "london")
+        self.assertEqual([u.phone_number for u in matches], ["+1111111111"])
+        self.assertEqual(self.repository.count_active_users(), 2)
+    
+    def test_counts_track_writes(self):
+        """Test stats counts follow inserts, deactivation and deletes"""
+        self.repository.upsert_user("+1111111111", "developer", "london")
+        subscription, _ = self.repository.add_subscription("+2222222222", "designer", "paris")
+        self.repository.add_subscription("+2222222222", "developer", "paris")
+        self.repository.deactivate_user("+1111111111")
+        self.repository.remove_subscription("+2222222222", subscription.id)
+        job = Job("+9999999999", "developer", "london", ttl_seconds=60)
+        self.repository.add_jobs([job, Job("+9999999999", "developer", "paris")])
+        self.repository.delete_job(job.id)
+        
+        self.assertEqual(
+            (self.repository.count_users(), self.repository.count_active_users(),
+             self.repository.count_subscriptions(), self.repository.count_jobs()),
+            (2, 1, 2, 1)
+        )
+    
+    def test_set_digest(self):
+        """Test digest mode is stored per user and kept across subscription changes"""
+        self.repository.upsert_user("+1111111111", "developer", "london")
+        self.assertFalse(self.repository.get_user("+1111111111").digest)
+        
+        self.assertTrue(self.repository.set_digest("+1111111111", True))
+        self.repository.add_subscription("+1111111111", "designer", "paris")
+        self.assertTrue(self.repository.get_user("+1111111111").digest)
+        self.assertTrue(self.repository.find_active_users("developer", "london")[0].digest)
+        self.assertFalse(self.repository.set_digest("+0000000000", True))
+    
+    def test_find_users_near(self):
+        """Test radius search returns active users whose radius covers the point"""
+        pune, pimpri = (18.5204, 73.8567), (18.6298, 73.7997)
+        self.repository.upsert_user("+1111111111", "developer", "pune", 30, pune)
+        self.repository.upsert_user("+2222222222", "developer", "pune", 5, pune)
+        self.repository.upsert_user("+3333333333", "designer", "pune", 30, pune)
+        self.repository.upsert_user("+4444444444", "developer", "pune")
+        
+        matches = self.repository.find_users_near("developer", *pimpri)
+        self.assertEqual([u.phone_number for u in matches], ["+1111111111"])
+        self.assertEqual(self.repository.get_user("+1111111111").subscriptions[0].radius_km, 30)
+        
+        # Moving or deactivating a user takes them out of the radius search
+        self.repository.upsert_user("+1111111111", "developer", "pune", 5, pune)
+        self.assertEqual(self.repository.find_users_near("developer", *pimpri), [])
+        self.repository.upsert_user("+2222222222", "developer", "pune", 50, pune)
+        self.repository.deactivate_user("+2222222222")
+        self.assertEqual(self.repository.find_users_near("developer", *pimpri), [])
+    
+    def test_subscriptions(self):
+        """Test users can hold several subscriptions that each match"""
+        subscription, created = self.repository.add_subscription("+1111111111", "developer", "london")
+        self.assertTrue(created)
+        self.repository.add_subscription("+1111111111", "designer", "paris")
+        self.repository.add_subscription("+2222222222", "developer", "paris")
+        same, created = self.repository.add_subscription(
+            "+1111111111", "developer", "london", 20, (51.5074, -0.1278)
+        )
+        self.assertFalse(created)
+        self.assertEqual(same.id, subscription.id)
+        
+        user = self.repository.get_user("+1111111111")
+        self.assertEqual(
+            [(s.match_key, s.radius_km) for s in user.subscriptions],
+            [(("developer", "london"), 20), (("designer", "paris"), 0)]
+        )
+        self.assertEqual(self.repository.count_users(), 2)
+        self.assertEqual(self.repository.count_subscriptions(), 3)
+        
+        # Role and location must come from the same subscription
+        matches = self.repository.find_active_users("developer", "paris")
+        self.assertEqual([u.phone_number for u in matches], ["+2222222222"])
+        matches = self.repository.find_active_users("designer", "paris")
+        self.assertEqual([u.phone_number for u in matches], ["+1111111111"])
+        
+        self.assertTrue(self.repository.remove_subscription("+1111111111", subscription.id))
+        self.assertFalse(self.repository.remove_subscription("+2222222222", subscription.id))
+        self.assertEqual(self.repository.find_active_users("developer", "london"), [])
+        self.assertEqual(len(self.repository.get_user("+1111111111").subscriptions), 1)
+        self.assertEqual(self.repository.count_subscriptions(), 2)
+    
+    def test_register_again_reactivates(self):
+        """Test a deactivated user who registers again is matched again"""
+        self.repository.add_subscription("+1111111111", "developer", "london")
+        self.repository.add_subscription("+1111111111", "designer", "paris")
+        self.repository.deactivate_user("+1111111111")
+        self.assertEqual(self.repository.find_active_users("developer", "london"), [])
+        
+        self.repository.add_subscription("+1111111111", "developer", "london")
+        self.assertTrue(self.repository.get_user("+1111111111").is_active)
+        self.assertEqual(self.repository.count_active_users(), 1)
+        for role, location in (("developer", "london"), ("designer", "paris")):
+            matches = self.repository.find_active_users(role, location)
+            self.assertEqual([u.phone_number for u in matches], ["+1111111111"])
+    
+    def test_find_jobs(self):
+        """Test job filters use role, location or both"""
+        self.repository.add_jobs([
+            Job("+9999999999", "developer", "london"),
+            Job("+9999999999", "developer", "paris"),
+            Job("+9999999999", "designer", "london"),
+        ])
+        
+        self.assertEqual(len(self.repository.find_jobs()), 3)
+        self.assertEqual(len(self.repository.find_jobs(role="developer")), 2)
+        self.assertEqual(len(self.repository.find_jobs(location="london")), 2)
+        jobs = self.repository.find_jobs(role="developer", location="paris")
+        self.assertEqual([j.match_key for j in jobs], [("developer", "paris")])
+        self.assertEqual(self.repository.count_jobs(), 3)
+
+    def test_find_recent_jobs(self):
+        """Test the newest jobs for a role and location come back first"""
+        jobs = [Job("+9999999999", "developer", "london") for _ in range(5)]
+        for i, job in enumerate(jobs):
+            job.created_at = datetime(2024, 1, 1 + i)
+        jobs[3].is_active = False
+        self.repository.add_jobs(jobs + [Job("+9999999999", "developer", "paris")])
+        
+        recent = self.repository.find_recent_jobs("developer", "london", 3)
+        self.assertEqual([j.id for j in recent], [jobs[4].id, jobs[2].id, jobs[1].id])
+        self.assertEqual(self.repository.find_recent_jobs("designer", "london", 3), [])
+
+    def test_job_lookup_and_expiry(self):
+        """Test jobs are found by ID and removed when closed or expired"""
+        short = Job("+9999999999", "developer", "london", ttl_seconds=60)
+        long = Job("+9999999999", "developer", "london", ttl_seconds=3600)
+        forever = Job("+9999999999", "developer", "london")
+        closed = Job("+9999999999", "developer", "london", ttl_seconds=60)
+        self.repository.add_jobs([short, long, forever, closed])
+        
+        self.assertEqual(self.repository.get_job(long.id).expires_ts, long.expires_ts)
+        self.assertTrue(self.repository.delete_job(closed.id))
+        self.assertFalse(self.repository.delete_job(closed.id))
+        self.assertIsNone(self.repository.get_job(closed.id))
+        
+        now = short.created_at.timestamp()
+        self.assertEqual(self.repository.expire_jobs(now + 59), 0)
+        self.assertEqual(self.repository.expire_jobs(now + 60), 1)
+        self.assertIsNone(self.repository.get_job(short.id))
+        self.assertEqual(
+            [j.id for j in self.repository.find_jobs(role="developer", location="london")],
+            [long.id, forever.id]
+        )
+        self.assertEqual(self.repository.expire_jobs(now + 10 ** 6), 1)
+        self.assertEqual(self.repository.count_jobs(), 1)
+
+class TestInMemoryRepository(RepositoryContractTests, unittest.TestCase):
+    """Contract tests for the in-memory backend"""
+    
+    def create_repository(self):
+        return InMemoryRepository()
+
+class TestSQLiteRepository(RepositoryContractTests, unittest.TestCase):
+    """Contract tests for the SQLite backend"""
+    
+    def create_repository(self):
+        return SQLiteRepository(":memory:")
+    
+    def test_matcher_uses_sqlite(self):
+        """Test MatcherService works end to end on SQLite"""
+        matcher = MatcherService(self.repository)
+        matcher.register_user("+1111111111", "Developer", "London")
+        job = matcher.post_job("+9999999999", "developer", "london")
+        
+        matches = matcher.find_matching_users(job)
+        self.assertEqual([u.phone_number for u in matches], ["+1111111111"])
+        self.assertEqual(matcher.get_jobs_by_criteria("DEVELOPER")[0].id, job.id)
+
+    def test_migrates_older_database(self):
+        """Test databases with one role and location per user are upgraded on open"""
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        db_path = os.path.join(tmpdir.name, "old.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "CREATE TABLE users (phone_number TEXT PRIMARY KEY, role TEXT NOT NULL, "
+            "location TEXT NOT NULL, created_at REAL NOT NULL, is_active INTEGER NOT NULL DEFAULT 1)"
+        )
+        conn.execute("INSERT INTO users VALUES ('+1111111111', 'developer', 'london', 0, 1)")
+        conn.commit()
+        conn.close()
+        
+        repository = SQLiteRepository(db_path)
+        self.addCleanup(repository.close)
+        subscriptions = repository.get_user("+1111111111").subscriptions
+        self.assertEqual([(s.match_key, s.radius_km) for s in subscriptions], [(("developer", "london"), 0)])
+        self.assertEqual(len(repository.find_active_users("developer", "london")), 1)
+        
+        # Reopening an upgraded database leaves it alone
+        SQLiteRepository(db_path).close()
+        self.assertEqual(repository.count_subscriptions(), 1)
+        self.assertEqual((repository.count_users(), repository.count_active_users()), (1, 1))
+
+class TestSharedRepository(RepositoryContractTests, unittest.TestCase):
+    """Tests for the multi-process backend"""
+    
+    def create_repository(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.db_path = os.path.join(self.tmpdir.name, "shared.db")
+        return SharedRepository(SQLiteRepository(self.db_path))
+    
+    def open_worker(self):
+        """Open a second view of the store, as another worker process would"""
+        worker = SharedRepository(SQLiteRepository(self.db_path))
+        self.addCleanup(worker.close)
+        return worker
+    
+    def test_registration_visible_to_other_worker(self):
+        """Test a write in one worker is matched by another"""
+        worker_b = self.open_worker()
+        self.assertEqual(worker_b.find_active_users("developer", "london"), [])
+        
+        self.repository.upsert_user("+1111111111", "developer", "london")
+        matches = worker_b.find_active_users("developer", "london")
+        self.assertEqual([u.phone_number for u in matches], ["+1111111111"])
+        
+        self.repository.upsert_user("+1111111111", "designer", "paris")
+        self.repository.deactivate_user("+1111111111")
+        self.assertEqual(worker_b.find_active_users("developer", "london"), [])
+        self.assertFalse(worker_b.get_user("+1111111111").is_active)
+        self.assertEqual(worker_b.count_active_users(), 0)
+    
+    def test_subscription_changes_visible_to_other_worker(self):
+        """Test subscriptions added or removed in one worker reach another"""
+        worker_b = self.open_worker()
+        self.repository.add_subscription("+1111111111", "developer", "london")
+        subscription, _ = self.repository.add_subscription("+1111111111", "designer", "paris")
+        self.assertEqual(len(worker_b.find_active_users("designer", "paris")), 1)
+        
+        self.repository.remove_subscription("+1111111111", subscription.id)
+        self.assertEqual(worker_b.find_active_users("designer", "paris"), [])
+        self.assertEqual(len(worker_b.find_active_users("developer", "london")), 1)
+    
+    def test_reload_after_pruned_changes(self):
+        """Test a worker that missed pruned changes reloads everything"""
+        worker_b = self.open_worker()
+        
+        with patch('app.repositories.shared_repository.Config.SHARED_CHANGE_LOG_PRUNE_EVERY', 1), \
+             patch('app.repositories.shared_repository.Config.SHARED_CHANGE_LOG_RETENTION', 1):
+            for i in range(3):
+                self.repository.upsert_user(f"+100000000{i}", "developer", "london")
+        
+        self.assertEqual(len(worker_b.find_active_users("developer", "london")), 3)
+
+if __name__ == '__main__':
+    unittest.main()
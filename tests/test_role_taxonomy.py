@@ -0,0 +1,55 @@
+import unittest
+from app.repositories.memory_repository import InMemoryRepository
+from app.services.matcher_service import MatcherService
+from app.services.role_taxonomy import RoleTaxonomy, get_role_taxonomy
+
+class TestRoleTaxonomy(unittest.TestCase):
+    """Test cases for role canonicalization"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.taxonomy = RoleTaxonomy()
+        self.taxonomy.add_role("Developer", ["dev", "Software  Engineer"])
+        self.taxonomy.add_role("Nurse", ["rn"])
+    
+    def test_synonyms_map_to_canonical(self):
+        """Test synonyms, casing, spacing and plurals collapse to one role"""
+        self.assertEqual(self.taxonomy.canonicalize("DEV"), "developer")
+        self.assertEqual(self.taxonomy.canonicalize(" software engineer "), "developer")
+        self.assertEqual(self.taxonomy.canonicalize("nurses"), "nurse")
+        self.assertEqual(len(self.taxonomy), 2)
+    
+    def test_unknown_role_passes_through(self):
+        """Test roles outside the taxonomy keep their normalized text"""
+        self.assertIsNone(self.taxonomy.lookup("Astronaut"))
+        self.assertEqual(self.taxonomy.canonicalize("Astronaut"), "astronaut")
+    
+    def test_conflicting_synonym_keeps_first(self):
+        """Test a synonym cannot be claimed by two canonical roles"""
+        self.taxonomy.add_role("Designer", ["dev"])
+        self.assertEqual(self.taxonomy.canonicalize("dev"), "developer")
+    
+    def test_bundled_taxonomy(self):
+        """Test the bundled data file loads common abbreviations"""
+        taxonomy = get_role_taxonomy()
+        self.assertEqual(taxonomy.canonicalize("SDE"), "developer")
+        self.assertEqual(taxonomy.canonicalize("ui/ux designer"), "designer")
+
+class TestMatcherRoleSynonyms(unittest.TestCase):
+    """Test cases for synonym-aware matching"""
+    
+    def test_synonyms_match(self):
+        """Test a seeker and a job using different words for a role match"""
+        matcher = MatcherService(InMemoryRepository())
+        matcher.register_user("+1111111111", "dev", "london")
+        matcher.register_user("+2222222222", "Software Engineer", "london")
+        
+        job = matcher.post_job("+9999999999", "developer", "london")
+        matches = matcher.find_matching_users(job)
+        
+        self.assertEqual(len(matches), 2)
+        self.assertEqual(job.role, "developer")
+        self.assertEqual(len(matcher.get_jobs_by_criteria(role="programmer")), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from app.services.spatial_index import GridIndex, haversine_km
+
+PUNE = (18.5204, 73.8567)
+PIMPRI = (18.6298, 73.7997)
+MUMBAI = (19.0760, 72.8777)
+
+class TestGridIndex(unittest.TestCase):
+    """Test cases for the radius search grid"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.index = GridIndex(cell_size_deg=0.5, max_radius_km=100)
+    
+    def test_haversine(self):
+        """Test distances between known cities"""
+        self.assertAlmostEqual(haversine_km(*PUNE, *PIMPRI), 13.5, delta=0.5)
+        self.assertAlmostEqual(haversine_km(*PUNE, *MUMBAI), 120, delta=2)
+        self.assertEqual(haversine_km(*PUNE, *PUNE), 0)
+    
+    def test_query_respects_each_radius(self):
+        """Test only items whose own radius covers the point are returned"""
+        self.index.add("developer", "near", *PUNE, 20, "near")
+        self.index.add("developer", "small", *PUNE, 5, "small")
+        self.index.add("designer", "other", *PUNE, 20, "other")
+        
+        self.assertEqual(self.index.query("developer", *PIMPRI), ["near"])
+        self.assertEqual(self.index.query("developer", *MUMBAI), [])
+        self.assertEqual(self.index.query("nurse", *PIMPRI), [])
+    
+    def test_radius_is_capped(self):
+        """Test radii beyond max_radius_km are clamped"""
+        self.index.add("developer", "far", *PUNE, 500, "far")
+        self.assertEqual(self.index.query("developer", *MUMBAI), [])
+    
+    def test_query_crosses_cells(self):
+        """Test items in neighbouring cells are found"""
+        self.index.add("developer", "edge", 18.49, 73.99, 30, "edge")
+        self.assertNotEqual(self.index.cell_for(18.49, 73.99), self.index.cell_for(18.51, 74.01))
+        self.assertEqual(self.index.query("developer", 18.51, 74.01), ["edge"])
+    
+    def test_remove(self):
+        """Test removed items are no longer returned"""
+        self.index.add("developer", "near", *PUNE, 20, "near")
+        self.index.remove("developer", "near", *PUNE)
+        self.assertEqual(self.index.query("developer", *PIMPRI), [])
+        self.index.remove("developer", "missing", *PUNE)
+
+if __name__ == '__main__':
+    unittest.main()
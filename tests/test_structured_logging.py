@@ -0,0 +1,91 @@
+import io
+import json
+import logging
+import queue
+import unittest
+from app.services.structured_logging import (
+    SAMPLED, JSONFormatter, NonBlockingQueueHandler, _Listener, RedactingFormatter, SuccessSampler, redact
+)
+
+def make_record(msg, *args, **extra) -> logging.LogRecord:
+    record = logging.LogRecord('app.test', logging.INFO, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+class TestStructuredLogging(unittest.TestCase):
+    """Test cases for the queued, redacted logging pipeline"""
+    
+    def test_redact_keeps_last_digits(self):
+        """Test phone numbers are masked but short numbers are left alone"""
+        self.assertEqual(redact("Sent to whatsapp:+15551234567"), "Sent to whatsapp:***4567")
+        self.assertEqual(redact("Expired 12 jobs"), "Expired 12 jobs")
+        self.assertEqual(redact("From whatsapp:15551234567"), "From whatsapp:***4567")
+    
+    def test_redact_leaves_other_numbers(self):
+        """Test dates, timestamps and long counts are not mistaken for phone numbers"""
+        for text in ("POST /2010-04-01/Accounts/AC123/Messages.json",
+                     "Job expires 2026-10-17 12:00:00", "Pruned 123456789 entries at 1760700000.5"):
+            self.assertEqual(redact(text), text)
+    
+    def test_json_formatter(self):
+        """Test records become one JSON object with extra fields and a redacted message"""
+        record = make_record("Registered new user: %s", "+15551234567", job_id="ab12cd34")
+        entry = json.loads(JSONFormatter().format(record))
+        self.assertEqual(entry['message'], "Registered new user: ***4567")
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['logger'], 'app.test')
+        self.assertEqual(entry['job_id'], 'ab12cd34')
+        self.assertNotIn('sampled', entry)
+    
+    def test_text_formatter_redacts_message_only(self):
+        """Test the text format masks numbers in the message but not the timestamp"""
+        formatter = RedactingFormatter('%(asctime)s %(message)s')
+        line = formatter.format(make_record("Failed to send to %s", "+15551234567"))
+        self.assertTrue(line.endswith("Failed to send to ***4567"))
+        self.assertNotIn('***', line.split(' Failed')[0])
+    
+    def test_sampler_keeps_one_in_n(self):
+        """Test sampled lines are thinned per template and others pass through"""
+        sampler = SuccessSampler(10)
+        kept = [sampler.filter(make_record("Message sent. SID: %s", i, **SAMPLED)) for i in range(30)]
+        self.assertEqual(sum(kept), 3)
+        self.assertTrue(kept[0])
+        self.assertTrue(sampler.filter(make_record("Other line %s", 1, **SAMPLED)))
+        self.assertTrue(all(sampler.filter(make_record("Unsampled %s", i)) for i in range(5)))
+    
+    def test_queue_handler_never_blocks(self):
+        """Test records are queued unformatted and dropped when the queue is full"""
+        log_queue = queue.Queue(2)
+        handler = NonBlockingQueueHandler(log_queue)
+        for i in range(5):
+            handler.handle(make_record("Record %d", i))
+        self.assertEqual(handler.dropped, 3)
+        record = log_queue.get_nowait()
+        self.assertEqual(record.msg, "Record %d")
+        self.assertEqual(record.args, (0,))
+    
+    def test_pipeline_writes_on_background_thread(self):
+        """Test a configured logger emits JSON lines through the writer thread"""
+        stream = io.StringIO()
+        output = logging.StreamHandler(stream)
+        output.setFormatter(JSONFormatter())
+        log_queue = queue.Queue(100)
+        handler = NonBlockingQueueHandler(log_queue)
+        listener = _Listener(log_queue, handler, output)
+        logger = logging.getLogger('app.test.pipeline')
+        logger.propagate = False
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        listener.start()
+        try:
+            logger.info("Found %d matching users for job %s", 3, "ab12cd34")
+        finally:
+            listener.stop()
+            logger.removeHandler(handler)
+        
+        entry = json.loads(stream.getvalue())
+        self.assertEqual(entry['message'], "Found 3 matching users for job ab12cd34")
+        self.assertEqual(entry['thread'], 'MainThread')
+
+if __name__ == '__main__':
+    unittest.main()
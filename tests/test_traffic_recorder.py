@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from app.services.traffic_recorder import TrafficRecorder, create_traffic_recorder, read_recording
+from config.config import Config
+
+class TestTrafficRecorder(unittest.TestCase):
+    """Test cases for the webhook traffic recorder"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'traffic.jsonl')
+        self.recorder = TrafficRecorder(self.path, salt='test-salt')
+    
+    def tearDown(self):
+        self.recorder.close()
+        self.tmpdir.cleanup()
+    
+    def test_records_are_anonymized(self):
+        """Test phone numbers never reach the log and senders map consistently"""
+        self.recorder.record('whatsapp:+15551234567', 'register developer london', 1000.0, 0.0125)
+        self.recorder.record('+15551234567', 'call +44 7700 900123 about it', 1001.5, 0.002)
+        
+        with open(self.path) as f:
+            text = f.read()
+        self.assertNotIn('5551234567', text)
+        self.assertNotIn('7700 900123', text)
+        
+        first, second = read_recording(self.path)
+        self.assertEqual(first['f'], second['f'])
+        self.assertTrue(first['f'].startswith('+999'))
+        self.assertEqual(first['b'], 'register developer london')
+        self.assertEqual(first['t'], 1000.0)
+        self.assertEqual(first['d'], 12.5)
+        self.assertEqual(second['b'], f"call {self.recorder.pseudonymize('+447700900123')} about it")
+    
+    def test_short_numbers_kept(self):
+        """Test radii, durations and numeric job IDs are not mistaken for phone numbers"""
+        for body in ('register nurse pune within 30 km', 'post driver pune for 7 days', 'close 12345678'):
+            self.assertEqual(self.recorder.anonymize_body(body), body)
+    
+    def test_salt_changes_pseudonyms(self):
+        """Test pseudonyms depend on the salt"""
+        other = TrafficRecorder(os.path.join(self.tmpdir.name, 'other.jsonl'), salt='other-salt')
+        try:
+            self.assertNotEqual(self.recorder.pseudonymize('+15551234567'), other.pseudonymize('+15551234567'))
+        finally:
+            other.close()
+    
+    def test_public_salt_replaced(self):
+        """Test the development SECRET_KEY is never used as the salt"""
+        with patch.object(Config, 'WEBHOOK_RECORD_SALT', ''), \
+             self.assertLogs('app.services.traffic_recorder', 'WARNING') as logs:
+            public = TrafficRecorder(os.path.join(self.tmpdir.name, 'public.jsonl'), salt=Config.DEV_SECRET_KEY)
+            unset = TrafficRecorder(os.path.join(self.tmpdir.name, 'unset.jsonl'))
+        self.assertEqual(len(logs.records), 2)
+        try:
+            self.assertNotEqual(public._key, Config.DEV_SECRET_KEY.encode())
+            self.assertNotEqual(public.pseudonymize('+15551234567'), unset.pseudonymize('+15551234567'))
+        finally:
+            public.close()
+            unset.close()
+    
+    def test_appends_and_skips_torn_line(self):
+        """Test a reopened log is appended to and a partial last line is ignored"""
+        self.recorder.record('+15550000001', 'help', 1.0, 0.001)
+        self.recorder.close()
+        self.recorder = TrafficRecorder(self.path, salt='test-salt')
+        self.recorder.record('+15550000002', 'list', 2.0, 0.001)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({'t': 3.0})[:5])
+        
+        self.assertEqual([record['b'] for record in read_recording(self.path)], ['help', 'list'])
+    
+    def test_disabled_without_path(self):
+        """Test recording is off unless a path is configured"""
+        self.assertIsNone(create_traffic_recorder(''))
+
+if __name__ == '__main__':
+    unittest.main()